@@ -1,25 +1,56 @@
-import pandas as pd
-import json
-import math
-from dash import Dash, dcc, html, Input, Output, ctx
-import plotly.graph_objects as go
-
-# --- Load data ---
-nodes_df = pd.read_json('public/nodes.json')
-nodes_df['date'] = pd.to_datetime(nodes_df['date'], format='%Y-%m-%d', errors='coerce')
-nodes_df = nodes_df.dropna(subset=['date'])
-nodes_df['y'] = pd.to_numeric(nodes_df['yPx'], errors='coerce').fillna(0)
-
-edge_types = ["semantic", "sharedref", "lineage"]
-edges = {et: json.load(open(f'public/{et}_edges.json')) for et in edge_types}
-
-edge_colors = {
-    'semantic':  'rgba(78,121,167,0.6)',
-    'sharedref': 'rgba(227,119,194,0.6)',
-    'lineage':   'rgba(214,39,40,0.6)'
-}
+import functools, json, os, pathlib
+from dash import Dash, dcc, html, Input, Output, State, ctx, no_update
+
+from backend import artifacts, graph_index, graph_store, search, trends, viewport
+from backend.figure_cache import FigureCache
+from backend.callback_stats import CallbackStats
+
+density = pathlib.Path('public/year_density.json')
+year_counts = {int(y): c for y, c in json.loads(density.read_text()).items()} \
+              if density.exists() else None
+# keyword bursts per month / issue (cli trends), shaded on the timeline
+trend_doc = trends.load('public/' + trends.TRENDS)
+
+if os.environ.get(graph_store.ENV):
+    # --- Attach the shared store --- (gunicorn.conf.py builds it once in the
+    # master; every worker maps the same pages instead of parsing the JSON)
+    store = graph_store.attach(os.environ[graph_store.ENV])
+    index = store.index
+    edge_types = list(index.edges)
+    figures = FigureCache(index, None, year_counts=year_counts, search=store.search,
+                          hover=store.hover, haystack=store.haystack)
+    node_text = lambda r: (store.title[r], store.authors[r])
+else:
+    # --- Load data --- (memory-mapped public/columnar/ when fresh, else the JSON)
+    nodes_df = graph_store.load_nodes('public')
+    # the three stage outputs + time-windowed semantic neighbours (cli --temporal)
+    edge_types = graph_store.edge_types('public')
+    # each edge file is read on the first callback that shows its type
+    edges = {et: functools.partial(artifacts.read_edges, 'public', et) for et in edge_types}
+
+    # CSR adjacency + id→row map, so clicks/hover never scan the edge lists
+    index = graph_index.from_frame(nodes_df, edges)
+    # memoised base figure / show-all traces; interactions are sent as Patches,
+    # bounded by the visible window (zoomed-out views binned per year);
+    # prebuilt inverted index (cli search), else a substring scan of title/authors
+    search_fp = pathlib.Path('public/search_index.json')
+    figures = FigureCache(index, nodes_df, year_counts=year_counts,
+                          search=search.Index.load(search_fp) if search_fp.exists() else None)
+    node_text = lambda r: (nodes_df.at[r, 'title'], ', '.join(nodes_df.at[r, 'authors']))
+snap = figures.viewport.snap
+stats = CallbackStats()
+
+INTERACTION = {None: 'initial', 'graph.clickData': 'click', 'graph.relayoutData': 'zoom',
+               'edge-type.value': 'edge-type', 'search-box.value': 'search',
+               'reset-button.n_clicks': 'reset', 'showall-button.n_clicks': 'show-all'}
+
+
+def triggered():
+    return next(iter(ctx.triggered_prop_ids), None)
 
 app = Dash(__name__)
+stats.register(app.server)      # times and sizes each callback request once Flask is done
+server = app.server              # WSGI entry point: gunicorn -c gunicorn.conf.py app:server
 app.layout = html.Div(style={'display':'flex','height':'100vh'}, children=[
 
     html.Div(style={'width':'20%','padding':'10px','borderRight':'1px solid #ccc'}, children=[
@@ -38,9 +69,17 @@ app.layout = html.Div(style={'display':'flex','height':'100vh'}, children=[
         ),
         html.Button("Reset View",    id='reset-button',   n_clicks=0, style={'marginRight':'8px'}),
         html.Button("Show All",      id='showall-button', n_clicks=0),
+        html.H4("Bursts"),
+        dcc.Dropdown(
+            id='burst-keyword',
+            options=trends.options(trend_doc),
+            placeholder='Keyword…' if trend_doc else 'no trends.json',
+            disabled=not trend_doc,
+        ),
     ]),
 
     html.Div(style={'flex':'1','position':'relative','overflowX':'auto','overflowY':'auto'}, children=[
+        dcc.Store(id='view'),       # node rows currently drawn (None: all)
         dcc.Graph(
             id='graph',
             config={'displayModeBar': True, 'scrollZoom': True},
@@ -62,103 +101,82 @@ app.layout = html.Div(style={'display':'flex','height':'100vh'}, children=[
 
 @app.callback(
     Output('graph', 'figure'),
+    Output('view',  'data'),
     Input('graph',           'clickData'),
+    Input('graph',           'relayoutData'),
     Input('edge-type',       'value'),
     Input('search-box',      'value'),       # <-- fixed ID here
     Input('reset-button',    'n_clicks'),
     Input('showall-button',  'n_clicks'),
+    State('view',            'data'),
 )
-def update_graph(clickData, selected_type, search_term, reset_clicks, showall_clicks):
-    trigger = ctx.triggered_id
-
-    
-    if trigger == 'reset-button':
-        curr_edges, plot_df = [], nodes_df
-    elif trigger == 'showall-button':
-        curr_edges, plot_df = edges[selected_type], nodes_df
-    elif trigger == 'graph' and clickData:
+@stats.timed(lambda: INTERACTION.get(triggered(), str(triggered())))
+def update_graph(clickData, relayoutData, selected_type, search_term,
+                 reset_clicks, showall_clicks, view):
+    trigger = triggered()
+    # rows: clicked neighbourhood (None: the window's nodes); edges: 'all'
+    # when Show All is on; window: visible (x0, x1, y0, y1), None = all
+    view = view or {'rows': None, 'edges': None, 'window': None}
+    shown = view['rows']
+    window = tuple(view['window']) if view['window'] else None
+
+    # first render: the cached full figure; everything after is a Patch
+    if trigger is None:
+        return figures.figure(selected_type), {'rows': None, 'edges': None, 'window': None}
+
+    # zoom / pan / range slider: resend the window's nodes and edges
+    if trigger == 'graph.relayoutData':
+        new = viewport.parse_relayout(relayoutData, window)
+        if new is False:
+            return no_update, no_update
+        view = {**view, 'window': new}
+        if shown is not None or snap(new) == snap(window):
+            return no_update, view
+        edges = figures.show_all(selected_type, snap(new)) if view['edges'] else None
+        return figures.patch(edges=edges, nodes=figures.view_nodes(snap(new)),
+                             matches=figures.matches(None, search_term, snap(new))), view
+
+    # search only re-colours the visible nodes: resend the matches slot
+    if trigger == 'search-box.value':
+        return figures.patch(matches=figures.matches(shown, search_term, snap(window))), \
+               no_update
+
+    if trigger == 'showall-button.n_clicks':
+        eids, rows = None, None
+    elif trigger == 'graph.clickData' and clickData:
         cid = clickData['points'][0].get('customdata')
-        if cid:
-            filtered = [
-                e for e in edges[selected_type]
-                if cid in (e['source'], e['target'])
-            ]
-            curr_edges = filtered
-            plot_df = (nodes_df[nodes_df['id'].isin(
-                {n for e in filtered for n in (e['source'], e['target'])}
-            )] if filtered else nodes_df)
-        else:
-            curr_edges, plot_df = [], nodes_df
+        eids, rows = index.neighbourhood(selected_type, cid) if cid \
+                     else (graph_index.EMPTY, None)
+        rows = rows.tolist() if len(eids) else None
     else:
-        curr_edges, plot_df = [], nodes_df
-
-   
-    fig = go.Figure()
+        eids, rows = graph_index.EMPTY, None
 
-    
-    shapes = []
-    for e in curr_edges:
-        et    = e['type'].lower()
-        width = (e.get('weight', 1) * 5) \
-                if et == "semantic" \
-                else (math.sqrt(e.get('weight', 1)) if et == "sharedref" else 1)
-        dash  = 'solid' \
-                if et == "semantic" \
-                else ('dot' if et == "sharedref" else 'dash')
-        color = edge_colors.get(et, 'rgba(0,0,0,0.6)')
-
-        src = nodes_df.loc[nodes_df['id'] == e['source']].iloc[0]
-        tgt = nodes_df.loc[nodes_df['id'] == e['target']].iloc[0]
-
-        shapes.append(dict(
-            type='line',
-            x0=src['date'], y0=src['y'],
-            x1=tgt['date'], y1=tgt['y'],
-            line=dict(color=color, width=width, dash=dash),
-            layer='below'   
-        ))
+    # Reset View also zooms out: forget the window and start a new uirevision,
+    # so plotly drops the user's axis ranges for the figure's own
+    reset = trigger == 'reset-button.n_clicks'
+    if reset:
+        window = None
+    edges = figures.show_all(selected_type, snap(window)) if eids is None \
+            else figures.edges(selected_type, eids)
+    nodes = figures.view_nodes(snap(window)) \
+            if rows is None and (shown is not None or reset) else None
+    patch = figures.patch(edges=edges, rows=False if rows is None else rows, nodes=nodes,
+                          matches=figures.matches(rows, search_term, snap(window)),
+                          uirevision=f"reset-{reset_clicks}" if reset else None)
+    return patch, {'rows': rows, 'edges': 'all' if eids is None else None, 'window': window}
 
-    
-    fig.update_layout(
-        shapes=shapes,
-        dragmode="zoom",
-        xaxis=dict(
-            rangeslider=dict(visible=True, thickness=0.05),
-            type="date", tickformat="%Y", title="Publication Date"
-        ),
-        yaxis=dict(visible=False, range=[-20, nodes_df['y'].max() + 20]),
-        height=800, hovermode="closest", showlegend=False,
-        margin=dict(l=40, r=40, t=80, b=40)
-    )
 
-    
-    term = (search_term or '').lower()
-    colors = [
-        'orange' if term and term in (row.title.lower() + " " + " ".join(row.authors).lower())
-        else 'blue'
-        for row in plot_df.itertuples()
-    ]
-
-    
-    hover_texts = [
-        f"{row.title}<br>{', '.join(row.authors)}"
-        for row in plot_df.itertuples()
-    ]
-
-    
-    fig.add_trace(go.Scattergl(
-        x=plot_df['date'],
-        y=plot_df['y'],
-        customdata=plot_df['id'],
-        mode='markers',
-        marker=dict(size=12, color=colors, opacity=0.8),
-        hoverinfo='text',
-        hovertext=hover_texts,
-        hovertemplate="%{hovertext}<extra></extra>"
-    ))
-
-    return fig
 
+@app.callback(
+    Output('graph', 'figure', allow_duplicate=True),
+    Input('burst-keyword', 'value'),
+    prevent_initial_call=True,
+)
+@stats.timed(lambda: 'bursts')
+def show_bursts(keyword):
+    # layout shapes and labels only: the trace slots and the zoom are left alone
+    return figures.patch(shapes=trends.shapes(trend_doc, keyword),
+                         annotations=trends.labels(trend_doc, keyword))
 
 
 @app.callback(
@@ -167,6 +185,7 @@ def update_graph(clickData, selected_type, search_term, reset_clicks, showall_cl
     Input('reset-button',   'n_clicks'),
     Input('showall-button', 'n_clicks'),
 )
+@stats.timed(lambda: 'hover', log=False)
 def show_hover(hoverData, _reset, _showall):
     trig = ctx.triggered_id
     
@@ -183,15 +202,24 @@ def show_hover(hoverData, _reset, _showall):
         return ""
 
     
-    row = nodes_df[nodes_df['id'] == nid].iloc[0]
+    r = index.row.get(nid)
+    if r is None:
+        return ""
+    title, authors = node_text(r)
 
 
     info_div = html.Div([
-        html.B(row['title']),
-        html.Div(f"Authors: {', '.join(row['authors'])}")
+        html.B(title),
+        html.Div(f"Authors: {authors}")
     ])
 
     return info_div
 
+@app.server.route('/_stats')
+def callback_stats():
+    """Per-interaction callback latency (p50/p95) and mean response size."""
+    return stats.summary()
+
+
 if __name__ == '__main__':
     app.run(debug=True)
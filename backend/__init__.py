@@ -1,4 +1,6 @@
-from . import load_data, semantic, sharedref, lineage, density
+# stage modules load on first access (PEP 562), so `import backend` – or any one
+# stage – does not pull in every stage's dependencies
+import importlib
 
 __all__ = [
     "load_data",
@@ -8,3 +10,8 @@ __all__ = [
     "density",
 ]
 
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
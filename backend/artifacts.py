@@ -0,0 +1,308 @@
+"""backend/artifacts.py
+Compact columnar copies of the `public/` JSON files, written alongside them to
+`public/columnar/` and memory-mappable without parsing.
+
+* every node id appears once, in `ids.*` (node-table order, then any edge
+  endpoint missing from nodes.json)
+* nodes.json becomes one file per column: numbers as `.npy`, strings as a
+  UTF-8 buffer plus int64 offsets, lists/dicts of strings as ragged offsets
+* each `<type>_edges.json` becomes int32 `src`/`dst` rows into `ids`, a
+  float32 `weight` and one `.npy` per other numeric attribute
+
+`manifest.json` records the size and mtime of the JSON each table came from;
+the readers fall back to the JSON whenever it is newer than its columnar copy,
+so a stage re-run without `--columnar` is never shadowed by a stale artifact.
+"""
+from __future__ import annotations
+import json, os, pathlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+from .corpus import StringColumn
+
+VERSION = 1
+DIR = 'columnar'
+
+
+@dataclass
+class EdgeTable:
+    """Edges of one type as integer rows into `ids`."""
+    kind  : str                   # edge `type`, as in the JSON
+    ids   : np.ndarray            # object array of node ids the rows refer to
+    src   : np.ndarray            # int32
+    dst   : np.ndarray            # int32
+    weight: np.ndarray            # float32, 1.0 where the edge has no weight
+    attrs : Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The edge dicts of the original JSON file."""
+        s, t = self.ids[self.src], self.ids[self.dst]
+        cols = {k: v.tolist() for k, v in self.attrs.items()}
+        return [{'source': s[n], 'target': t[n], 'type': self.kind,
+                 **{k: v[n] for k, v in cols.items()}} for n in range(len(self))]
+
+
+# ───────────────────────────────────────────────────────────────── writing
+def _save(d: pathlib.Path, name: str, a: np.ndarray) -> int:
+    np.save(d / f'{name}.npy', a)
+    return (d / f'{name}.npy').stat().st_size
+
+
+def _strings(d, name, values: Sequence[str]) -> int:
+    enc = [s.encode('utf-8') for s in values]
+    off = np.zeros(len(enc) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in enc], out=off[1:])
+    return (_save(d, f'{name}.buf', np.frombuffer(b''.join(enc), dtype=np.uint8))
+            + _save(d, f'{name}.off', off))
+
+
+def _row_offsets(lengths) -> np.ndarray:
+    off = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=off[1:])
+    return off
+
+
+def _kind(values: List[Any]) -> str:
+    present = [v for v in values if v is not None]
+    types = {type(v) for v in present}
+    if types <= {int} and (len(present) == len(values)):
+        return 'int'
+    if types <= {int, float} and (len(present) == len(values)):
+        return 'float'
+    if types <= {str}:
+        return 'str'
+    if types <= {list} and all(isinstance(x, str) for v in present for x in v):
+        return 'list'
+    if types <= {dict} and all(isinstance(x, str) for v in present
+                               for kv in v.items() for x in kv):
+        return 'dict'
+    return 'json'
+
+
+def _column(d, name, values: List[Any]) -> tuple[str, int]:
+    kind = _kind(values)
+    size = 0
+    null = np.array([v is None for v in values])
+    if kind in ('str', 'list', 'dict') and null.any():
+        size += _save(d, f'{name}.null', null)
+    if kind == 'int':
+        a = np.asarray(values, dtype=np.int64)
+        small = a.size and np.iinfo(np.int32).min <= a.min() and a.max() <= np.iinfo(np.int32).max
+        size += _save(d, name, a.astype(np.int32) if small else a)
+    elif kind == 'float':
+        size += _save(d, name, np.asarray(values, dtype=np.float64))
+    elif kind == 'str':
+        size += _strings(d, name, [v or '' for v in values])
+    elif kind == 'list':
+        rows = [v or [] for v in values]
+        size += _save(d, f'{name}.row', _row_offsets([len(v) for v in rows]))
+        size += _strings(d, name, [x for v in rows for x in v])
+    elif kind == 'dict':
+        rows = [v or {} for v in values]
+        size += _save(d, f'{name}.row', _row_offsets([len(v) for v in rows]))
+        size += _strings(d, f'{name}.keys', [k for v in rows for k in v])
+        size += _strings(d, f'{name}.values', [x for v in rows for x in v.values()])
+    else:
+        size += _strings(d, name, [json.dumps(v) for v in values])
+    return kind, size
+
+
+def _source(fp: pathlib.Path) -> Dict[str, Any]:
+    st = fp.stat()
+    return {'file': fp.name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _edge_files(public: pathlib.Path) -> Dict[str, pathlib.Path]:
+    """Edge type (lower-cased) → `<type>_edges.json` path; of two files
+    differing only in case the newest wins."""
+    files: Dict[str, pathlib.Path] = {}
+    for fp in sorted(pathlib.Path(public).glob('*_edges.json')):
+        et = fp.name[:-len('_edges.json')].lower()
+        old = files.get(et)
+        if old is not None:
+            keep, drop = (fp, old) if fp.stat().st_mtime_ns > old.stat().st_mtime_ns \
+                else (old, fp)
+            print(f"[artifacts] {keep.name} and {drop.name} are both edge type {et!r}; "
+                  f"using the newer {keep.name}")
+            fp = keep
+        files[et] = fp
+    return files
+
+
+def export(public: pathlib.Path) -> Dict[str, Any]:
+    """Write columnar copies of nodes.json and every *_edges.json in `public`."""
+    public = pathlib.Path(public)
+    d = public / DIR
+    d.mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, Any] = {'version': VERSION, 'tables': {}}
+    tables = manifest['tables']
+
+    nodes_fp = public / 'nodes.json'
+    nodes = json.loads(nodes_fp.read_text()) if nodes_fp.exists() else []
+    ids: List[str] = [n['id'] for n in nodes]
+    row = {}
+    for i, nid in enumerate(ids):
+        row.setdefault(nid, i)
+
+    edge_json = {et: (fp, json.loads(fp.read_text()))
+                 for et, fp in _edge_files(public).items()}
+    for _, es in edge_json.values():           # endpoints without a node
+        for e in es:
+            for nid in (e['source'], e['target']):
+                if nid not in row:
+                    row[nid] = len(ids); ids.append(nid)
+
+    json_bytes, col_bytes = 0, _strings(d, 'ids', ids)
+    tables['ids'] = {'rows': len(ids)}
+
+    if nodes_fp.exists():
+        cols = {}
+        for k in dict.fromkeys(k for n in nodes for k in n):
+            kind, size = _column(d, f'nodes.{k}', [n.get(k) for n in nodes])
+            cols[k] = kind; col_bytes += size
+        tables['nodes'] = {'rows': len(nodes), 'columns': cols, 'source': _source(nodes_fp)}
+        json_bytes += nodes_fp.stat().st_size
+
+    for et, (fp, es) in edge_json.items():
+        col_bytes += _save(d, f'{et}.src', np.fromiter((row[e['source']] for e in es),
+                                                       dtype=np.int32, count=len(es)))
+        col_bytes += _save(d, f'{et}.dst', np.fromiter((row[e['target']] for e in es),
+                                                       dtype=np.int32, count=len(es)))
+        col_bytes += _save(d, f'{et}.weight', np.fromiter((e.get('weight', 1) for e in es),
+                                                          dtype=np.float32, count=len(es)))
+        attrs = {}
+        for k in dict.fromkeys(k for e in es for k in e):
+            if k in ('source', 'target', 'type'):
+                continue
+            values = [e.get(k) for e in es]
+            kind = _kind(values)
+            if kind not in ('int', 'float'):
+                raise ValueError(f"{fp.name}: edge attribute {k!r} is not numeric")
+            col_bytes += _column(d, f'{et}.attr.{k}', values)[1]
+            attrs[k] = kind
+        tables[et] = {'rows': len(es), 'kind': es[0].get('type', et) if es else et,
+                      'attrs': attrs, 'source': _source(fp)}
+        json_bytes += fp.stat().st_size
+
+    tmp = d / 'manifest.tmp'
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, d / 'manifest.json')
+    print(f"[columnar] wrote {DIR}/ ({len(tables) - 1} tables): "
+          f"{col_bytes / 2**20:.1f} MB vs {json_bytes / 2**20:.1f} MB JSON")
+    return manifest
+
+
+# ───────────────────────────────────────────────────────────────── reading
+def _load(d: pathlib.Path, name: str) -> np.ndarray:
+    fp = d / f'{name}.npy'
+    try:
+        return np.load(fp, mmap_mode='r')
+    except ValueError:                      # empty arrays cannot be mapped
+        return np.load(fp)
+
+
+def _string_column(d, name) -> StringColumn:
+    return StringColumn(_load(d, f'{name}.buf').tobytes(), _load(d, f'{name}.off'))
+
+
+def _ragged(values: List[Any], row: np.ndarray) -> List[List[Any]]:
+    row = row.tolist()
+    return [values[row[i]:row[i + 1]] for i in range(len(row) - 1)]
+
+
+def _read_column(d, name, kind) -> List[Any] | np.ndarray:
+    if kind in ('int', 'float'):
+        return _load(d, name)
+    if kind == 'str':
+        out: List[Any] = list(_string_column(d, name))
+    elif kind == 'list':
+        out = _ragged(list(_string_column(d, name)), _load(d, f'{name}.row'))
+    elif kind == 'dict':
+        row = _load(d, f'{name}.row')
+        keys = _ragged(list(_string_column(d, f'{name}.keys')), row)
+        vals = _ragged(list(_string_column(d, f'{name}.values')), row)
+        out = [dict(zip(k, v)) for k, v in zip(keys, vals)]
+    else:
+        out = [json.loads(s) for s in _string_column(d, name)]
+    if (d / f'{name}.null.npy').exists():
+        for i in np.flatnonzero(_load(d, f'{name}.null')).tolist():
+            out[i] = None
+    return out
+
+
+def manifest(public: pathlib.Path) -> Dict[str, Any] | None:
+    fp = pathlib.Path(public) / DIR / 'manifest.json'
+    if not fp.exists():
+        return None
+    m = json.loads(fp.read_text())
+    return m if m.get('version') == VERSION else None
+
+
+def fresh(public: pathlib.Path, table: str, m: Dict[str, Any] | None = None) -> bool:
+    """Whether the columnar copy of `table` is at least as new as its JSON."""
+    m = m if m is not None else manifest(public)
+    t = (m or {}).get('tables', {}).get(table)
+    if t is None:
+        return False
+    fp = pathlib.Path(public) / t['source']['file']
+    if not fp.exists():
+        return True
+    st = fp.stat()
+    return st.st_size == t['source']['size'] and st.st_mtime_ns == t['source']['mtime_ns']
+
+
+_IDS: Dict[str, tuple] = {}              # columnar dir → (manifest mtime_ns, ids)
+
+
+def read_ids(public: pathlib.Path) -> np.ndarray:
+    """The shared ids array, read once per manifest: every `read_edges` table
+    refers to the same object, so `GraphIndex` remaps the rows once."""
+    d = (pathlib.Path(public) / DIR).resolve()
+    stamp = (d / 'manifest.json').stat().st_mtime_ns
+    cached = _IDS.get(str(d))
+    if cached is None or cached[0] != stamp:
+        cached = _IDS[str(d)] = (stamp, np.array(list(_string_column(d, 'ids')), dtype=object))
+    return cached[1]
+
+
+def read_nodes(public: pathlib.Path, columns: Sequence[str] | None = None):
+    """nodes.json as a DataFrame, from the columnar copy when it is fresh."""
+    import pandas as pd
+    public = pathlib.Path(public)
+    m = manifest(public)
+    if not fresh(public, 'nodes', m):
+        df = pd.read_json(public / 'nodes.json')
+        return df if columns is None else df[list(columns)]
+    t, d = m['tables']['nodes'], public / DIR
+    cols = columns or list(t['columns'])
+    return pd.DataFrame({k: _read_column(d, f'nodes.{k}', t['columns'][k])
+                         for k in cols})
+
+
+def read_edges(public: pathlib.Path, et: str) -> EdgeTable:
+    """Edges of type `et` (case-insensitive), columnar when fresh, else parsed
+    from `<et>_edges.json`."""
+    public, et = pathlib.Path(public), et.lower()
+    m = manifest(public)
+    if fresh(public, et, m):
+        t, d = m['tables'][et], public / DIR
+        return EdgeTable(t['kind'], read_ids(public), _load(d, f'{et}.src'),
+                         _load(d, f'{et}.dst'), _load(d, f'{et}.weight'),
+                         {k: _load(d, f'{et}.attr.{k}') for k in t['attrs']})
+
+    fp = _edge_files(public).get(et)
+    es = json.loads(fp.read_text()) if fp else []
+    pos: Dict[str, int] = {}
+    ends = [pos.setdefault(e[k], len(pos)) for e in es for k in ('source', 'target')]
+    ends = np.asarray(ends, dtype=np.int32).reshape(-1, 2)
+    attrs = {k: np.asarray([e.get(k) for e in es])
+             for k in dict.fromkeys(k for e in es for k in e)
+             if k not in ('source', 'target', 'type')}
+    return EdgeTable(es[0].get('type', et) if es else et,
+                     np.array(list(pos), dtype=object), ends[:, 0], ends[:, 1],
+                     np.asarray([e.get('weight', 1) for e in es], dtype=np.float32),
+                     attrs)
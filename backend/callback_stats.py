@@ -0,0 +1,80 @@
+"""backend/callback_stats.py
+Latency and response size of the Dash callbacks, per interaction type.
+`timed` wraps a callback and `register` hooks the Flask server: a request
+is timed from `before_request` to `after_request` and sized by the response
+Flask already serialised (Content-Length), so no payload is encoded twice.
+`summary()` is served by app.py at /_stats.
+
+Only the latest `window` samples per kind are kept (p50/p95 over those, the
+call count over all), so a long-running worker's memory stays flat; each call
+is logged at DEBUG level on the `backend.callback_stats` logger.  Samples
+live in the process: under gunicorn, /_stats covers the answering worker.
+"""
+from __future__ import annotations
+import collections, functools, logging, time
+from typing import Callable, Deque, Dict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+WINDOW = 1000
+
+
+class CallbackStats:
+    def __init__(self, log: bool = True, window: int = WINDOW):
+        self.log = log
+        self.samples: Dict[str, Deque[tuple]] = collections.defaultdict(
+            lambda: collections.deque(maxlen=window))
+        self.calls: Dict[str, int] = collections.Counter()
+
+    def record(self, kind: str, seconds: float, nbytes: int, log: bool | None = None):
+        self.samples[kind].append((seconds, nbytes))
+        self.calls[kind] += 1
+        if self.log if log is None else log:
+            logger.debug("%s: %.1f ms, %.1f KB", kind, seconds * 1e3, nbytes / 1024)
+
+    def timed(self, kind_of: Callable[[], str], log: bool | None = None):
+        """Decorator; `kind_of()` names the interaction (called inside the
+        callback, so it may read `dash.ctx`).  Inside a request served by a
+        `register`ed server the sample is taken when the response is done
+        (latency covers serialisation); otherwise the call alone is timed,
+        size 0."""
+        from flask import g, has_request_context
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kw):
+                t0 = time.perf_counter()
+                out = fn(*args, **kw)
+                if has_request_context() and 'callback_t0' in g:
+                    g.callback_kind = (kind_of(), log)
+                else:
+                    self.record(kind_of(), time.perf_counter() - t0, 0, log)
+                return out
+            return inner
+        return wrap
+
+    def register(self, server):
+        """Time and size the `timed` callbacks' requests on the Flask `server`."""
+        from flask import g
+
+        @server.before_request
+        def _start():
+            g.callback_t0 = time.perf_counter()
+
+        @server.after_request
+        def _finish(response):
+            kind = g.pop('callback_kind', None)
+            if kind is not None:
+                self.record(kind[0], time.perf_counter() - g.callback_t0,
+                            response.calculate_content_length() or 0, kind[1])
+            return response
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for kind, s in self.samples.items():
+            sec, nb = np.array(s).T
+            out[kind] = {'calls': self.calls[kind],
+                         'p50_ms': round(float(np.percentile(sec, 50)) * 1e3, 2),
+                         'p95_ms': round(float(np.percentile(sec, 95)) * 1e3, 2),
+                         'mean_kb': round(float(nb.mean()) / 1024, 1)}
+        return out
@@ -0,0 +1,269 @@
+"""backend/citation.py
+Citation graph inside the corpus: which paper cites which, and the node
+metrics derived from it.
+
+Citation strings are resolved to papers through a hashed title index.  Every
+title (as a word slug) is keyed by its first two words, so one vectorised
+lookup over the word pairs of all distinct citation slugs finds the
+candidates; a candidate matches when the whole title occurs as a run of
+words of the citation, and the longest matching title wins.  A title of
+fewer than `SHORT` words ("A Study", "On the Road") occurs in too many
+citations by chance, so it must also be confirmed: the citation names the
+paper's year and its first author's surname.  The directed
+paper × paper matrix (`scipy.sparse`, self-citations dropped) gives
+
+* totalCitations – citations received from the corpus (in-degree),
+* pageRank       – PageRank by sparse power iteration, scaled so the mean
+                   paper scores 1,
+* influence      – citations weighted by the citing paper's recency: one
+                   from `half_life` years before the newest paper counts ½.
+
+Output
+------
+public/citation_metrics.json – id → the three metrics
+
+The metrics are also merged into `nodes.json` (`annotate`): by this stage
+when the file exists, and by `semantic.write` whenever it writes nodes.
+"""
+from __future__ import annotations
+import itertools, json, pathlib, re, time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+from .defaults import DAMPING, HALF_LIFE
+from .load_data import date_columns
+
+METRICS = 'citation_metrics.json'
+MIN_WORDS = 2                  # one-word titles match too much to resolve
+SHORT = 5                      # shorter titles also need their year or surname cited
+TOL, MAX_ITER = 1e-6, 100      # PageRank: stop when Σ|Δ| < n·TOL
+ZERO = {'totalCitations': 0, 'pageRank': 0., 'influence': 0.}
+TAG, PUNCT, SPACE = re.compile(r"<[^>]+>"), re.compile(r"[^\w\s-]"), re.compile(r"\s+")
+# the same, never crossing the NUL between batched texts
+BATCH_TAG, BATCH_PUNCT = re.compile(r"<[^>\0]+>"), re.compile(r"[^\w\s\0-]")
+
+
+def _slug(txt: str) -> str:
+    """Lower-cased words of a citation or title, tags and punctuation removed."""
+    if '<' in txt:
+        txt = TAG.sub("", txt)
+    return SPACE.sub(" ", PUNCT.sub("", txt.lower())).strip()
+
+
+# ───────────────────────────────────────────────────────────── resolution
+def _surname(name: str) -> str:
+    """Last name of "First Last" or "Last, First", as a citation word."""
+    words = _slug(name.split(',')[0] if name.count(',') == 1 else name).split()
+    return words[-1] if words else ''
+
+
+def _tokens(texts: Sequence[str]) -> List[str]:
+    """The words of every text, as `_slug(t).split()`, with a NUL token
+    after each text.  One regex pass and one split over the joined texts,
+    not one per text."""
+    if not texts:
+        return []
+    body = ' \0 '.join(texts) + ' \0'
+    if body.count('\0') != len(texts):                      # NUL inside a text
+        body = ' \0 '.join(t.replace('\0', ' ') for t in texts) + ' \0'
+    if '<' in body:
+        body = BATCH_TAG.sub("", body)
+    return BATCH_PUNCT.sub("", body.lower()).split()
+
+
+def _ids(tokens: List[str], vocab: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """(vocabulary id per word, -1 if unknown; word count per text) of `_tokens`."""
+    flat = np.fromiter(map(vocab.get, tokens, itertools.repeat(-1)), dtype=np.int64,
+                       count=len(tokens))
+    stop = flat == -2
+    size = np.diff(np.r_[-1, np.flatnonzero(stop)]) - 1
+    return flat[~stop], size
+
+
+def resolve(texts: Sequence[str], titles: Sequence[str], min_words: int = MIN_WORDS,
+            years: Sequence[int] | None = None, surnames: Sequence[str] | None = None,
+            short: int = SHORT) -> np.ndarray:
+    """Row in `titles` of the paper each citation text cites, -1 if none.
+
+    A title of fewer than `short` words matches only when the citation also
+    contains its paper's year (0: unknown) and first author's surname ('':
+    unknown) – whichever are known; without either such titles never match."""
+    tw = _tokens(titles)
+    vocab = dict(zip(dict.fromkeys(tw), itertools.count()))
+    # confirming words: year and surname id per title, -3 when unknown
+    confirm = np.full((len(titles), 2), -3, dtype=np.int64)
+    for j, words in enumerate((None if years is None else [str(y) if y > 0 else ''
+                                                           for y in years], surnames)):
+        if words is not None:
+            confirm[:, j] = [vocab.setdefault(w, len(vocab)) if w else -3 for w in words]
+    vocab['\0'] = -2
+    tflat, tlen = _ids(tw, vocab)
+    toff = np.r_[0, np.cumsum(tlen)]
+    V = max(len(vocab), 1)
+    rows = np.flatnonzero(tlen >= min_words)
+    anchor = tflat[toff[rows]] * V + tflat[toff[rows] + 1]
+    order = np.lexsort((rows, anchor))
+    anchor, rows = anchor[order], rows[order]
+
+    flat, slen = _ids(_tokens(texts), vocab)
+    ends = np.cumsum(slen)
+    end = np.repeat(ends, slen)                                 # per word: its text's end
+    match = np.full(len(texts), -1, dtype=np.int64)
+    if not len(rows) or len(flat) < 2:
+        return match
+
+    # candidates: (word position, title) pairs whose first two words agree
+    pos = np.flatnonzero((flat[:-1] >= 0) & (flat[1:] >= 0)
+                         & (end[:-1] > np.arange(1, len(flat))))
+    key = flat[pos] * V + flat[pos + 1]
+    lo, hi = np.searchsorted(anchor, key, 'left'), np.searchsorted(anchor, key, 'right')
+    n = hi - lo
+    pos = np.repeat(pos, n)
+    cand = rows[np.repeat(lo, n) + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)]
+    L = tlen[cand]
+    fits = pos + L <= end[pos]
+    pos, cand, L = pos[fits], cand[fits], L[fits]
+    if not len(pos):
+        return match
+
+    # verify the whole title, word by word
+    start = np.cumsum(L) - L
+    ramp = np.arange(L.sum()) - np.repeat(start, L)
+    same = flat[np.repeat(pos, L) + ramp] == tflat[np.repeat(toff[cand], L) + ramp]
+    ok = np.logical_and.reduceat(same, start)
+    owner = np.searchsorted(ends, pos[ok], 'right')
+    cand, L = cand[ok], L[ok]
+    if (L < short).any():
+        # sorted (text, known word) keys of every citation, probed for the confirming words
+        known = np.flatnonzero(flat >= 0)
+        named = np.unique(np.searchsorted(ends, known, 'right') * V + flat[known])
+        year, name = confirm[cand, 0], confirm[cand, 1]
+        has = lambda w: (w < 0) | np.isin(owner * V + w, named)     # unknown: no veto
+        keep = (L >= short) | (((year >= 0) | (name >= 0)) & has(year) & has(name))
+        owner, cand, L = owner[keep], cand[keep], L[keep]
+    best = np.lexsort((cand, -L, owner))                        # longest title, then row
+    owner, first = np.unique(owner[best], return_index=True)
+    match[owner] = cand[best][first]
+    return match
+
+
+def matrix(papers: Sequence[Dict], short: int = SHORT):
+    """(unique paper ids, their row per paper, binary CSR citing × cited).
+
+    Papers sharing an id collapse into one row (title, year and first author
+    of the first), as in `sharedref`.  Each distinct citation string is
+    resolved once."""
+    import scipy.sparse as sp
+    row_of: Dict[str, int] = {}
+    titles: List[str] = []
+    surnames: List[str] = []
+    head: List[int] = []
+    prow = np.empty(len(papers), dtype=np.int64)
+    for k, p in enumerate(papers):
+        r = prow[k] = row_of.setdefault(p['id'], len(row_of))
+        if r == len(titles):
+            titles.append(p['title'] or '')
+            surnames.append(_surname(p['authors'][0]) if p['authors'] else '')
+            head.append(k)
+    years = date_columns(papers)[1][head]
+    raws = list(itertools.chain.from_iterable(p['citations_raw'].values() for p in papers))
+    count = np.fromiter((len(p['citations_raw']) for p in papers), dtype=np.int64,
+                        count=len(papers))
+    first: Dict[str, int] = {}                     # text → its first position in raws
+    pos = np.fromiter(map(first.setdefault, raws, itertools.count()), dtype=np.int64,
+                      count=len(raws))
+    target = np.full(len(raws), -1, dtype=np.int64)
+    target[list(first.values())] = resolve(list(first), titles, years=years.tolist(),
+                                           surnames=surnames, short=short)
+    target = target[pos]
+    src = np.repeat(prow, count)
+    keep = (target >= 0) & (target != src)
+    n = len(row_of)
+    C = sp.csr_matrix((np.ones(keep.sum(), dtype=np.float64), (src[keep], target[keep])),
+                      shape=(n, n))
+    C.data[:] = 1                                             # cited once per paper
+    print(f"[citation] {len(raws)} citations ({len(first)} distinct) → "
+          f"{C.nnz} in-corpus links")
+    return list(row_of), prow, C
+
+
+# ──────────────────────────────────────────────────────────────── metrics
+def pagerank(C, damping: float = DAMPING, tol: float = TOL,
+             max_iter: int = MAX_ITER) -> np.ndarray:
+    """PageRank of the citing → cited matrix `C` (sums to 1); dangling
+    papers spread their rank uniformly."""
+    n = C.shape[0]
+    if not n:
+        return np.zeros(0)
+    out = np.asarray(C.sum(axis=1)).ravel()
+    dangling = out == 0
+    inv = np.where(dangling, 0., 1. / np.maximum(out, 1))
+    CT = C.T.tocsr()
+    x = np.full(n, 1. / n)
+    for it in range(1, max_iter + 1):
+        nxt = damping * (CT @ (x * inv)) + (damping * x[dangling].sum() + 1 - damping) / n
+        err = np.abs(nxt - x).sum()
+        x = nxt
+        if err < n * tol:
+            break
+    print(f"[citation] PageRank converged in {it} iterations (Σ|Δ| {err:.1e})")
+    return x
+
+
+def influence(C, years: np.ndarray, half_life: float = HALF_LIFE) -> np.ndarray:
+    """Citations received, each weighted 2^(-age / half_life) by the citing
+    paper's age relative to the newest one (undated papers weigh 0)."""
+    dated = years > 0
+    if not dated.any():
+        return np.zeros(C.shape[0])
+    w = np.where(dated, np.exp2(-(years.max() - years) / half_life), 0.)
+    return C.T @ w
+
+
+def metrics(papers: Sequence[Dict], damping: float = DAMPING,
+            half_life: float = HALF_LIFE) -> Dict[str, Dict]:
+    """id → {totalCitations, pageRank, influence}."""
+    ids, prow, C = matrix(papers)
+    head = np.unique(prow, return_index=True)[1]      # first paper of each row, as in `matrix`
+    years = date_columns(papers)[1][head].astype(np.int64)
+    cited = np.asarray(C.sum(axis=0)).ravel().astype(np.int64)
+    pr = pagerank(C, damping) * len(ids)
+    infl = influence(C, years, half_life)
+    return {nid: {'totalCitations': k, 'pageRank': round(r, 4), 'influence': round(f, 4)}
+            for nid, k, r, f in zip(ids, cited.tolist(), pr.tolist(), infl.tolist())}
+
+
+# ───────────────────────────────────────────────────────────────── output
+def read(out_dir: pathlib.Path) -> Dict[str, Dict]:
+    """The metrics last written into `out_dir`, or {} before any run."""
+    fp = pathlib.Path(out_dir) / METRICS
+    return json.loads(fp.read_text()) if fp.exists() else {}
+
+
+def annotate(nodes: List[Dict], metrics: Dict[str, Dict]) -> List[Dict]:
+    """Set every node's citation metrics in place (zero when unknown)."""
+    for n in nodes:
+        n.update(metrics.get(n['id'], ZERO))
+    return nodes
+
+
+def write(metrics: Dict[str, Dict], out_dir: pathlib.Path, nodes: bool = True):
+    (out_dir / METRICS).write_text(json.dumps(metrics, indent=2))
+    nodes_fp = out_dir / 'nodes.json'
+    if nodes and nodes_fp.exists():
+        nodes_fp.write_text(json.dumps(annotate(json.loads(nodes_fp.read_text()), metrics),
+                                       indent=2))
+    print(f"[citation] wrote {METRICS} (papers: {len(metrics)})"
+          + (", updated nodes.json" if nodes and nodes_fp.exists() else ""))
+
+
+def build(papers: List[Dict], out_dir: pathlib.Path, damping: float = DAMPING,
+          half_life: float = HALF_LIFE, nodes: bool = True):
+    """Resolve in-corpus citations and write their metrics (merged into an
+    existing nodes.json too, unless `nodes` is False)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    m = metrics(papers, damping, half_life)
+    write(m, out_dir, nodes)
+    print(f"[citation] {len(m)} papers in {time.perf_counter() - t0:.2f}s")
+    return m
@@ -1,5 +1,15 @@
-import argparse, pathlib
-from . import load_data, semantic, sharedref, lineage, density
+import argparse, json, pathlib
+# only the light defaults at import time: each subcommand imports its own stages
+from .defaults import BURST_GAMMA, BURST_SCALE, DAMPING, DTYPES, HALF_LIFE, KNN_ENGINES, \
+    LAYOUTS, LINEAGE_MODES, MODEL, PROFILERS, REF_THRESHOLD, TREND_BINS, TREND_WINDOW
+
+def temporal_spec(spec):
+    from .knn import parse_window
+    try:
+        parse_window(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
 
 def main():
     p = argparse.ArgumentParser(description="Build graph JSON files")
@@ -8,8 +18,13 @@ def main():
     def common(x):
         x.add_argument("--json_dir", default="data")
         x.add_argument("--out_dir",  default="public")
+        x.add_argument("--workers", type=int, default=None,
+                       help="JSON parsing processes (default: all cores)")
+        x.add_argument("--columnar", action="store_true",
+                       help="also write memory-mappable copies to <out_dir>/columnar/")
 
-    for name in ("semantic","citation","sharedref","lineage","density","institution","all"):
+    for name in ("semantic","citation","sharedref","lineage","density","trends","search",
+                 "institution","all"):
         common(sub.add_parser(name))
 
     # semantic params
@@ -17,19 +32,190 @@ def main():
         sg=sub.choices[name]
         sg.add_argument("--top_k", type=int, default=5)
         sg.add_argument("--sim_threshold", type=float, default=.60)
+        sg.add_argument("--embed_cache", default=None,
+                        help="embedding store dir (default: <out_dir>/.embed_cache)")
+        sg.add_argument("--embed_cache_mb", type=float, default=512,
+                        help="evict least-recently-used vectors beyond this size")
+        sg.add_argument("--no_embed_cache", action="store_true")
+        sg.add_argument("--embed_workers", type=int, default=1,
+                        help="encoding processes (0: one per core)")
+        sg.add_argument("--embed_dtype", choices=DTYPES, default="float32",
+                        help="store / compare embeddings at this precision")
+        sg.add_argument("--batch_tokens", type=int, default=0,
+                        help="encode length-sorted batches of at most this many padded "
+                             "tokens (0: fixed batches of 32)")
+        sg.add_argument("--knn", choices=sorted(KNN_ENGINES), default="exact",
+                        help="nearest-neighbour engine (ivf/lsh are approximate)")
+        sg.add_argument("--temporal", nargs="+", type=temporal_spec, default=[],
+                        metavar="WINDOW",
+                        help="also write semantic_<window>_edges.json with neighbours "
+                             "searched only in a year window: past, past:N or window:N")
+        sg.add_argument("--layout", choices=LAYOUTS, default="rank",
+                        help="yPx: rank along PC1, or projection onto an incremental-PCA "
+                             "basis kept in <out_dir>/.layout.npz (stable across rebuilds)")
+        sg.add_argument("--min_gap", type=float, default=0,
+                        help="push apart same-year nodes closer than this many px")
+        sg.add_argument("--refit_layout", action="store_true",
+                        help="refit the --layout ipca basis instead of reusing it")
+
+    # sharedref params
+    for name in ("sharedref","all"):
+        sg=sub.choices[name]
+        sg.add_argument("--min_shared", type=int, default=2)
+        sg.add_argument("--normalize", choices=("jaccard","cosine"), default=None,
+                        help="add a normalised coupling `score` to each edge")
+        sg.add_argument("--canonicalize_refs", action="store_true",
+                        help="merge near-duplicate citation strings (pages, editions, "
+                             "punctuation) before counting shared references")
+        sg.add_argument("--ref_threshold", type=float, default=REF_THRESHOLD,
+                        help="word Jaccard at which two citations are the same work")
+
+    # citation params
+    for name in ("citation","all"):
+        sg=sub.choices[name]
+        sg.add_argument("--damping", type=float, default=DAMPING,
+                        help="PageRank damping factor")
+        sg.add_argument("--half_life", type=float, default=HALF_LIFE,
+                        help="years after which a citation counts half towards influence")
+
+    # lineage params
+    for name in ("lineage","all"):
+        sg=sub.choices[name]
+        sg.add_argument("--lineage_authors", choices=LINEAGE_MODES, default="all",
+                        help="thread the papers of every author, or only of first authors")
+        sg.add_argument("--author_aliases", default=None, metavar="FILE",
+                        help="JSON object mapping author name variants to canonical names")
+
+    # trends params
+    for name in ("trends","all"):
+        sg=sub.choices[name]
+        sg.add_argument("--trend_bin", choices=TREND_BINS, default="month",
+                        help="time bin of the keyword series (issue: each publication date)")
+        sg.add_argument("--burst_scale", type=float, default=BURST_SCALE,
+                        help="keyword rate in a burst, relative to its overall rate")
+        sg.add_argument("--burst_gamma", type=float, default=BURST_GAMMA,
+                        help="cost of entering a burst (higher: fewer, longer bursts)")
+        sg.add_argument("--trend_window", type=int, default=TREND_WINDOW,
+                        help="bins behind each rolling z-score")
+
+    # stage scheduling
+    for name in ("semantic","citation","sharedref","lineage","density","trends","search",
+                 "all"):
+        sg=sub.choices[name]
+        sg.add_argument("--jobs", type=int, default=None,
+                        help="stages run concurrently (default: one per core)")
+        sg.add_argument("--force", action="store_true",
+                        help="rebuild stages whose inputs and code are unchanged")
+        sg.add_argument("--profile", nargs="+", default=[], metavar="STAGE",
+                        help="profile these stages into <out_dir>/.profile/")
+        sg.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+
+    # incremental rebuild of `all`
+    ag=sub.choices["all"]
+    ag.add_argument("--incremental", action="store_true",
+                    help="only reprocess new/changed/deleted files")
+    ag.add_argument("--state", default=None,
+                    help="incremental state file (default: <out_dir>/.incremental_state.pkl)")
 
     args = p.parse_args()
-    papers = load_data.load(pathlib.Path(args.json_dir))
     out    = pathlib.Path(args.out_dir); out.mkdir(exist_ok=True)
-
+    cache  = encoder = aliases = None
+    if args.cmd in ("lineage","all") and args.author_aliases:
+        aliases = json.loads(pathlib.Path(args.author_aliases).read_text())
     if args.cmd in ("semantic","all"):
-        semantic.build(papers, out, args.top_k, args.sim_threshold)
-    if args.cmd in ("sharedref","all"):
-        sharedref.build(papers, out)
-    if args.cmd in ("lineage","all"):
-        lineage.build(papers, out)
-    if args.cmd in ("density","all"):
-        density.build(papers, out)
+        from .embedder import Encoder
+        encoder = Encoder(MODEL, workers=args.embed_workers, dtype=args.embed_dtype,
+                          batch_tokens=args.batch_tokens)
+    if encoder and not args.no_embed_cache:
+        from .embed_cache import EmbeddingStore
+        cache = EmbeddingStore(pathlib.Path(args.embed_cache or out/".embed_cache"),
+                               encoder.model, args.embed_cache_mb, encoder.dtype)
+
+    if args.cmd == "all" and args.incremental:
+        if args.normalize:
+            p.error("--normalize is not supported with --incremental")
+        if args.canonicalize_refs:
+            p.error("--canonicalize_refs is not supported with --incremental")
+        if args.knn != "exact":
+            p.error("--incremental requires the deterministic --knn exact")
+        from . import incremental
+        incremental.build_all(pathlib.Path(args.json_dir), out,
+                              args.top_k, args.sim_threshold,
+                              pathlib.Path(args.state) if args.state else None, cache,
+                              args.min_shared, encoder, args.temporal,
+                              args.layout, args.min_gap, args.refit_layout,
+                              args.damping, args.half_life,
+                              args.lineage_authors, aliases, args.trend_bin,
+                              args.burst_scale, args.burst_gamma, args.trend_window)
+    else:
+        # stage modules are imported per subcommand: `density` never loads the
+        # embedding model, sklearn or scipy
+        from . import corpus
+        from .scheduler import Stage, run
+        papers = corpus.load(pathlib.Path(args.json_dir), args.workers)
+
+        stages = []
+        if args.cmd in ("semantic","all"):
+            from . import semantic
+            stages.append(Stage("semantic", semantic.build, None,
+                                ("nodes.json", "semantic_edges.json",
+                                 *map(semantic.temporal_file, args.temporal)),
+                                code=("backend.knn", "backend.embed_cache",
+                                      "backend.embedder", "backend.layout",
+                                      "backend.load_data", "backend.citation"),
+                                kwargs=dict(top_k=args.top_k, sim_th=args.sim_threshold,
+                                            cache=cache, engine=args.knn, encoder=encoder,
+                                            temporal=tuple(args.temporal),
+                                            placement=args.layout, min_gap=args.min_gap,
+                                            refit=args.refit_layout)))
+        if args.cmd in ("citation","all"):
+            from . import citation
+            # merges its metrics into the nodes.json semantic writes
+            stages.append(Stage("citation", citation.build,
+                                ("id", "title", "authors", "citations_raw", "years"),
+                                ("citation_metrics.json",),
+                                after=("semantic",) if args.cmd == "all" else (),
+                                kwargs=dict(damping=args.damping,
+                                            half_life=args.half_life)))
+        if args.cmd in ("sharedref","all"):
+            from . import sharedref
+            stages.append(Stage("sharedref", sharedref.build, ("id", "citations_raw"),
+                                (sharedref.EDGES,), code=("backend.refs",),
+                                kwargs=dict(min_shared=args.min_shared,
+                                            normalize=args.normalize,
+                                            canonicalize=args.canonicalize_refs,
+                                            ref_threshold=args.ref_threshold)))
+        if args.cmd in ("lineage","all"):
+            from . import lineage
+            stages.append(Stage("lineage", lineage.build, ("id", "authors", "dates"),
+                                ("lineage_edges.json",), code=("backend.load_data",),
+                                kwargs=dict(authors=args.lineage_authors,
+                                            aliases=aliases)))
+        if args.cmd in ("density","all"):
+            from . import density
+            stages.append(Stage("density", density.build, ("years",),
+                                ("year_density.json",), code=("backend.load_data",)))
+        if args.cmd in ("trends","all"):
+            from . import trends
+            stages.append(Stage("trends", trends.build, ("keywords", "dates"),
+                                (trends.TRENDS,), code=("backend.load_data",),
+                                kwargs=dict(by=args.trend_bin, scale=args.burst_scale,
+                                            gamma=args.burst_gamma,
+                                            window=args.trend_window)))
+        if args.cmd in ("search","all"):
+            from . import search
+            stages.append(Stage("search", search.build,
+                                ("id", "title", "authors", "keywords", "abstract"),
+                                ("search_index.json",)))
+        if stages:
+            run(stages, papers, out, jobs=args.jobs, force=args.force,
+                profile=args.profile, profiler=args.profiler)
+
+    if encoder:
+        encoder.close()
+    if args.columnar:
+        from . import artifacts
+        artifacts.export(out)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,164 @@
+"""backend/corpus.py
+Compact columnar in-memory corpus.  Instead of one dict per paper holding the
+full abstract and raw citation dict, text fields live in shared UTF-8 byte
+buffers addressed by int64 offsets, authors are interned to int32 ids, and
+dates/years are NumPy arrays.
+
+`Corpus` is still a `Sequence` of paper dicts – indexing materialises the same
+record `load_data.record` returns – so every stage keeps working unchanged,
+while stages that only need a column can read it directly.
+"""
+from __future__ import annotations
+import array, pathlib
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List
+import numpy as np
+
+from . import load_data
+
+
+class StringColumn(Sequence):
+    """Many strings in one UTF-8 buffer; item i is buf[off[i]:off[i+1]]."""
+
+    def __init__(self, buf: bytes | bytearray, offsets: np.ndarray):
+        self.buf, self.offsets = buf, offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.buf[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buf) + self.offsets.nbytes
+
+
+class _StringBuilder:
+    def __init__(self):
+        self.buf = bytearray(); self.off = array.array('q', [0])
+
+    def add(self, s: str):
+        self.buf += s.encode('utf-8'); self.off.append(len(self.buf))
+
+    def build(self) -> StringColumn:
+        # hand the bytearray over as-is: bytes() would briefly double the peak
+        return StringColumn(self.buf, np.frombuffer(self.off, dtype=np.int64).copy())
+
+
+class Ragged:
+    """Variable-length lists: values[offsets[i]:offsets[i+1]] belong to row i."""
+
+    def __init__(self, values, offsets: np.ndarray):
+        self.values, self.offsets = values, offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def row(self, i: int):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+class Corpus(Sequence):
+    """Columnar corpus; see module docstring."""
+
+    def __init__(self, *, ids, title, abstract, date_raw, date, keywords,
+                 author_names, authors, cite_keys, cite_texts, dates, years):
+        self.ids: List[str] = ids
+        self.title, self.abstract = title, abstract          # StringColumn
+        self.date_raw, self.date = date_raw, date            # StringColumn
+        self.keywords = keywords                             # Ragged[StringColumn]
+        self.author_names: List[str] = author_names          # interned table
+        self.authors = authors                               # Ragged[int32 ids]
+        self.cite_keys, self.cite_texts = cite_keys, cite_texts   # Ragged[StringColumn]
+        self.dates: np.ndarray = dates                       # datetime64[D], NaT if invalid
+        self.years: np.ndarray = years                       # int16, 0 if invalid
+
+    @property
+    def date_valid(self) -> np.ndarray:
+        """Mask of the papers whose `date_raw` parsed."""
+        return ~np.isnat(self.dates)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        kw, ck, ct = self.keywords, self.cite_keys, self.cite_texts
+        return {
+            "id"        : self.ids[i],
+            "title"     : self.title[i],
+            "authors"   : [self.author_names[a] for a in self.authors.row(i).tolist()],
+            "date_raw"  : self.date_raw[i],
+            "date"      : self.date[i],
+            "keywords"  : [kw.values[j] for j in range(kw.offsets[i], kw.offsets[i + 1])],
+            "abstract"  : self.abstract[i],
+            "citations_raw": {ck.values[j]: ct.values[j]
+                              for j in range(ck.offsets[i], ck.offsets[i + 1])},
+        }
+
+    @property
+    def nbytes(self) -> int:
+        cols = (self.title, self.abstract, self.date_raw, self.date,
+                self.keywords.values, self.cite_keys.values, self.cite_texts.values)
+        arrays = (self.keywords.offsets, self.authors.values, self.authors.offsets,
+                  self.cite_keys.offsets, self.dates, self.years)
+        return sum(c.nbytes for c in cols) + sum(a.nbytes for a in arrays)
+
+    # ───────────────────────────────────────────────────────────── building
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "Corpus":
+        """Build from a stream of `load_data.record` dicts without keeping
+        them; each record can be garbage-collected as soon as it is added."""
+        ids: List[str] = []
+        title, abstract, date_raw, date = (_StringBuilder() for _ in range(4))
+        kw, ck, ct = _StringBuilder(), _StringBuilder(), _StringBuilder()
+        kw_off, cite_off = array.array('q', [0]), array.array('q', [0])
+        author_of: Dict[str, int] = {}
+        auth, auth_off = array.array('i'), array.array('q', [0])
+        raw_dates: Dict[str, int] = {}              # distinct date_raw → code
+        date_code = array.array('q')
+
+        for p in records:
+            ids.append(p['id'])
+            title.add(p['title']); abstract.add(p['abstract'] or '')
+            date_raw.add(p['date_raw']); date.add(p['date'])
+            for k in p['keywords']:
+                kw.add(k)
+            kw_off.append(len(kw.off) - 1)
+            for a in p['authors']:
+                auth.append(author_of.setdefault(a, len(author_of)))
+            auth_off.append(len(auth))
+            for k, v in p['citations_raw'].items():
+                ck.add(k); ct.add(v)
+            cite_off.append(len(ck.off) - 1)
+            date_code.append(raw_dates.setdefault(p['date_raw'], len(raw_dates)))
+
+        off = lambda a: np.frombuffer(a, dtype=np.int64).copy()
+        dates, years, _ = load_data.parse_dates(list(raw_dates))
+        codes = np.frombuffer(date_code, dtype=np.int64)
+        dates, years = dates[codes], years[codes]
+        return cls(ids=ids, title=title.build(), abstract=abstract.build(),
+                   date_raw=date_raw.build(), date=date.build(),
+                   keywords=Ragged(kw.build(), off(kw_off)),
+                   author_names=list(author_of),
+                   authors=Ragged(np.frombuffer(auth, dtype=np.int32).copy(), off(auth_off)),
+                   cite_keys=Ragged(ck.build(), off(cite_off)),
+                   cite_texts=Ragged(ct.build(), off(cite_off)),
+                   dates=dates, years=years)
+
+
+def load(json_dir: pathlib.Path, workers: int | None = None) -> Corpus:
+    """Parse `json_dir` across a process pool straight into a `Corpus`."""
+    return Corpus.from_records(load_data.iter_papers(json_dir, workers))
+
+
+def as_corpus(papers) -> Corpus:
+    """Pass a `Corpus` through; convert a list of records."""
+    return papers if isinstance(papers, Corpus) else Corpus.from_records(papers)
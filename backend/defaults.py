@@ -0,0 +1,17 @@
+"""backend/defaults.py
+Option choices and defaults shared by the CLI and the stage modules.  Import
+nothing here: `cli` builds its parser from these, so e.g. `cli density` never
+loads the embedding, kNN or citation modules.
+"""
+MODEL = 'all-MiniLM-L6-v2'
+DTYPES = ('float32', 'float16', 'int8')
+KNN_ENGINES = ('exact', 'sklearn', 'ivf', 'lsh')
+LAYOUTS = ('rank', 'ipca')
+PROFILERS = ('cprofile', 'pyinstrument')
+REF_THRESHOLD = .8             # word Jaccard at which two citations are the same work
+DAMPING = .85
+HALF_LIFE = 10.                # years
+LINEAGE_MODES = ('all', 'first')
+TREND_BINS = ('month', 'quarter', 'issue')
+BURST_SCALE, BURST_GAMMA = 2., 1.   # burst rate multiplier, cost of entering a burst
+TREND_WINDOW = 12              # bins behind each rolling z-score
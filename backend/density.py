@@ -1,25 +1,34 @@
 """backend/density.py
 Computes how many papers appear in each calendar year.  Output is a simple
-{"YYYY": count} mapping consumed by the Density/Burst view.
+{"YYYY": count} mapping behind the app's zoomed-out density bins
+(`backend.viewport`); finer bins and keyword bursts are `backend.trends`.
 """
 from __future__ import annotations
 import json, pathlib, collections
 from typing import List, Dict
-from .load_data import safe_parse_date  # reuse robust date parser
+import numpy as np
+from .load_data import safe_parse_date, date_columns  # reuse robust date parser
+
+
+def paper_year(p: Dict) -> int | None:
+    dt = safe_parse_date(p['date_raw'])
+    return dt.year if dt else None
+
+
+def write(year_counts: Dict[int, int], out_dir: pathlib.Path):
+    (out_dir / 'year_density.json').write_text(
+        json.dumps(dict(sorted(year_counts.items())), indent=2))
+    print(f"[density] wrote year_density.json (years: {len(year_counts)})")
 
 
 def build(papers: List[Dict], out_dir: pathlib.Path):
     """Write year_density.json (count of papers per year)."""
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    year_counts = collections.Counter()
-    for p in papers:
-        dt = safe_parse_date(p['date_raw'])
-        if dt:
-            year_counts[dt.year] += 1
+    _, years, valid = date_columns(papers)
+    year, count = np.unique(years[valid], return_counts=True)
+    year_counts = collections.Counter(dict(zip(year.tolist(), count.tolist())))
 
-    (out_dir / 'year_density.json').write_text(
-        json.dumps(dict(year_counts), indent=2))
-    print(f"[density] wrote year_density.json (years: {len(year_counts)})")
+    write(year_counts, out_dir)
 
     return year_counts
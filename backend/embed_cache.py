@@ -0,0 +1,176 @@
+"""backend/embed_cache.py
+Persistent embedding store so `semantic` only encodes documents it has not
+seen before.  Each model gets its own sub-directory holding
+
+* vectors.npy – float32 (or float16 / int8, see `backend.embedder`) matrix,
+  memory-mapped and grown by doubling
+* index.json  – text hash → [row, last-used run], plus free rows
+
+Entries are keyed by (model name, sha1 of the document text).  When the store
+exceeds its size budget the least-recently-used entries are evicted and their
+rows reused; once more than half the rows are free, `save` compacts
+vectors.npy (live rows moved to the front, the file truncated), so the budget
+also bounds the file on disk.
+"""
+from __future__ import annotations
+import hashlib, json, os, pathlib, re
+from typing import List, Sequence, Tuple
+import numpy as np
+
+from .embedder import dequantize, quantize
+
+MIN_ROWS = 1024                # capacity kept after compaction / first growth
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """LRU-evicted, memory-mapped embedding matrix for one model."""
+
+    def __init__(self, root: pathlib.Path, model: str, max_mb: float = 512,
+                 dtype: str = 'float32'):
+        self.root, self.model, self.max_mb = pathlib.Path(root), model, max_mb
+        self.dtype = dtype
+        name = model if dtype == 'float32' else f"{model}.{dtype}"
+        self.dir = pathlib.Path(root) / re.sub(r'[^\w.-]', '_', name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_mb * 2**20
+        self.vec_path, self.idx_path = self.dir / 'vectors.npy', self.dir / 'index.json'
+
+        meta = json.loads(self.idx_path.read_text()) if self.idx_path.exists() else {}
+        self.index: dict = meta.get('index', {})
+        self.free: List[int] = meta.get('free', [])
+        self.run: int = meta.get('run', 0) + 1
+        self.vectors = (np.load(self.vec_path, mmap_mode='r+')
+                        if self.vec_path.exists() else None)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __reduce__(self):
+        # a worker process re-opens the store from disk instead of copying it
+        return EmbeddingStore, (self.root, self.model, self.max_mb, self.dtype)
+
+    # ─────────────────────────────────────────────────────────────── access
+    def lookup(self, keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions in `keys` that hit, their store rows); marks hits used."""
+        pos, rows = [], []
+        for i, k in enumerate(keys):
+            hit = self.index.get(k)
+            if hit is not None:
+                hit[1] = self.run
+                pos.append(i); rows.append(hit[0])
+        return np.asarray(pos, dtype=np.intp), np.asarray(rows, dtype=np.intp)
+
+    def put(self, keys: Sequence[str], vecs: np.ndarray):
+        vecs = quantize(dequantize(vecs), self.dtype)
+        if not len(keys):
+            return
+        self._reserve(vecs.shape[1], len(keys))
+        for k, v in zip(keys, vecs):
+            if k in self.index:
+                row = self.index[k][0]
+            else:
+                row = self.free.pop()
+            self.vectors[row] = v
+            self.index[k] = [row, self.run]
+
+    def get(self, keys: Sequence[str], encode) -> np.ndarray:
+        """float32 matrix for `keys`; `encode(positions)` is called once per
+        distinct missing key and its vectors are stored."""
+        if not len(keys):                  # a fresh store does not know its dim yet
+            self.hits = self.misses = 0
+            return np.empty((0, 0 if self.vectors is None else self.vectors.shape[1]),
+                            dtype=np.float32)
+        pos, rows = self.lookup(keys)
+        hit = np.zeros(len(keys), dtype=bool); hit[pos] = True
+        first: dict = {}
+        for i in np.flatnonzero(~hit).tolist():
+            first.setdefault(keys[i], i)
+        uniq = list(first.values())
+        new = dequantize(encode(uniq)) if uniq else None
+
+        dim = new.shape[1] if new is not None else self.vectors.shape[1]
+        out = np.empty((len(keys), dim), dtype=np.float32)
+        if len(pos):
+            out[pos] = dequantize(self.vectors[rows])
+        if new is not None:
+            slot = {keys[i]: j for j, i in enumerate(uniq)}
+            miss = np.flatnonzero(~hit)
+            out[miss] = new[[slot[keys[i]] for i in miss.tolist()]]
+            self.put([keys[i] for i in uniq], new)
+        self.hits, self.misses = len(pos), len(uniq)
+        return out
+
+    # ──────────────────────────────────────────────────────────── storage
+    def _reserve(self, dim: int, n: int):
+        """Make sure `n` free rows exist, growing vectors.npy by doubling."""
+        if self.vectors is not None and self.vectors.shape[1] != dim:
+            raise ValueError(f"{self.dir}: cached dim {self.vectors.shape[1]} != {dim}")
+        need = n - len(self.free)
+        if need <= 0:
+            return
+        cap = 0 if self.vectors is None else self.vectors.shape[0]
+        new_cap = max(cap * 2, cap + need, MIN_ROWS)
+        tmp = self.dir / 'vectors.tmp.npy'
+        grown = np.lib.format.open_memmap(tmp, mode='w+', dtype=self.dtype,
+                                          shape=(new_cap, dim))
+        if cap:
+            grown[:cap] = self.vectors
+        grown.flush(); del grown
+        self.vectors = None
+        os.replace(tmp, self.vec_path)
+        self.vectors = np.load(self.vec_path, mmap_mode='r+')
+        self.free.extend(range(new_cap - 1, cap - 1, -1))
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the budget is met; entries
+        used in the current run are never evicted."""
+        if self.vectors is None:
+            return 0
+        limit = int(self.max_bytes // (self.vectors.shape[1] * self.vectors.itemsize))
+        excess = len(self.index) - limit
+        if excess <= 0:
+            return 0
+        victims = sorted((v[1], k) for k, v in self.index.items() if v[1] < self.run)
+        for _, k in victims[:excess]:
+            self.free.append(self.index.pop(k)[0])
+        return min(excess, len(victims))
+
+    def compact(self) -> bool:
+        """Rewrite vectors.npy with only the live rows (plus headroom up to
+        MIN_ROWS) when more than half of it is free."""
+        if self.vectors is None:
+            return False
+        cap = self.vectors.shape[0]
+        new_cap = max(len(self.index), MIN_ROWS)
+        if len(self.free) * 2 <= cap or new_cap >= cap:
+            return False
+        keys = list(self.index)
+        rows = np.fromiter((self.index[k][0] for k in keys), dtype=np.intp, count=len(keys))
+        order = np.argsort(rows)                    # sequential reads of the old file
+        tmp = self.dir / 'vectors.tmp.npy'
+        packed = np.lib.format.open_memmap(tmp, mode='w+', dtype=self.dtype,
+                                           shape=(new_cap, self.vectors.shape[1]))
+        packed[:len(keys)] = self.vectors[rows[order]]
+        packed.flush(); del packed
+        for new, i in enumerate(order.tolist()):
+            self.index[keys[i]][0] = new
+        self.vectors = None
+        os.replace(tmp, self.vec_path)
+        self.vectors = np.load(self.vec_path, mmap_mode='r+')
+        self.free = list(range(new_cap - 1, len(keys) - 1, -1))
+        return True
+
+    def save(self):
+        evicted = self.evict()
+        self.compact()
+        if self.vectors is not None:
+            self.vectors.flush()
+        tmp = self.idx_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'run': self.run, 'index': self.index,
+                                   'free': self.free}))
+        os.replace(tmp, self.idx_path)
+        return evicted
@@ -0,0 +1,164 @@
+"""backend/embedder.py
+Sentence-embedding encoder shared by the semantic stages.
+
+* one model handle per (model, device) for the life of the process, so every
+  stage and incremental update in a run loads it once
+* documents are encoded in fixed batches of `BATCH` (the model length-sorts
+  within each call); opt-in `batch_tokens` instead sorts them by length and
+  cuts batches under a padded-token budget – measured no faster with
+  sentence-transformers, whose own sort already keeps padding low
+* optionally a pool of worker processes, each holding its own model and an
+  equal share of the CPU threads, encodes the batches concurrently
+* vectors come back as float32, or as float16 / int8 (scaled by 127; the
+  vectors are unit length) for half / a quarter of the storage
+
+Every `encode` prints its throughput in docs/s.
+"""
+from __future__ import annotations
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import List, Sequence
+import numpy as np
+
+from .defaults import DTYPES, MODEL
+MAX_TOKENS = 256            # the model truncates longer inputs
+BATCH = 32                  # documents per model batch without a token budget
+INT8_SCALE = 127
+
+_MODELS: dict = {}
+
+
+def model(name: str = MODEL, device: str | None = None):
+    """The process-wide `SentenceTransformer` for (name, device)."""
+    if (name, device) not in _MODELS:
+        from sentence_transformers import SentenceTransformer
+        _MODELS[name, device] = SentenceTransformer(name, device=device)
+    return _MODELS[name, device]
+
+
+# ───────────────────────────────────────────────────────────────── dtypes
+def quantize(vecs: np.ndarray, dtype: str) -> np.ndarray:
+    """float32 unit vectors → `dtype` storage."""
+    vecs = np.asarray(vecs, dtype=np.float32)
+    if dtype == 'int8':
+        return np.clip(np.rint(vecs * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+    return vecs.astype(dtype, copy=False)
+
+
+def dequantize(vecs: np.ndarray) -> np.ndarray:
+    """Any `quantize`d matrix → float32."""
+    vecs = np.asarray(vecs)
+    if vecs.dtype == np.int8:
+        return vecs.astype(np.float32) / INT8_SCALE
+    return vecs.astype(np.float32, copy=False)
+
+
+# ─────────────────────────────────────────────────────────────── batching
+def n_tokens(doc: str) -> int:
+    """Cheap word-piece count estimate (~4 characters per token)."""
+    return min(len(doc) // 4 + 2, MAX_TOKENS)
+
+
+def batches(docs: Sequence[str], batch_tokens: int = 32 * MAX_TOKENS,
+            max_batch: int = 512) -> List[np.ndarray]:
+    """Positions of `docs`, longest first, cut so that each batch's padded
+    size (rows × its longest row) stays within `batch_tokens`."""
+    lengths = np.fromiter((n_tokens(d) for d in docs), dtype=np.int64, count=len(docs))
+    order = np.argsort(-lengths, kind='stable')
+    out, start = [], 0
+    while start < len(order):
+        # rows are sorted, so the first row is the batch's longest
+        size = int(min(max(batch_tokens // lengths[order[start]], 1), max_batch))
+        out.append(order[start:start + size])
+        start += size
+    return out
+
+
+# ──────────────────────────────────────────────────────────────── workers
+_worker: dict = {}
+
+
+def _init_worker(name: str, device: str | None, threads: int):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker['model'] = model(name, device)
+
+
+def _encode_batch(docs: List[str], size: int) -> np.ndarray:
+    return _worker['model'].encode(docs, batch_size=size, show_progress_bar=False,
+                                   normalize_embeddings=True)
+
+
+class Encoder:
+    """Batched, optionally multi-process encoder; see module docstring.
+
+    The worker pool is started on first use and kept until `close()`, so
+    repeated `encode` calls reuse the loaded models."""
+
+    def __init__(self, model: str = MODEL, *, workers: int = 1, dtype: str = 'float32',
+                 batch_tokens: int = 0, device: str | None = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, not {dtype!r}")
+        self.model, self.dtype, self.device = model, dtype, device
+        self.workers = max(workers or os.cpu_count() or 1, 1)      # None: every core
+        self.batch_tokens = batch_tokens
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def key(self) -> str:
+        """Names what determines the vectors: the model and, unless float32, the dtype."""
+        return self.model if self.dtype == 'float32' else f"{self.model}:{self.dtype}"
+
+    def __repr__(self) -> str:          # hashed by the scheduler: only what changes output
+        return f"Encoder({self.key!r})"
+
+    def __getstate__(self):             # a worker process gets the settings, not the pool
+        return {**self.__dict__, '_pool': None}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: torch's thread pools do not survive a fork
+            threads = max((os.cpu_count() or 1) // self.workers, 1)
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(self.model, self.device, threads))
+        return self._pool
+
+    def encode(self, docs: Sequence[str]) -> np.ndarray:
+        """Unit vectors for `docs`, in order, as `self.dtype`."""
+        t0 = time.perf_counter()
+        # fixed batches: one encode call per worker, in document order
+        parts = batches(docs, self.batch_tokens) if self.batch_tokens else \
+                [b for b in np.array_split(np.arange(len(docs)), self.workers) if len(b)]
+        texts = [[docs[i] for i in b.tolist()] for b in parts]
+        sizes = [len(t) if self.batch_tokens else BATCH for t in texts]
+        if self.workers > 1 and len(parts) > 1:
+            vecs = list(self.pool().map(_encode_batch, texts, sizes))
+        else:
+            m = model(self.model, self.device)
+            vecs = [m.encode(t, batch_size=s, show_progress_bar=False,
+                             normalize_embeddings=True) for t, s in zip(texts, sizes)]
+        dim = vecs[0].shape[1] if vecs else model(self.model, self.device) \
+            .get_sentence_embedding_dimension()
+        out = np.empty((len(docs), dim), dtype=self.dtype)
+        for b, v in zip(parts, vecs):
+            out[b] = quantize(v, self.dtype)
+        dt = time.perf_counter() - t0
+        print(f"[embed] {len(docs)} docs in {dt:.2f}s ({len(docs) / max(dt, 1e-9):.0f} docs/s; "
+              f"{len(parts)} batches, {self.workers} proc, {self.dtype})")
+        return out
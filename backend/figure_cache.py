@@ -0,0 +1,184 @@
+"""backend/figure_cache.py
+Server-side figure pieces for app.py.  The figure always holds the same trace
+slots
+
+    0 … B-1   edge width buckets (empty traces when no edges are shown)
+    B         the visible nodes, or per-year density bins when zoomed out
+    B+1       search matches among the visible nodes, drawn on top
+
+so an interaction only replaces the slots it changes, sent as a dash `Patch`,
+instead of rebuilding and re-serialising the whole figure.  What is costly and
+the same for every user – the base figure, node hover texts, the search
+haystack (or a prebuilt `backend.search.Index`), the node slot and each edge
+type's "show all" traces per (snapped) viewport – is built once and memoised
+with an LRU.
+
+Everything sent is bounded by the viewport (`backend.viewport`): at most
+`max_nodes` node markers (beyond that the window is binned) and at most
+`max_edges` of the heaviest edges.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import plotly.graph_objects as go
+from dash import Patch
+
+from . import edge_traces
+from .viewport import Viewport, Window
+
+NODE_COLOR, MATCH_COLOR, BIN_COLOR = 'blue', 'orange', 'rgba(78,121,167,0.5)'
+NODE_SIZE = 12
+
+
+def hover_text(titles: Sequence[str], authors: Sequence[List[str]]) -> np.ndarray:
+    return np.array([f"{t}<br>{', '.join(a)}" for t, a in zip(titles, authors)], dtype=object)
+
+
+def haystack_text(titles: Sequence[str], authors: Sequence[List[str]]) -> List[str]:
+    return [(t + " " + " ".join(a)).lower() for t, a in zip(titles, authors)]
+
+
+class FigureCache:
+    """Figures and patches over one `GraphIndex` and its node DataFrame.
+
+    `hover` / `haystack` (per node row, e.g. from `backend.graph_store`)
+    replace the texts otherwise formatted from `nodes_df`."""
+
+    def __init__(self, index, nodes_df, *, year_counts: Dict[int, int] | None = None,
+                 buckets: int = 4, maxsize: int = 16,
+                 max_nodes: int = 5000, max_edges: int = 20000, search=None,
+                 hover: Sequence[str] | None = None, haystack: Sequence[str] | None = None):
+        self.index, self.buckets = index, buckets
+        self.max_nodes, self.max_edges = max_nodes, max_edges
+        self.node_slot, self.match_slot = buckets, buckets + 1
+        self.viewport = Viewport(index, year_counts)
+        if hover is None or (search is None and haystack is None):
+            titles, authors = nodes_df['title'].tolist(), nodes_df['authors'].tolist()
+        self.hover = hover_text(titles, authors) if hover is None else hover
+        self.search = search
+        if search is None:
+            self.haystack = haystack_text(titles, authors) if haystack is None else haystack
+        else:                                           # index doc → node row
+            self.search_rows = np.fromiter((index.row.get(i, -1) for i in search.ids),
+                                           dtype=np.int64, count=len(search.ids))
+        self.ids = index.ids
+        self.y_max = float(index.y.max()) if len(index.y) else 0.
+        self.by_weight = lru_cache(None)(
+            lambda et: np.argsort(-index.edges[et].weight, kind='stable').astype(np.int32))
+        self.show_all = lru_cache(maxsize)(self._show_all)
+        self.view_nodes = lru_cache(maxsize)(self._view_nodes)
+        self.figure = lru_cache(maxsize)(self._figure)
+
+    # ────────────────────────────────────────────────────────────── pieces
+    def edges(self, et: str, eids: np.ndarray) -> List[dict]:
+        """Trace dicts for every edge slot, empty buckets included."""
+        if len(eids) > self.max_edges:                  # keep the heaviest
+            w = self.index.edges[et].weight[eids]
+            eids = np.sort(eids[np.argsort(-w, kind='stable')[:self.max_edges]])
+        return [tr.to_plotly_json() for tr in
+                edge_traces.edge_traces(self.index, et, eids, buckets=self.buckets, pad=True)]
+
+    def _show_all(self, et: str, window: Window | None = None) -> Tuple[dict, ...]:
+        """The `max_edges` heaviest edges of `et` overlapping `window` (a
+        `Viewport.snap`ped window)."""
+        order = self.by_weight(et)
+        keep = self.viewport.overlap(et, window)
+        eids = order if keep is None else order[keep[order]]
+        return tuple(self.edges(et, np.sort(eids[:self.max_edges])))
+
+    def nodes(self, rows: Sequence[int] | None) -> dict:
+        """x/y/customdata/hovertext of the node rows (None: all nodes)."""
+        rows = slice(None) if rows is None else np.asarray(rows, dtype=np.intp)
+        return dict(x=self.index.x_ms[rows], y=self.index.y[rows],
+                    customdata=self.ids[rows], hovertext=self.hover[rows])
+
+    def _view_nodes(self, window: Window | None) -> dict:
+        """Node slot for a snapped `window`: the nodes inside it, or
+        (year, yPx band) bins when there are more than `max_nodes`."""
+        rows = self.viewport.rows(window)
+        if len(rows) <= self.max_nodes:
+            return dict(self.nodes(rows),
+                        marker=dict(size=NODE_SIZE, color=NODE_COLOR, opacity=0.8))
+        x, y, count, year = self.viewport.bins(rows, window)
+        totals = self.viewport.year_counts
+        return dict(x=x, y=y, customdata=[''] * len(x),
+                    hovertext=[f"{yr}: {c} papers here, {totals.get(yr, c)} that year"
+                               for yr, c in zip(year.tolist(), count.tolist())],
+                    marker=dict(size=np.clip(4 + 3 * np.sqrt(count), 4, 40), color=BIN_COLOR,
+                                opacity=0.8))
+
+    def matches(self, rows: Sequence[int] | None, term: str | None,
+                window: Window | None = None) -> dict:
+        """The visible node rows whose title/authors contain `term` – or, with
+        a search index, that match every word of it, best first; with no
+        explicit `rows`, the nodes inside `window` (at most `max_nodes`)."""
+        term = (term or '').lower()
+        if not term:
+            return self.nodes([])
+        if self.search is not None:
+            hits = self.search_rows[self.search.search(term)[0]]
+            if rows is None and window is None:
+                return self.nodes(hits[hits >= 0][:self.max_nodes])
+            cand = self.viewport.rows(window) if rows is None else rows
+            return self.nodes(hits[np.isin(hits, cand)][:self.max_nodes])
+        cand = self.viewport.rows(window).tolist() if rows is None else rows
+        return self.nodes([r for r in cand if term in self.haystack[r]][:self.max_nodes])
+
+    def _node_trace(self, color: str, **data) -> go.Scattergl:
+        data.setdefault('marker', dict(size=NODE_SIZE, color=color, opacity=0.8))
+        return go.Scattergl(mode='markers', hoverinfo='text',
+                            hovertemplate="%{hovertext}<extra></extra>", **data)
+
+    def _figure(self, et: str) -> go.Figure:
+        """Every node (binned when too many), no edges, no highlights."""
+        fig = go.Figure([edge_traces.empty_trace(self.index.edges[et].kind, b)
+                         for b in range(self.buckets)])
+        fig.add_trace(self._node_trace(NODE_COLOR, **self.view_nodes(None)))
+        fig.add_trace(self._node_trace(MATCH_COLOR, **self.nodes([])))
+        fig.update_layout(
+            dragmode="zoom",
+            xaxis=dict(
+                rangeslider=dict(visible=True, thickness=0.05),
+                type="date", tickformat="%Y", title="Publication Date"
+            ),
+            yaxis=dict(visible=False, range=[-20, self.y_max + 20]),
+            height=800, hovermode="closest", showlegend=False,
+            margin=dict(l=40, r=40, t=80, b=40),
+            uirevision='timeline',          # keep the user's zoom across patches
+        )
+        return fig
+
+    # ───────────────────────────────────────────────────────────── patches
+    def patch(self, *, edges: Sequence[dict] | None = None,
+              rows: Sequence[int] | None | bool = False,
+              nodes: dict | None = None,
+              matches: dict | None = None,
+              shapes: List[dict] | None = None,
+              annotations: List[dict] | None = None,
+              uirevision: str | None = None) -> Patch:
+        """Partial figure update touching only the given slots.
+
+        `rows=False` leaves the node slot alone; None restores all nodes.
+        `nodes` replaces the node slot with a prepared `view_nodes` dict;
+        `shapes` / `annotations` the layout's (the burst overlay and its
+        labels, `backend.trends`); a new `uirevision` resets the zoom to
+        the figure's axes."""
+        p = Patch()
+        for b, tr in enumerate(edges or ()):
+            p['data'][b] = tr
+        if nodes is None and rows is not False:
+            nodes = dict(self.nodes(rows),
+                         marker=dict(size=NODE_SIZE, color=NODE_COLOR, opacity=0.8))
+        for k, v in (nodes or {}).items():
+            p['data'][self.node_slot][k] = v
+        if matches is not None:
+            for k, v in matches.items():
+                p['data'][self.match_slot][k] = v
+        if shapes is not None:
+            p['layout']['shapes'] = shapes
+        if annotations is not None:
+            p['layout']['annotations'] = annotations
+        if uirevision is not None:
+            p['layout']['uirevision'] = uirevision
+        return p
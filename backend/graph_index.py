@@ -0,0 +1,186 @@
+"""backend/graph_index.py
+Startup-time index over the node table and edge files consumed by the
+front-ends.  Each edge type is held as int32 endpoint rows plus an undirected
+CSR adjacency (`offsets` / `nbrs` / `eids`) keyed by integer node row, so a
+node click, "Show All" or hover resolves in time proportional to the result
+instead of scanning every edge and boolean-masking the node table.
+"""
+from __future__ import annotations
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence
+import numpy as np
+
+from .artifacts import EdgeTable
+
+EMPTY = np.zeros(0, dtype=np.int32)
+
+
+@dataclass
+class EdgeSet:
+    """Columnar edges of one type plus their CSR adjacency."""
+    kind   : str          # lower-cased edge `type`, drives styling
+    src    : np.ndarray   # int32 node row of `source`
+    dst    : np.ndarray   # int32 node row of `target`
+    weight : np.ndarray   # float32, 1.0 where the edge has no weight
+    offsets: np.ndarray   # int64, len n_nodes + 1
+    nbrs   : np.ndarray   # int32 neighbour row per adjacency slot
+    eids   : np.ndarray   # int32 edge id per adjacency slot
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int):
+    """Undirected adjacency; a self-loop is listed once under its node."""
+    m = len(src)
+    eid = np.arange(m, dtype=np.int32)
+    loop = src == dst
+    ends  = np.concatenate([src, dst[~loop]])
+    other = np.concatenate([dst, src[~loop]])
+    eids  = np.concatenate([eid, eid[~loop]])
+
+    order = np.argsort(ends, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=n), out=offsets[1:])
+    return offsets, other[order].astype(np.int32), eids[order].astype(np.int32)
+
+
+class LazyEdges(Mapping):
+    """edge type → `EdgeSet`, built on first access.  Sources that are
+    zero-argument callables are only called (read from disk) then; anything
+    else is built immediately."""
+
+    def __init__(self, build: Callable[[str, object], EdgeSet], sources: Dict[str, object]):
+        self._build, self._sources = build, dict(sources)
+        self._built: Dict[str, EdgeSet] = {}
+        self._lock = threading.Lock()      # callbacks may run on several threads
+        for et, src in self._sources.items():
+            if not callable(src):
+                self._built[et] = build(et, src)
+
+    def __getitem__(self, et: str) -> EdgeSet:
+        es = self._built.get(et)
+        if es is None:
+            with self._lock:
+                es = self._built.get(et)
+                if es is None:
+                    es = self._built[et] = self._build(et, self._sources[et]())
+        return es
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+
+class GraphIndex:
+    """id → row map, coordinate arrays and per-type `EdgeSet`s.
+
+    Each edge type is a list of JSON edge dicts, a columnar
+    `artifacts.EdgeTable`, or a zero-argument callable returning either –
+    read and indexed the first time that type is used.  Edges whose endpoints are not in the node table
+    (e.g. papers dropped for an unparseable date) are discarded at build time.
+    """
+
+    def __init__(self, ids: Sequence[str], x, y,
+                 edges: Dict[str, Iterable[dict] | EdgeTable | Callable]):
+        self.ids = np.asarray(ids, dtype=object)
+        self.x   = np.asarray(x)
+        self.y   = np.asarray(y, dtype=np.float64)
+        self.x_ms = (self.x.astype('datetime64[ms]').astype(np.float64)
+                     if np.issubdtype(self.x.dtype, np.datetime64)
+                     else self.x.astype(np.float64))   # for WebGL edge traces
+        self.row: Dict[str, int] = {}
+        for i, nid in enumerate(ids):
+            self.row.setdefault(nid, i)     # duplicates resolve to first row
+
+        self._remap: Dict[int, tuple] = {}   # per shared `EdgeTable.ids`
+        self.edges = LazyEdges(self._edge_set, edges)
+
+    @classmethod
+    def attach(cls, ids: Sequence[str], x, y, x_ms, row: Mapping,
+               edges: Dict[str, EdgeSet]) -> "GraphIndex":
+        """An index over prebuilt (e.g. memory-mapped) arrays and `EdgeSet`s,
+        taken as they are; see `backend.graph_store`."""
+        self = cls.__new__(cls)
+        self.ids, self.x, self.y, self.x_ms, self.row = ids, x, y, x_ms, row
+        self._remap = {}
+        self.edges = LazyEdges(lambda et, es: es, edges)
+        return self
+
+    # ────────────────────────────────────────────────────────────────── build
+    def _edge_set(self, et: str, es: Iterable[dict] | EdgeTable) -> EdgeSet:
+        if isinstance(es, EdgeTable):
+            return self._table_set(es)
+        es = list(es)
+        row = self.row
+        src, dst, w = [], [], []
+        for e in es:
+            s = row.get(e['source']); t = row.get(e['target'])
+            if s is None or t is None:
+                continue
+            src.append(s); dst.append(t); w.append(e.get('weight', 1))
+        kind = es[0].get('type', et).lower() if es else et
+
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        offsets, nbrs, eids = _csr(src, dst, len(self.ids))
+        return EdgeSet(kind, src, dst, np.asarray(w, dtype=np.float32),
+                       offsets, nbrs, eids)
+
+    def _table_set(self, t: EdgeTable) -> EdgeSet:
+        """Re-target columnar edges from `t.ids` rows to node-table rows."""
+        ids, remap = self._remap.get(id(t.ids), (None, None))
+        if ids is not t.ids:
+            remap = np.fromiter((self.row.get(nid, -1) for nid in t.ids),
+                                dtype=np.int32, count=len(t.ids))
+            # keep `t.ids` alive: tables built lazily must not reuse its id()
+            self._remap[id(t.ids)] = (t.ids, remap)
+        src, dst = remap[t.src], remap[t.dst]
+        keep = (src >= 0) & (dst >= 0)
+        src, dst = src[keep], dst[keep]
+        offsets, nbrs, eids = _csr(src, dst, len(self.ids))
+        return EdgeSet(t.kind.lower(), src, dst,
+                       np.asarray(t.weight, dtype=np.float32)[keep], offsets, nbrs, eids)
+
+    # ───────────────────────────────────────────────────────────────── lookup
+    def incident(self, et: str, nid: str) -> np.ndarray:
+        """Edge ids of type `et` touching node `nid` (empty if unknown)."""
+        r = self.row.get(nid)
+        if r is None:
+            return EMPTY
+        es = self.edges[et]
+        return es.eids[es.offsets[r]:es.offsets[r + 1]]
+
+    def neighbourhood(self, et: str, nid: str):
+        """(edge ids, sorted node rows) of the subgraph around `nid`.
+
+        The node rows include `nid` itself whenever it has any edge."""
+        r = self.row.get(nid)
+        if r is None:
+            return EMPTY, EMPTY
+        es = self.edges[et]
+        lo, hi = es.offsets[r], es.offsets[r + 1]
+        if lo == hi:
+            return EMPTY, EMPTY
+        rows = np.unique(np.append(es.nbrs[lo:hi], r))
+        return es.eids[lo:hi], rows
+
+    def all_edges(self, et: str) -> np.ndarray:
+        return np.arange(len(self.edges[et]), dtype=np.int32)
+
+    def segments(self, et: str, eids: np.ndarray):
+        """Endpoint coordinates (x0, y0, x1, y1) of the given edges."""
+        es = self.edges[et]
+        s, t = es.src[eids], es.dst[eids]
+        return self.x[s], self.y[s], self.x[t], self.y[t]
+
+
+def from_frame(nodes_df, edges: Dict[str, List[dict] | EdgeTable | Callable],
+               x: str = 'date', y: str = 'y') -> GraphIndex:
+    """Build a `GraphIndex` over a positionally-indexed node DataFrame."""
+    return GraphIndex(nodes_df['id'].tolist(),
+                      nodes_df[x].to_numpy(), nodes_df[y].to_numpy(), edges)
@@ -0,0 +1,206 @@
+"""backend/graph_store.py
+Read-only graph store for serving app.py from several processes.
+
+`build` does once what every app worker would otherwise do on its own – read
+nodes.json and every edge file, index the edges (`GraphIndex` CSR), format
+hover / search texts, decode search_index.json – and writes the results as
+flat `.npy` arrays and UTF-8 string buffers into `<public>/.serve/`.
+`attach` memory-maps them: workers share one copy through the page cache,
+start in milliseconds and never parse JSON.
+
+* nodes: `x` (datetime64), `x_ms`, `y`, and string columns `ids`, `title`,
+  `authors` (", "-joined), `hover`, `haystack`
+* id → row: sorted 64-bit blake2b keys of the ids plus their rows (`RowMap`)
+* per edge type: `src`, `dst`, `weight` and the CSR `offsets` / `nbrs` /
+  `eids` of `graph_index.EdgeSet`
+* search_index.json, when present, as `offsets` / `docs` / `scores` arrays
+
+`manifest.json` records the size and mtime of every input; `build` is a
+no-op while they are unchanged.  gunicorn.conf.py builds the store in the
+master process and exports its path in `ENV`, which app.py attaches to.
+"""
+from __future__ import annotations
+import hashlib, json, os, pathlib, shutil, time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+from . import artifacts, graph_index
+from .corpus import StringColumn
+
+VERSION = 1
+DIR = '.serve'
+ENV = 'MTO_GRAPH_STORE'        # store path inherited by app workers
+EDGE_TYPES = ["semantic", "sharedref", "lineage"]
+CSR = ('src', 'dst', 'weight', 'offsets', 'nbrs', 'eids')
+TEXTS = ('ids', 'title', 'authors', 'hover', 'haystack')
+
+
+# ───────────────────────────────────────────────────────── shared columns
+class Strings(StringColumn):
+    """A memory-mapped `StringColumn`; also indexable by row arrays."""
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return str(self.buf[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+        rows = range(*i.indices(len(self))) if isinstance(i, slice) else np.asarray(i).tolist()
+        out = np.empty(len(rows), dtype=object)
+        out[:] = [self[j] for j in rows]
+        return out
+
+
+def _key(nid: str) -> int:
+    return int.from_bytes(hashlib.blake2b(nid.encode(), digest_size=8).digest(), 'little')
+
+
+class RowMap(Mapping):
+    """id → first node row, by binary search over sorted id hashes."""
+
+    def __init__(self, ids: Strings, keys: np.ndarray, rows: np.ndarray):
+        self.ids, self.keys, self.rows = ids, keys, rows
+
+    def __getitem__(self, nid: str) -> int:
+        k = np.uint64(_key(nid))
+        i = int(np.searchsorted(self.keys, k))
+        while i < len(self.keys) and self.keys[i] == k:
+            r = int(self.rows[i])
+            if self.ids[r] == nid:
+                return r
+            i += 1
+        raise KeyError(nid)
+
+    def __iter__(self):
+        return (self.ids[r] for r in np.sort(self.rows).tolist())
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+# ──────────────────────────────────────────────────────────────── inputs
+def edge_types(public: pathlib.Path) -> List[str]:
+    """The app's edge types: the three stage outputs plus any time-windowed
+    semantic neighbours (cli --temporal)."""
+    return EDGE_TYPES + sorted(fp.name[:-len('_edges.json')]
+                               for fp in pathlib.Path(public).glob('semantic_*_edges.json'))
+
+
+def load_nodes(public: pathlib.Path):
+    """The node table app.py draws: dated nodes only, `date` parsed, `y` numeric."""
+    import pandas as pd
+    nodes = artifacts.read_nodes(public, ['id', 'title', 'authors', 'date', 'yPx'])
+    nodes['date'] = pd.to_datetime(nodes['date'], format='%Y-%m-%d', errors='coerce')
+    nodes = nodes.dropna(subset=['date']).reset_index(drop=True)
+    nodes['y'] = pd.to_numeric(nodes['yPx'], errors='coerce').fillna(0)
+    return nodes
+
+
+def _sources(public: pathlib.Path, types: Sequence[str]) -> Dict[str, List[int]]:
+    names = ['nodes.json', 'search_index.json', f'{artifacts.DIR}/manifest.json',
+             *(fp.name for et, fp in artifacts._edge_files(public).items() if et in types)]
+    stats = {n: (public / n).stat() for n in names if (public / n).exists()}
+    return {n: [st.st_size, st.st_mtime_ns] for n, st in stats.items()}
+
+
+def fresh(public: pathlib.Path) -> bool:
+    """Whether `<public>/.serve` was built from the current inputs."""
+    public = pathlib.Path(public)
+    fp = public / DIR / 'manifest.json'
+    if not fp.exists():
+        return False
+    m = json.loads(fp.read_text())
+    types = edge_types(public)           # a newly added temporal window is not in the store
+    return (m.get('version') == VERSION and sorted(m['edge_types']) == sorted(types)
+            and m['sources'] == _sources(public, types))
+
+
+# ──────────────────────────────────────────────────────────────── writing
+def build(public: pathlib.Path, force: bool = False) -> pathlib.Path:
+    """Write the store for `public` (unless fresh); returns its directory."""
+    from .figure_cache import haystack_text, hover_text
+    from .search import Index
+    public = pathlib.Path(public)
+    dest = public / DIR
+    if not force and fresh(public):
+        return dest
+    t0 = time.perf_counter()
+    types = edge_types(public)
+    sources = _sources(public, types)
+    nodes = load_nodes(public)
+    index = graph_index.from_frame(
+        nodes, {et: artifacts.read_edges(public, et) for et in types})
+
+    tmp = public / (DIR + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    save = lambda name, a: np.save(tmp / f'{name}.npy', np.ascontiguousarray(a))
+    titles, authors = nodes['title'].tolist(), nodes['authors'].tolist()
+    texts = {'ids': nodes['id'].tolist(), 'title': titles,
+             'authors': [', '.join(a) for a in authors],
+             'hover': hover_text(titles, authors), 'haystack': haystack_text(titles, authors)}
+    for name, values in texts.items():
+        artifacts._strings(tmp, name, values)
+    save('x', index.x); save('x_ms', index.x_ms); save('y', index.y)
+    first = {nid: r for r, nid in reversed(list(enumerate(texts['ids'])))}
+    keys = np.fromiter(map(_key, first), dtype=np.uint64, count=len(first))
+    order = np.argsort(keys, kind='stable')
+    save('keys', keys[order])
+    save('key_rows', np.fromiter(first.values(), dtype=np.int32, count=len(first))[order])
+    kinds = {}
+    for et in types:
+        es = index.edges[et]
+        kinds[et] = es.kind
+        for col in CSR:
+            save(f'{et}.{col}', getattr(es, col))
+
+    search_fp = public / 'search_index.json'
+    if search_fp.exists():
+        s = Index.load(search_fp)
+        artifacts._strings(tmp, 'search.ids', s.ids)
+        artifacts._strings(tmp, 'search.terms', s.terms)
+        for col in ('offsets', 'docs', 'scores'):
+            save(f'search.{col}', getattr(s, col))
+
+    (tmp / 'manifest.json').write_text(json.dumps(
+        {'version': VERSION, 'sources': sources, 'nodes': len(nodes),
+         'edge_types': kinds, 'search': search_fp.exists()}, indent=2))
+    shutil.rmtree(dest, ignore_errors=True)  # attached workers keep their mappings
+    os.replace(tmp, dest)
+    size = sum(fp.stat().st_size for fp in dest.iterdir())
+    print(f"[graph_store] wrote {dest} ({len(nodes)} nodes, {len(types)} edge types, "
+          f"{size / 2**20:.1f} MB) in {time.perf_counter() - t0:.2f}s")
+    return dest
+
+
+# ──────────────────────────────────────────────────────────────── reading
+@dataclass
+class Store:
+    """Everything app.py needs per worker, backed by shared mappings."""
+    index   : graph_index.GraphIndex
+    title   : Strings
+    authors : Strings
+    hover   : Strings
+    haystack: Strings
+    search  : Any                # search.Index | None
+
+
+def attach(path: pathlib.Path) -> Store:
+    """Memory-map a store written by `build`."""
+    from .search import Index
+    d = pathlib.Path(path)
+    m = json.loads((d / 'manifest.json').read_text())
+    if m.get('version') != VERSION:
+        raise ValueError(f"graph store version {m.get('version')!r}, expected {VERSION}")
+    load = lambda name: artifacts._load(d, name)
+    strings = lambda name: Strings(memoryview(load(f'{name}.buf')), load(f'{name}.off'))
+    texts = {name: strings(name) for name in TEXTS}
+    edges = {et: graph_index.EdgeSet(kind, *(load(f'{et}.{col}') for col in CSR))
+             for et, kind in m['edge_types'].items()}
+    index = graph_index.GraphIndex.attach(
+        texts['ids'], load('x'), load('y'), load('x_ms'),
+        RowMap(texts['ids'], load('keys'), load('key_rows')), edges)
+    search = Index(strings('search.ids'), strings('search.terms'),
+                   *(load(f'search.{col}') for col in ('offsets', 'docs', 'scores'))) \
+        if m['search'] else None
+    return Store(index, texts['title'], texts['authors'], texts['hover'],
+                 texts['haystack'], search)
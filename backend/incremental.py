@@ -0,0 +1,222 @@
+"""backend/incremental.py
+Incremental `all` pipeline.  A manifest of content hashes for every file in
+`json_dir` is kept next to the per-stage intermediate state:
+
+* semantic  – per-file text hash and top_k+1 neighbour list; the vectors
+              themselves live in the persistent `EmbeddingStore`
+* sharedref – `ref_index` (slug → paper id multiplicities) and cached edges
+* lineage   – no state: re-threaded over all records (one lexsort of the
+              authorship rows)
+* density   – the year counter
+* citation  – no state: resolved and ranked again over all records (one
+              sparse pass), before the nodes are written
+* trends    – no state: the keyword × bin counts are recounted over all
+              records (one pass, then one vectorised burst / z-score sweep)
+* search    – no state: the inverted index is rebuilt from all records
+
+Only new, changed or deleted files are parsed / encoded, only the neighbour
+rows and edges they can affect are recomputed, and the outputs are written
+through the same stage writers, so the files are identical to a full rebuild.
+"""
+from __future__ import annotations
+import collections, hashlib, json, pathlib, pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from . import load_data, semantic, citation, sharedref, lineage, density, trends, search
+from .embed_cache import EmbeddingStore, text_hash
+from .embedder import Encoder
+from .layout import BASIS
+
+STATE_VERSION = 3
+
+
+@dataclass
+class State:
+    version : int = STATE_VERSION
+    manifest: Dict[str, str] = field(default_factory=dict)    # file → sha1
+    records : Dict[str, Dict] = field(default_factory=dict)   # file → paper
+    # semantic
+    model    : str = semantic.MODEL
+    top_k    : int = -1
+    text_hash: Dict[str, str] = field(default_factory=dict)
+    knn      : Dict[str, List[Tuple[str, float]]] = field(default_factory=dict)
+    # sharedref
+    min_shared: int = 2
+    ref_index : Dict[str, collections.Counter] = field(default_factory=dict)
+    pair_edges: Dict[Tuple[str, str], int] = field(default_factory=dict)  # ≥ min_shared
+    # density
+    year_counts: collections.Counter = field(default_factory=collections.Counter)
+
+
+def load_state(path: pathlib.Path) -> State:
+    if path.exists():
+        state = pickle.loads(path.read_bytes())
+        if getattr(state, 'version', None) == STATE_VERSION:
+            return state
+        print(f"[incremental] ignoring stale state {path}")
+    return State()
+
+
+# ───────────────────────────────────────────────────────────────── stages
+def _update_semantic(state: State, files: List[str], dirty: Set[str],
+                     gone: Set[str], top_k: int, cache: EmbeddingStore, encoder: Encoder):
+    """Embed through the store and recompute the neighbour rows affected by
+    changed texts."""
+    if state.top_k != top_k or state.model != encoder.key:
+        state.knn.clear()
+        state.top_k, state.model = top_k, encoder.key
+
+    for f in gone:
+        state.text_hash.pop(f, None); state.knn.pop(f, None)
+    moved = set(gone)
+    for f in dirty:
+        h = text_hash(semantic.document(state.records[f]))
+        if state.text_hash.get(f) != h:
+            state.text_hash[f] = h
+            moved.add(f)
+
+    emb = (semantic.embed([semantic.document(state.records[f]) for f in files], cache, encoder)
+           if files else np.zeros((0, 0)))
+    pos = {f: i for i, f in enumerate(files)}
+
+    # rows to requery: no cached list, a cached neighbour moved or vanished,
+    # or a moved embedding now reaches the row's k-th similarity
+    redo = np.array([f not in state.knn or any(g in moved for g, _ in state.knn[f])
+                     for f in files], dtype=bool)
+    fresh = [pos[f] for f in moved if f in pos]
+    if fresh and len(files):
+        kth = np.array([state.knn[f][-1][1] if f in state.knn else np.inf
+                        for f in files])
+        sims = emb @ emb[fresh].T
+        redo |= (sims >= kth[:, None] - 1e-6).any(axis=1)
+
+    rows = np.flatnonzero(redo)
+    if len(rows):
+        idx, sim = semantic.neighbors(emb, top_k, rows)
+        for r, nbrs, sims in zip(rows, idx, sim):
+            state.knn[files[r]] = [(files[j], float(c)) for j, c in zip(nbrs, sims)]
+    print(f"[incremental] semantic: {len(moved)} texts changed, requeried {len(rows)} rows")
+    return emb
+
+
+def _update_sharedref(state: State, old: Dict[str, Dict], new: Dict[str, Dict],
+                      min_shared: int = 2):
+    """Patch `ref_index` and recompute coupling only for touched paper ids."""
+    ref_index = state.ref_index
+    for p in old.values():
+        for ref in sharedref.paper_refs(p):
+            ref_index[ref][p['id']] -= 1
+            ref_index[ref] = +ref_index[ref]
+            if not ref_index[ref]:
+                del ref_index[ref]
+    for p in new.values():
+        for ref in sharedref.paper_refs(p):
+            ref_index.setdefault(ref, collections.Counter())[p['id']] += 1
+
+    # pairs between untouched papers keep their count; every pair with a
+    # touched endpoint is recounted from that paper's references
+    touched = {p['id'] for p in old.values()} | {p['id'] for p in new.values()}
+    if state.min_shared != min_shared:
+        state.min_shared, state.pair_edges = min_shared, {}
+        touched |= {p['id'] for p in state.records.values()}
+    pairs = {k: w for k, w in state.pair_edges.items()
+             if k[0] not in touched and k[1] not in touched}
+
+    refs_of: Dict[str, Set[str]] = collections.defaultdict(set)
+    for p in state.records.values():
+        if p['id'] in touched:
+            refs_of[p['id']] |= sharedref.paper_refs(p)
+    for a, refs in refs_of.items():
+        counts = collections.Counter()
+        for ref in refs:
+            counts.update(b for b in ref_index[ref] if b != a)
+        for b, w in counts.items():
+            if w >= min_shared:
+                pairs[(a, b) if a < b else (b, a)] = w
+    state.pair_edges = pairs
+    return sharedref.to_edges(pairs, min_shared)
+
+
+def _update_density(state: State, old: Dict[str, Dict], new: Dict[str, Dict]):
+    for p in old.values():
+        year = density.paper_year(p)
+        if year:
+            state.year_counts[year] -= 1
+    for p in new.values():
+        year = density.paper_year(p)
+        if year:
+            state.year_counts[year] += 1
+    state.year_counts = +state.year_counts     # drop zero counts
+    return state.year_counts
+
+
+# ─────────────────────────────────────────────────────────────────── driver
+def build_all(json_dir: pathlib.Path, out: pathlib.Path, top_k: int = 5,
+              sim_th: float = .6, state_path: pathlib.Path | None = None,
+              cache: EmbeddingStore | None = None, min_shared: int = 2,
+              encoder: Encoder | None = None, temporal: Sequence[str] = (),
+              placement: str = 'rank', min_gap: float = 0, refit: bool = False,
+              damping: float = citation.DAMPING, half_life: float = citation.HALF_LIFE,
+              lineage_authors: str = 'all', aliases: Dict[str, str] | None = None,
+              trend_bin: str = 'month', burst_scale: float = trends.SCALE,
+              burst_gamma: float = trends.GAMMA, trend_window: int = trends.WINDOW):
+    """Incremental equivalent of `cli all`; returns the list of papers."""
+    state_path = state_path or out / '.incremental_state.pkl'
+    encoder = encoder or Encoder()
+    cache = cache or EmbeddingStore(out / '.embed_cache', encoder.model, dtype=encoder.dtype)
+    state = load_state(state_path)
+
+    manifest, old, new = {}, {}, {}
+    paths = sorted(json_dir.glob('*.json'))
+    for fp in paths:
+        raw = fp.read_bytes()
+        h = hashlib.sha1(raw).hexdigest()
+        manifest[fp.name] = h
+        if state.manifest.get(fp.name) != h:
+            if fp.name in state.records:
+                old[fp.name] = state.records[fp.name]
+            new[fp.name] = state.records[fp.name] = load_data.record(fp, json.loads(raw))
+    gone = set(state.manifest) - set(manifest)
+    for f in gone:
+        old[f] = state.records.pop(f)
+    state.manifest = manifest
+    print(f"[incremental] {len(paths)} files: {len(new) - len(old) + len(gone)} new, "
+          f"{len(old) - len(gone)} changed, {len(gone)} deleted")
+
+    files = [fp.name for fp in paths]
+    papers = [state.records[f] for f in files]
+
+    # citation metrics first: semantic.write merges them into nodes.json
+    citation.build(papers, out, damping, half_life, nodes=False)
+
+    # semantic
+    emb = _update_semantic(state, files, set(new), gone, top_k, cache, encoder)
+    if papers:
+        pos = {f: i for i, f in enumerate(files)}
+        years = {p['id']: semantic.safe_year(p['date']) for p in papers}
+        edges = []
+        for i, f in enumerate(files):
+            nbrs, sims = zip(*state.knn[f])
+            edges += semantic.paper_edges(papers, i, [pos[g] for g in nbrs],
+                                          sims, sim_th, years)
+        yrs = load_data.date_columns(papers)[1]
+        # with placement='ipca' unchanged papers keep their y (saved basis)
+        y = semantic.layout(papers, emb, mode=placement, years=yrs, min_gap=min_gap,
+                            basis_path=out / BASIS, refit=refit)
+        semantic.write(papers, y, edges, out)
+        # windowed neighbours are re-searched in full: one pass, comparable to a kNN query
+        semantic.write_temporal(papers, emb, yrs, years, temporal, out, top_k, sim_th)
+    else:                                      # emptied corpus: clear, as a full rebuild does
+        semantic.write_empty(out, temporal)
+
+    sharedref.write(_update_sharedref(state, old, new, min_shared), out)
+    lineage.write(lineage.edges(papers, lineage_authors, aliases), out)
+    density.write(_update_density(state, old, new), out)
+    trends.build(papers, out, trend_bin, burst_scale, burst_gamma, trend_window)
+    search.build(papers, out)                  # full rebuild: one linear pass
+
+    state_path.write_bytes(pickle.dumps(state))
+    return papers
@@ -0,0 +1,257 @@
+"""backend/knn.py
+Pluggable k-nearest-neighbour engines over L2-normalised embeddings (cosine
+similarity = dot product).  Every engine has the signature
+
+    engine(emb, k, rows=None, **opts) -> (indices, similarities)
+
+returning `k` neighbours per query row (default: every row), best first, with
+the query itself always in column 0.
+
+exact    blocked matrix-multiply top-k via `argpartition`, bounded memory,
+         ties broken by lower index (deterministic – used by incremental)
+sklearn  the original `NearestNeighbors(metric='cosine')` brute force
+ivf      inverted-file index: k-means coarse quantiser, probe `nprobe` lists
+lsh      random-projection (SimHash) tables, exact re-rank of bucket mates
+
+`temporal` is exact search restricted to a year window around (or before)
+each query, for the time-aware semantic edges.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Tuple
+import numpy as np
+
+BLOCK_ELEMS = 1 << 22          # similarity entries materialised per block
+
+
+def _rows(emb, rows):
+    return np.arange(len(emb)) if rows is None else np.asarray(rows, dtype=np.intp)
+
+
+def _topk_rows(s: np.ndarray, k: int):
+    """Top-k columns per row of `s`, ties resolved towards lower column."""
+    part = np.argpartition(-s, k - 1, axis=1)[:, :k]
+    kth = np.take_along_axis(s, part, axis=1).min(axis=1, keepdims=True)
+    gt = s > kth
+    eq = s == kth
+    need = k - gt.sum(axis=1, keepdims=True)
+    sel = gt | (eq & (np.cumsum(eq, axis=1) <= need))
+    idx = np.nonzero(sel)[1].reshape(len(s), k)
+    sim = np.take_along_axis(s, idx, axis=1)
+    order = np.argsort(-sim, axis=1, kind='stable')   # idx ascending within ties
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(sim, order, axis=1)
+
+
+def _finish(idx, sim):
+    sim = sim.astype(np.float32)
+    sim[:, 0] = np.where(np.isinf(sim[:, 0]), 1., sim[:, 0])
+    return idx, sim
+
+
+# ───────────────────────────────────────────────────────────────── exact
+def exact(emb, k, rows=None, *, block_elems=BLOCK_ELEMS):
+    rows = _rows(emb, rows)
+    k = min(k, len(emb))
+    idx = np.empty((len(rows), k), dtype=np.intp)
+    sim = np.empty((len(rows), k), dtype=np.float32)
+    step = max(1, block_elems // max(len(emb), 1))
+    for lo in range(0, len(rows), step):
+        r = rows[lo:lo + step]
+        s = emb[r] @ emb.T
+        s[np.arange(len(r)), r] = np.inf                  # self first
+        idx[lo:lo + len(r)], sim[lo:lo + len(r)] = _topk_rows(s, k)
+    return _finish(idx, sim)
+
+
+def sklearn(emb, k, rows=None):
+    from sklearn.neighbors import NearestNeighbors
+    rows = _rows(emb, rows)
+    nn = NearestNeighbors(n_neighbors=min(k, len(emb)), metric='cosine').fit(emb)
+    dist, idx = nn.kneighbors(emb[rows])
+    return idx, (1 - dist).astype(np.float32)
+
+
+# ───────────────────────────────────────────────────────── approximate
+class _TopK:
+    """Running top-k per query, merged one candidate block at a time."""
+
+    def __init__(self, rows, k):
+        self.k = k
+        self.idx = np.full((len(rows), k), -1, dtype=np.intp)
+        self.sim = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        self.idx[:, 0], self.sim[:, 0] = rows, np.inf     # self first
+
+    def merge(self, q, cand, s):
+        """Offer candidates `cand` (shared by local queries `q`), sims `s`."""
+        idx = np.concatenate([self.idx[q], np.broadcast_to(cand, s.shape)], axis=1)
+        sim = np.concatenate([self.sim[q], s], axis=1)
+        # drop repeats of candidates already held (self, or seen via another
+        # list/table); the held copy sorts first and is kept
+        order = np.argsort(idx, axis=1, kind='stable')
+        si = np.take_along_axis(idx, order, axis=1)
+        ss = np.take_along_axis(sim, order, axis=1)
+        rep = np.zeros_like(si, dtype=bool); rep[:, 1:] = si[:, 1:] == si[:, :-1]
+        ss[rep] = -np.inf
+        top = np.argsort(-ss, axis=1, kind='stable')[:, :self.k]
+        self.idx[q] = np.take_along_axis(si, top, axis=1)
+        self.sim[q] = np.take_along_axis(ss, top, axis=1)
+
+
+def _kmeans(x, n, iters=8, seed=0, sample=65536):
+    rng = np.random.default_rng(seed)
+    pick = rng.choice(len(x), min(len(x), sample), replace=False)
+    xs = x[pick]
+    cent = xs[rng.choice(len(xs), n, replace=False)].copy()
+    for _ in range(iters):
+        lab = _nearest(xs, cent, 1)[:, 0]
+        for c in range(n):
+            m = lab == c
+            if m.any():
+                v = xs[m].sum(axis=0)
+                cent[c] = v / max(np.linalg.norm(v), 1e-12)
+    return cent
+
+
+def _nearest(x, cent, n, block_elems=BLOCK_ELEMS):
+    out = np.empty((len(x), n), dtype=np.intp)
+    step = max(1, block_elems // max(len(cent), 1))
+    for lo in range(0, len(x), step):
+        s = x[lo:lo + step] @ cent.T
+        part = np.argpartition(-s, n - 1, axis=1)[:, :n] if n < len(cent) else \
+            np.broadcast_to(np.arange(len(cent)), s.shape)
+        out[lo:lo + step] = part
+    return out
+
+
+def ivf(emb, k, rows=None, *, nlist=None, nprobe=8, seed=0):
+    """Approximate top-k: scan only the `nprobe` closest of `nlist` lists."""
+    rows = _rows(emb, rows)
+    k = min(k, len(emb))
+    nlist = min(nlist or max(1, int(np.sqrt(len(emb)))), len(emb))
+    nprobe = min(nprobe, nlist)
+    cent = _kmeans(emb, nlist, seed=seed)
+    label = _nearest(emb, cent, 1)[:, 0]
+    members = np.argsort(label, kind='stable')
+    bounds = np.searchsorted(label[members], np.arange(nlist + 1))
+    probes = _nearest(emb[rows], cent, nprobe)
+
+    top = _TopK(rows, k)
+    for c in range(nlist):
+        q = np.flatnonzero((probes == c).any(axis=1))
+        cand = members[bounds[c]:bounds[c + 1]]
+        if not len(q) or not len(cand):
+            continue
+        step = max(1, BLOCK_ELEMS // (len(cand) + k))
+        for lo in range(0, len(q), step):
+            qq = q[lo:lo + step]
+            top.merge(qq, cand, emb[rows[qq]] @ emb[cand].T)
+    return _finish(top.idx, top.sim)
+
+
+def lsh(emb, k, rows=None, *, tables=16, bits=None, max_bucket=4096, seed=0):
+    """Approximate top-k from rows sharing a SimHash bucket in any table.
+
+    `bits` defaults to ~log2(N/128) so buckets hold a few hundred rows.
+    Buckets larger than `max_bucket` are scanned in slices so a degenerate
+    hash cannot blow up the per-bucket similarity block."""
+    rows = _rows(emb, rows)
+    k = min(k, len(emb))
+    bits = bits or int(np.clip(np.log2(max(len(emb), 1)) - 7, 2, 16))
+    rng = np.random.default_rng(seed)
+    is_query = np.full(len(emb), -1, dtype=np.intp)
+    is_query[rows] = np.arange(len(rows))
+    top = _TopK(rows, k)
+    weights = 1 << np.arange(bits, dtype=np.int64)
+    for _ in range(tables):
+        planes = rng.standard_normal((emb.shape[1], bits)).astype(emb.dtype)
+        code = ((emb @ planes) > 0) @ weights
+        order = np.argsort(code, kind='stable')
+        cuts = np.flatnonzero(np.diff(code[order])) + 1
+        for bucket in np.split(order, cuts):
+            q = is_query[bucket]
+            qb = bucket[q >= 0]
+            if not len(qb):
+                continue
+            for lo in range(0, len(bucket), max_bucket):
+                cand = bucket[lo:lo + max_bucket]
+                step = max(1, BLOCK_ELEMS // (len(cand) + k))
+                for qlo in range(0, len(qb), step):
+                    qq = qb[qlo:qlo + step]
+                    top.merge(is_query[qq], cand, emb[qq] @ emb[cand].T)
+    return _finish(top.idx, top.sim)
+
+
+# keys listed in defaults.KNN_ENGINES, which the CLI offers without importing this
+ENGINES: Dict[str, Callable] = {'exact': exact, 'sklearn': sklearn, 'ivf': ivf, 'lsh': lsh}
+
+
+# ──────────────────────────────────────────────────────────────── temporal
+def parse_window(spec: str) -> Tuple[str, int | None, int | None]:
+    """'past' (any earlier year), 'past:N' (1…N years earlier) or 'window:N'
+    (within ±N years) → (name, lo, hi) year offsets from the query's year,
+    None meaning unbounded."""
+    kind, _, n = spec.partition(':')
+    try:
+        n = int(n) if n else None
+    except ValueError:
+        n = -1
+    if kind == 'past' and (n is None or n > 0):
+        return (f"past{n or ''}", -n if n else None, -1)
+    if kind == 'window' and n is not None and n >= 0:
+        return (f"window{n}", -n, n)
+    raise ValueError(f"bad temporal window {spec!r}; use past, past:N or window:N")
+
+
+def temporal(emb, years, k, lo: int | None, hi: int | None, rows=None, *,
+             block_elems=BLOCK_ELEMS):
+    """Exact top-k restricted to papers whose year lies in [year+lo, year+hi]
+    (`parse_window`); years <= 0 (undated) neither query nor match.
+
+    Rows are sorted by year once, so each query year's candidates are one
+    contiguous block and only that block is multiplied.  Same shape as the
+    other engines – the query itself in column 0 – with missing neighbours
+    padded as index -1, similarity -inf."""
+    emb = np.ascontiguousarray(emb, dtype=np.float32)
+    rows = _rows(emb, rows)
+    years = np.asarray(years, dtype=np.int64)
+    order = np.argsort(years, kind='stable')
+    order = order[years[order] > 0]
+    ys = years[order]
+    idx = np.full((len(rows), k), -1, dtype=np.intp)
+    sim = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    idx[:, 0], sim[:, 0] = rows, 1.
+    if k < 2:
+        return idx, sim
+    qyear = years[rows]
+    for y in np.unique(qyear[qyear > 0]).tolist():
+        q = np.flatnonzero(qyear == y)
+        a = 0 if lo is None else np.searchsorted(ys, y + lo, 'left')
+        b = len(ys) if hi is None else np.searchsorted(ys, y + hi, 'right')
+        cand = order[a:b]
+        if not len(cand):
+            continue
+        m = min(k - 1, len(cand))
+        step = max(1, block_elems // len(cand))
+        for lo_q in range(0, len(q), step):
+            qq = q[lo_q:lo_q + step]
+            s = emb[rows[qq]] @ emb[cand].T
+            s[rows[qq][:, None] == cand[None, :]] = -np.inf        # not itself
+            top, val = _topk_rows(s, m)
+            idx[qq, 1:m + 1] = np.where(np.isinf(val), -1, cand[top])
+            sim[qq, 1:m + 1] = val
+    return idx, sim
+
+
+def search(emb, k, rows=None, engine: str = 'exact', **opts):
+    """Dispatch to a named engine."""
+    try:
+        fn = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"unknown knn engine {engine!r}; choose from {sorted(ENGINES)}")
+    return fn(np.ascontiguousarray(emb, dtype=np.float32), k, rows, **opts)
+
+
+def recall(approx_idx, exact_idx) -> float:
+    """Mean fraction of exact neighbours (excluding self) found by approx."""
+    a, e = approx_idx[:, 1:], exact_idx[:, 1:]
+    hit = (a[:, :, None] == e[:, None, :]).any(axis=1)
+    return float(hit.mean()) if hit.size else 1.0
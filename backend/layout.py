@@ -0,0 +1,122 @@
+"""backend/layout.py
+Vertical placement (yPx) of the timeline nodes from their embeddings.
+
+rank   the original: rank along the first principal component × spacing.
+       Refits PCA on every build, and one new paper shifts every node
+       ranked below it.
+ipca   projection onto the first principal axis, fitted incrementally from
+       a covariance accumulated chunk by chunk (bounded memory at 100k+
+       papers, no SVD of the full matrix) and saved to
+       `<out>/.layout.npz`.  Later builds project every paper into the saved
+       basis, so existing nodes keep their y and new ones land where their
+       text puts them.  Scores are scaled once, at fit time, to the extent
+       `rank` would give.
+
+With `min_gap`, nodes of the same year closer than `min_gap` px are pushed
+apart (upwards, in y order), so a year's papers never overlap; other years
+are untouched.
+"""
+from __future__ import annotations
+import pathlib
+import numpy as np
+
+from .defaults import LAYOUTS as MODES
+BASIS = '.layout.npz'
+CHUNK = 4096
+
+
+def rank(emb: np.ndarray, spacing: int = 18) -> np.ndarray:
+    """y per row: rank along PC1 × spacing."""
+    from sklearn.decomposition import PCA
+    pc1 = PCA(1).fit_transform(emb).flatten()
+    y = np.empty(len(emb), dtype=np.int64)
+    y[np.argsort(pc1)] = np.arange(len(emb)) * spacing
+    return y
+
+
+class Basis:
+    """A saved principal axis: y = (emb - mean) · axis · scale + offset."""
+
+    def __init__(self, mean: np.ndarray, axis: np.ndarray, scale: float, offset: float):
+        self.mean, self.axis, self.scale, self.offset = mean, axis, scale, offset
+
+    @classmethod
+    def fit(cls, emb: np.ndarray, spacing: int = 18, chunk: int = CHUNK) -> "Basis":
+        """PC1 from a covariance accumulated one chunk at a time: memory is
+        O(chunk·dim + dim²) and the axis is the exact full-data one."""
+        n, dim = emb.shape
+        total, scatter = np.zeros(dim), np.zeros((dim, dim))
+        for lo in range(0, n, chunk):
+            part = emb[lo:lo + chunk].astype(np.float64)
+            total += part.sum(axis=0)
+            scatter += part.T @ part
+        mean = total / max(n, 1)
+        cov = scatter / max(n, 1) - np.outer(mean, mean)
+        axis = np.linalg.eigh(cov)[1][:, -1].astype(np.float32)
+        axis *= np.sign(axis[np.argmax(np.abs(axis))])         # fix the sign once
+        basis = cls(mean.astype(np.float32), axis, 1., 0.)
+        s = basis.scores(emb, chunk)
+        span = float(s.max() - s.min()) if len(s) else 0.
+        basis.scale = spacing * max(n - 1, 1) / span if span else 1.
+        basis.offset = -float(s.min()) * basis.scale if len(s) else 0.
+        return basis
+
+    def scores(self, emb: np.ndarray, chunk: int = CHUNK) -> np.ndarray:
+        out = np.empty(len(emb), dtype=np.float64)
+        for lo in range(0, len(emb), chunk):
+            out[lo:lo + chunk] = (emb[lo:lo + chunk] - self.mean) @ self.axis
+        return out
+
+    def project(self, emb: np.ndarray, chunk: int = CHUNK) -> np.ndarray:
+        """y per row, rounded to whole px."""
+        return np.rint(self.scores(emb, chunk) * self.scale + self.offset).astype(np.int64)
+
+    def save(self, path: pathlib.Path):
+        np.savez(path, mean=self.mean, axis=self.axis, scale=self.scale, offset=self.offset)
+
+    @classmethod
+    def load(cls, path: pathlib.Path, dim: int) -> "Basis | None":
+        """The basis at `path`, or None if missing or fitted to another dimension."""
+        if not path.exists():
+            return None
+        z = np.load(path)
+        if z['axis'].shape != (dim,):
+            return None
+        return cls(z['mean'], z['axis'], float(z['scale']), float(z['offset']))
+
+
+def collide(y: np.ndarray, years: np.ndarray, min_gap: float) -> np.ndarray:
+    """Raise y within each year until neighbours are `min_gap` apart."""
+    if not len(y) or min_gap <= 0:
+        return y
+    import pandas as pd
+    order = np.lexsort((y, years))
+    ys, yr = y[order].astype(np.float64), years[order]
+    start = np.flatnonzero(np.r_[True, yr[1:] != yr[:-1]])
+    i = np.arange(len(ys)) - np.repeat(start, np.diff(np.r_[start, len(ys)]))
+    # y'_i = i·gap + max_{j<=i}(y_j - j·gap), the max restarting each year
+    z = pd.Series(ys - i * min_gap).groupby(yr).cummax().to_numpy()
+    out = np.empty_like(y)
+    out[order] = np.rint(z + i * min_gap).astype(y.dtype)
+    return out
+
+
+def place(emb: np.ndarray, *, mode: str = 'rank', spacing: int = 18,
+          years: np.ndarray | None = None, min_gap: float = 0,
+          basis_path: pathlib.Path | None = None, refit: bool = False) -> np.ndarray:
+    """y per row of `emb` (see module docstring)."""
+    if mode == 'rank':
+        y = rank(emb, spacing)
+    elif mode == 'ipca':
+        basis = None if refit or basis_path is None else Basis.load(basis_path, emb.shape[1])
+        if basis is None:
+            basis = Basis.fit(emb, spacing)
+            if basis_path is not None:
+                basis.save(basis_path)
+            print(f"[layout] fitted PCA basis over {len(emb)} papers")
+        y = basis.project(emb)
+    else:
+        raise ValueError(f"unknown layout mode {mode!r}; choose from {MODES}")
+    if min_gap and years is not None:
+        y = collide(y, np.asarray(years), min_gap)
+    return y
@@ -1,40 +1,148 @@
 """backend/lineage.py
-Creates vertical lineage threads by connecting consecutive publications of the
-*first* author.  Output edges carry a `yearGap` attribute so the front‑end can
-vary stroke opacity or dash pattern.
+Creates vertical lineage threads by connecting consecutive publications of
+every author (or only of the first author, `authors='first'`).  Output edges
+carry a `yearGap` attribute so the front‑end can vary stroke opacity or dash
+pattern, and `authors`, the number of authors whose thread links the pair.
+
+Authors are interned to integer ids through a normalised name key – accents,
+case and punctuation dropped, "Last, First" turned around, aliases from an
+optional variant → canonical table applied, and initials-only names
+("J. S. Bach") merged into the one full name they abbreviate
+("Johann Sebastian Bach") when it is unique.  Edges then come from one
+lexsort of the (author, date, paper id) authorship rows: consecutive rows of
+the same author are a (earlier, later) paper pair, and a pair threaded by
+several co-authors is written once.
 """
 from __future__ import annotations
-import json, pathlib, itertools
-from typing import List, Dict
-from .load_data import safe_parse_date
+import itertools, json, pathlib, re, time, unicodedata
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 
+from .defaults import LINEAGE_MODES as MODES
+from .load_data import date_columns
+
+WORD = re.compile(r"[^\W_]+")
+APOSTROPHE = re.compile(r"['’]")
+
+
+# ──────────────────────────────────────────────────────────────── authors
+def normalize(name: str) -> str:
+    """Comparison key of an author name: "Bach, J.-S." → "j s bach"."""
+    s = name
+    if not s.isascii():
+        s = ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
+    if s.count(',') == 1:
+        last, first = s.split(',')
+        s = f"{first} {last}"
+    return ' '.join(WORD.findall(APOSTROPHE.sub('', s).lower()))
+
+
+def _initials(keys: Sequence[str]) -> Dict[str, str]:
+    """initials-only key → the single full key with that surname and initials."""
+    full: Dict[tuple, set] = {}
+    short = []
+    for k in keys:
+        *given, last = k.split() or ['']
+        if not given:
+            continue
+        if all(len(g) == 1 for g in given):
+            short.append((k, (last, tuple(given))))
+        else:
+            full.setdefault((last, tuple(g[0] for g in given)), set()).add(k)
+    return {k: next(iter(full[sig])) for k, sig in short if len(full.get(sig, ())) == 1}
+
+
+def canonical(names: Sequence[str], aliases: Dict[str, str] | None = None
+              ) -> Tuple[np.ndarray, List[str]]:
+    """(author id per name, -1 when it has no letters; key per id)."""
+    alias = {normalize(a): normalize(b) for a, b in (aliases or {}).items()}
+    keys = []
+    for n in names:
+        k, seen = normalize(n), set()
+        while k in alias and k not in seen:        # follow alias chains, stop on cycles
+            seen.add(k); k = alias[k]
+        keys.append(k)
+    merge = _initials(list(dict.fromkeys(keys)))
+    id_of: Dict[str, int] = {}
+    ids = np.fromiter((id_of.setdefault(merge.get(k, k), len(id_of)) if k else -1
+                       for k in keys), dtype=np.int64, count=len(keys))
+    return ids, list(id_of)
 
-def build(papers: List[Dict], out_dir: pathlib.Path):
-    """Write lineage_edges.json connecting an author's successive papers."""
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    # group by first author
-    author_map: Dict[str, List[tuple]] = {}
-    for p in papers:
-        if p['authors']:
-            a0 = p['authors'][0]
-            dt = safe_parse_date(p['date_raw'])
-            if dt:
-                author_map.setdefault(a0, []).append((dt, p['id']))
-
-    edges = []
-    for pubs in author_map.values():
-        pubs.sort()  # by date
-        for (d1, pid1), (d2, pid2) in itertools.pairwise(pubs):
-            gap = (d2.year - d1.year) or 1  # avoid zero gap
-            edges.append({
-                'source': pid1,
-                'target': pid2,
-                'type'  : 'lineage',
-                'yearGap': gap
-            })
+def authorship(papers: Sequence[Dict], mode: str = 'all', aliases: Dict[str, str] | None = None
+               ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """(paper row, author id) per authorship row – each distinct raw name is
+    normalised once – and the author key table."""
+    lists = [p['authors'][:1] if mode == 'first' else p['authors'] for p in papers]
+    raw_of: Dict[str, int] = {}
+    raw = np.fromiter(map(raw_of.setdefault, itertools.chain.from_iterable(lists),
+                          itertools.count()), dtype=np.int64)
+    first = np.fromiter(raw_of.values(), dtype=np.int64, count=len(raw_of))
+    # raw positions → distinct-name index, in first-appearance order
+    slot = np.empty(len(raw), dtype=np.int64)
+    slot[first] = np.arange(len(first))
+    ids, keys = canonical(list(raw_of), aliases)
+    author = ids[slot[raw]]
+    paper = np.repeat(np.arange(len(papers)),
+                      np.fromiter(map(len, lists), dtype=np.int64, count=len(lists)))
+    keep = author >= 0
+    return paper[keep], author[keep], keys
 
+
+# ─────────────────────────────────────────────────────────────────── edges
+def pairs(paper: np.ndarray, author: np.ndarray, day: np.ndarray, rank: np.ndarray):
+    """(src, dst, authors) paper rows of consecutive publications per author.
+
+    Rows are ordered by (author, day, rank); a pair shared by co-authors is
+    kept once, at its first position, with the number of authors linking it."""
+    n = len(rank)
+    row = np.unique(paper * max(author.max(initial=0) + 1, 1) + author, return_index=True)[1]
+    paper, author = paper[np.sort(row)], author[np.sort(row)]   # one row per (paper, author)
+    order = np.lexsort((rank[paper], day[paper], author))
+    a, p = author[order], paper[order]
+    same = a[1:] == a[:-1]
+    src, dst = p[:-1][same], p[1:][same]
+    _, first, count = np.unique(src * n + dst, return_index=True, return_counts=True)
+    by_pos = np.argsort(first)
+    first = first[by_pos]
+    return src[first], dst[first], count[by_pos]
+
+
+def edges(papers: Sequence[Dict], mode: str = 'all',
+          aliases: Dict[str, str] | None = None) -> List[Dict]:
+    if mode not in MODES:
+        raise ValueError(f"lineage authors {mode!r}, expected one of {MODES}")
+    dates, years, valid = date_columns(papers)
+    paper, author, keys = authorship(papers, mode, aliases)
+    dated = valid[paper]
+    paper, author = paper[dated], author[dated]
+    # threads are emitted in order of each author's first dated paper
+    _, first, inv = np.unique(author, return_index=True, return_inverse=True)
+    author = np.argsort(np.argsort(first))[inv]
+    ids = [p['id'] for p in papers]
+    rank = np.empty(len(ids), dtype=np.int64)           # same-day papers: by id
+    rank[sorted(range(len(ids)), key=ids.__getitem__)] = np.arange(len(ids))
+    src, dst, count = pairs(paper, author, dates.astype('datetime64[D]').astype(np.int64),
+                            rank)
+    gap = years[dst].astype(np.int64) - years[src]
+    gap[gap == 0] = 1                       # avoid zero gap
+    print(f"[lineage] {len(paper)} authorships, {len(keys)} authors → {len(src)} edges")
+    return [{'source': ids[s], 'target': ids[t], 'type': 'lineage', 'yearGap': g,
+             'authors': c}
+            for s, t, g, c in zip(src.tolist(), dst.tolist(), gap.tolist(), count.tolist())]
+
+
+def write(edges: List[Dict], out_dir: pathlib.Path):
     (out_dir / 'lineage_edges.json').write_text(json.dumps(edges, indent=2))
     print(f"[lineage] wrote lineage_edges.json (edges: {len(edges)})")
 
-    return edges
+
+def build(papers: List[Dict], out_dir: pathlib.Path, authors: str = 'all',
+          aliases: Dict[str, str] | None = None):
+    """Write lineage_edges.json connecting each author's successive papers."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    es = edges(papers, authors, aliases)
+    write(es, out_dir)
+    print(f"[lineage] {len(papers)} papers in {time.perf_counter() - t0:.2f}s")
+    return es
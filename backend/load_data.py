@@ -1,19 +1,55 @@
 # backend/load_data.py
-import json, pathlib, re
-from typing import List, Dict, Any
+import json, os, pathlib, re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Sequence, Tuple
 
 from datetime import datetime
+import numpy as np
 
 DATE_PATTERNS = ["%Y/%m/%d", "%Y-%m-%d", "%Y/%m", "%Y-%m", "%Y"]
+# all of DATE_PATTERNS in one expression, with strptime's own %Y/%m/%d
+# sub-patterns, so it accepts exactly the strings one of the formats does
+DATE_RE = re.compile(r"(\d\d\d\d)(?:([/-])(1[0-2]|0[1-9]|[1-9])"
+                     r"(?:\2(3[01]|[12]\d|0[1-9]|[1-9]| [1-9]))?)?")
 
 def safe_parse_date(raw: str) -> datetime | None:
     """Return datetime if `raw` matches common patterns; else None."""
-    for fmt in DATE_PATTERNS:
-        try:
-            return datetime.strptime(raw, fmt)
-        except ValueError:
-            continue
-    return None
+    m = DATE_RE.fullmatch(raw) if isinstance(raw, str) else None
+    if not m:
+        return None
+    try:
+        return datetime(int(m[1]), int(m[3] or 1), int(m[4] or 1))
+    except ValueError:                       # 0000, Feb 30, …
+        return None
+
+def parse_dates(raws: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorised `safe_parse_date`: (datetime64[D] dates, int16 years, valid
+    mask) for a column of raw date strings; NaT / 0 where invalid.
+
+    Each distinct string is matched once; the calendar check is done on the
+    arrays."""
+    codes, uniq = np.empty(len(raws), dtype=np.int64), {}
+    for i, r in enumerate(raws):
+        codes[i] = uniq.setdefault(r, len(uniq))
+    ymd = np.zeros((len(uniq), 3), dtype=np.int64)
+    for j, r in enumerate(uniq):
+        m = DATE_RE.fullmatch(r) if isinstance(r, str) else None
+        if m:
+            ymd[j] = int(m[1]), int(m[3] or 1), int(m[4] or 1)
+    y, mo, d = ymd.T
+    month = ((y - 1970) * 12 + mo - 1).astype('datetime64[M]')
+    day = month.astype('datetime64[D]') + (d - 1)
+    ok = (y >= 1) & (day.astype('datetime64[M]') == month)   # day exists in month
+    day[~ok] = np.datetime64('NaT')
+    years = np.where(ok, y, 0).astype(np.int16)
+    return day[codes], years[codes], ok[codes]
+
+def date_columns(papers) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(dates, years, valid) of `papers`: the arrays a `Corpus` (or a stage's
+    projection of one) parsed at load time, else one `parse_dates` pass."""
+    if getattr(papers, 'dates', None) is not None:
+        return papers.dates, papers.years, ~np.isnat(papers.dates)
+    return parse_dates([p['date_raw'] for p in papers])
 
 def slug(text: str) -> str:
     t = re.sub(r"<[^>]+>", "", text)
@@ -27,18 +63,38 @@ def parse_date(raw: str) -> str:
     y, m, d = parts[:3]
     return f"{y}-{m.zfill(2)}-{d.zfill(2)}"
 
+def record(fp: pathlib.Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise one parsed paper JSON file into the pipeline's record shape."""
+    return {
+        "id"        : slug(data.get("title", fp.stem)),
+        "title"     : data.get("title", ""),
+        "authors"   : data.get("authors", []),
+        "date_raw"  : data.get("date", ""),
+        "date"      : parse_date(data.get("date", "1900/01/01")),
+        "keywords"  : data.get("keywords", []),
+        "abstract"  : data.get("abstract", ""),
+        "citations_raw": data.get("citations", {})
+    }
+
+def read(fp: pathlib.Path) -> Dict[str, Any]:
+    return record(fp, json.loads(fp.read_bytes()))
+
+def iter_papers(json_dir: pathlib.Path, workers: int | None = None,
+                chunksize: int = 64) -> Iterator[Dict[str, Any]]:
+    """Yield records in file order, parsing across a process pool.
+
+    `workers=None` uses every core; small directories (or `workers=1`) are
+    parsed in-process, where pool start-up would cost more than it saves."""
+    files = sorted(json_dir.glob('*.json'))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 4 * chunksize:
+        yield from map(read, files)
+        return
+    with ProcessPoolExecutor(workers) as ex:
+        yield from ex.map(read, files, chunksize=chunksize)
+
 def load(json_dir: pathlib.Path) -> List[Dict[str, Any]]:
     papers: List[Dict[str, Any]] = []
     for fp in sorted(json_dir.glob('*.json')):
-        data = json.loads(fp.read_text())
-        papers.append({
-            "id"        : slug(data.get("title", fp.stem)),
-            "title"     : data.get("title", ""),
-            "authors"   : data.get("authors", []),
-            "date_raw"  : data.get("date", ""),
-            "date"      : parse_date(data.get("date", "1900/01/01")),
-            "keywords"  : data.get("keywords", []),
-            "abstract"  : data.get("abstract", ""),
-            "citations_raw": data.get("citations", {})
-        })
+        papers.append(record(fp, json.loads(fp.read_text())))
     return papers
@@ -0,0 +1,219 @@
+"""backend/scheduler.py
+Runs the build stages as a small DAG.  Each `Stage` declares
+
+* the paper fields it reads (`needs`) – all the stage is given, and all its
+  skip hash covers; `dates` / `years` are the corpus' parsed-date arrays,
+* the stages it must follow (`after`) and the files it writes (`outputs`),
+* the modules its result depends on (`code`).
+
+Stages whose dependencies are done run concurrently, each in a freshly
+forked process (so its peak RSS is its own).  A stage is skipped when its outputs exist and the hash of its
+inputs, parameters and code matches the one recorded in
+`<out>/.stages.json` by the last run.  A timing / peak-memory / output-size
+report is printed at the end.  Stages named in `profile` run under cProfile
+(or pyinstrument), writing `<out>/.profile/<stage>.prof` (or `.html`).
+"""
+from __future__ import annotations
+import hashlib, importlib, inspect, json, multiprocessing, multiprocessing.connection, os, pathlib, \
+    pickle, resource, time, traceback
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from . import load_data
+from .defaults import PROFILERS
+
+MANIFEST = '.stages.json'
+PROFILE_DIR = '.profile'
+COLUMNS = ('dates', 'years')        # needs served as arrays, not record fields
+
+
+@dataclass
+class Stage:
+    name   : str
+    fn     : Callable                  # fn(papers, out_dir, **kwargs); module-level
+    needs  : Tuple[str, ...] | None    # paper fields read; None = whole record
+    outputs: Tuple[str, ...]           # files written into out_dir
+    code   : Tuple[str, ...] = ()      # extra modules the result depends on
+    after  : Tuple[str, ...] = ()
+    kwargs : Dict[str, Any] = field(default_factory=dict)
+    ignore : Tuple[str, ...] = ('cache',)   # kwargs that do not change outputs
+
+
+# ───────────────────────────────────────────────────────────────── hashing
+def _source_hash(modules: Sequence[str]) -> str:
+    h = hashlib.sha1()
+    for m in sorted(set(modules)):
+        h.update(pathlib.Path(inspect.getsourcefile(importlib.import_module(m))).read_bytes())
+    return h.hexdigest()
+
+
+class Projection(list):
+    """Records cut down to a stage's `needs`; needed `COLUMNS` ride along as
+    attributes (see `load_data.date_columns`)."""
+    dates = years = None
+
+
+def project(papers, needs: Tuple[str, ...] | None):
+    """The records a stage reads: whole records, or only the `needs` fields."""
+    if needs is None:
+        return papers
+    fields = [k for k in needs if k not in COLUMNS]
+    out = Projection({k: p[k] for k in fields} for p in papers)
+    if set(needs) & set(COLUMNS):
+        out.dates, out.years, _ = load_data.date_columns(papers)
+    return out
+
+
+def stage_key(stage: Stage, inputs) -> str:
+    h = hashlib.sha1()
+    h.update(pickle.dumps(inputs, protocol=4))
+    h.update(json.dumps({k: v for k, v in stage.kwargs.items() if k not in stage.ignore},
+                        sort_keys=True, default=str).encode())
+    h.update(_source_hash((stage.fn.__module__, *stage.code)).encode())
+    return h.hexdigest()
+
+
+# ───────────────────────────────────────────────────────────────── running
+def _rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def _profiled(fn, papers, out, kwargs, tool: str, path: pathlib.Path):
+    path.parent.mkdir(exist_ok=True)
+    if tool == 'pyinstrument':
+        from pyinstrument import Profiler
+        prof = Profiler(); prof.start()
+        try:
+            fn(papers, out, **kwargs)
+        finally:
+            prof.stop()
+            path.write_text(prof.output_html())
+    else:
+        import cProfile
+        prof = cProfile.Profile(); prof.enable()
+        try:
+            fn(papers, out, **kwargs)
+        finally:
+            prof.disable()
+            prof.dump_stats(path)
+
+
+def _child(conn, fn, papers, out, kwargs, profile=None):
+    """Worker body: run one stage, send back its wall time and peak RSS.
+    `profile`: (profiler, output path) to run it under a profiler."""
+    try:
+        try:
+            start = _rss_mb()
+        except OSError:
+            start = 0.
+        t0 = time.perf_counter()
+        if profile:
+            _profiled(fn, papers, out, kwargs, *profile)
+        else:
+            fn(papers, out, **kwargs)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        conn.send({'seconds': time.perf_counter() - t0, 'peak_mb': peak,
+                   'grew_mb': max(peak - start, 0.)})
+    except BaseException:
+        conn.send({'error': traceback.format_exc()})     # re-raised by the parent
+    finally:
+        conn.close()
+
+
+# fork where available: the child shares the loaded corpus and imports,
+# where spawn would pickle inputs and re-import torch & co. for every stage
+_CTX = multiprocessing.get_context(
+    'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def run(stages: List[Stage], papers, out: pathlib.Path, *, jobs: int | None = None,
+        force: bool = False, profile: Sequence[str] = (),
+        profiler: str = 'cprofile') -> Dict[str, dict]:
+    """Run `stages` (a DAG via `after`), each in a fresh process, at most
+    `jobs` at a time; returns the per-stage report.  Profiled stages are
+    never skipped."""
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = set(s.after) - set(by_name)
+        if missing:
+            raise ValueError(f"stage {s.name!r} follows unknown {sorted(missing)}")
+    unknown = set(profile) - set(by_name)
+    if unknown:
+        raise ValueError(f"cannot profile unknown stages {sorted(unknown)}")
+    if profiler not in PROFILERS:
+        raise ValueError(f"profiler must be one of {PROFILERS}, not {profiler!r}")
+    ext = '.html' if profiler == 'pyinstrument' else '.prof'
+    mpath = out / MANIFEST
+    manifest = json.loads(mpath.read_text()) if mpath.exists() else {}
+
+    report: Dict[str, dict] = {}
+    inputs, keys, fresh = {}, {}, {}
+    for s in stages:
+        inputs[s.name] = project(papers, s.needs)
+        keys[s.name] = stage_key(s, inputs[s.name])
+        fresh[s.name] = (not force and s.name not in profile
+                         and manifest.get(s.name) == keys[s.name]
+                         and all((out / f).exists() for f in s.outputs))
+
+    jobs = max(jobs or min(len(stages), os.cpu_count() or 1), 1)
+    t0 = time.perf_counter()
+    running: Dict[Any, tuple] = {}          # parent conn → (stage, process)
+    try:
+        while len(report) < len(stages):
+            for s in stages:
+                if len(running) >= jobs:
+                    break
+                if s.name in report or any(s.name == r[0] for r in running.values()) \
+                        or not all(a in report for a in s.after):
+                    continue
+                # skip only if nothing upstream was rebuilt either
+                if fresh[s.name] and all(report[a]['status'] == 'skipped' for a in s.after):
+                    report[s.name] = {'status': 'skipped'}
+                    continue
+                recv, send = _CTX.Pipe(duplex=False)
+                prof = ((profiler, out / PROFILE_DIR / f"{s.name}{ext}")
+                        if s.name in profile else None)
+                proc = _CTX.Process(target=_child, name=f"stage-{s.name}",
+                                    args=(send, s.fn, inputs[s.name], out, s.kwargs, prof))
+                proc.start(); send.close()
+                running[recv] = (s.name, proc)
+            if len(report) == len(stages):
+                break
+            if not running:
+                raise RuntimeError("stage graph has a cycle")
+            for conn in multiprocessing.connection.wait(list(running)):
+                name, proc = running.pop(conn)
+                try:
+                    result = conn.recv()
+                except EOFError:                    # killed before reporting
+                    result = None
+                proc.join()
+                if result is None:
+                    result = {'error': f"process exited with code {proc.exitcode}"}
+                if 'error' in result:
+                    raise RuntimeError(f"stage {name} failed:\n{result['error']}")
+                report[name] = {'status': 'ran', **result,
+                                'output_mb': sum((out / f).stat().st_size for f in
+                                                 by_name[name].outputs
+                                                 if (out / f).exists()) / 2**20}
+                manifest[name] = keys[name]
+                mpath.write_text(json.dumps(manifest, indent=2))
+    finally:
+        for _, proc in running.values():
+            proc.terminate()
+    report = {s.name: report[s.name] for s in stages}
+    print_report(report, time.perf_counter() - t0)
+    return report
+
+
+def print_report(report: Dict[str, dict], wall: float):
+    print(f"[stages] {'stage':<10} {'status':<8} {'time s':>7} {'peak MB':>8} {'grew MB':>8} "
+          f"{'out MB':>7}")
+    for name, r in report.items():
+        if r['status'] == 'ran':
+            print(f"[stages] {name:<10} {'ran':<8} {r['seconds']:>7.2f} "
+                  f"{r['peak_mb']:>8.0f} {r['grew_mb']:>8.0f} {r['output_mb']:>7.1f}")
+        else:
+            print(f"[stages] {name:<10} {r['status']:<8} {'-':>7} {'-':>8} {'-':>8} {'-':>7}")
+    print(f"[stages] wall {wall:.2f}s")
@@ -0,0 +1,170 @@
+"""backend/search.py
+Inverted full-text index over title, authors, keywords and abstract.
+
+Every field is lower-cased and split into word tokens; a paper's score for a
+term is the field-weighted term count (`FIELDS`, capped at 255).  Terms are
+kept sorted, so the terms starting with a query token form one contiguous
+range of the postings (prefix search while typing); tokens of three or more
+characters also match inside words through a trigram index over the
+vocabulary.  A query matches the papers containing every token, ranked by
+Σ idf · score (exact-term hits count double).
+
+Output
+------
+public/search_index.json – ids, "\\n"-joined terms and base64 little-endian
+arrays (uint32 offsets / docs, uint8 scores); compact enough to embed in the
+static HTML export, which decodes it the same way.
+"""
+from __future__ import annotations
+import base64, json, pathlib, re
+from bisect import bisect_left
+from functools import cached_property
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+FIELDS = {'title': 3, 'authors': 3, 'keywords': 2, 'abstract': 1}
+TOKEN = re.compile(r"\w+")
+VERSION = 1
+
+
+def tokens(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+def _text(p: Dict, field: str) -> str:
+    v = p.get(field) or ''
+    return v if isinstance(v, str) else ' '.join(v)
+
+
+def _b64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode()
+
+
+def _unb64(s: str, dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(s), dtype=dtype)
+
+
+class Index:
+    """Sorted vocabulary + CSR postings (doc, score) per term."""
+
+    def __init__(self, ids: Sequence[str], terms: Sequence[str],
+                 offsets: np.ndarray, docs: np.ndarray, scores: np.ndarray):
+        self.ids, self.terms = ids, terms          # lists, or `graph_store` columns
+        self.offsets, self.docs, self.scores = offsets, docs, scores
+        df = np.diff(offsets).astype(np.float64)
+        self.idf = np.log1p(len(self.ids) / np.maximum(df, 1)).astype(np.float32)
+
+    @classmethod
+    def build(cls, papers: Sequence[Dict], fields: Dict[str, int] = FIELDS) -> "Index":
+        term_of: Dict[str, int] = {}
+        T, D, S = [], [], []
+        for d, p in enumerate(papers):
+            tf: Dict[int, int] = {}
+            for field, w in fields.items():
+                for t in tokens(_text(p, field)):
+                    t = term_of.setdefault(t, len(term_of))
+                    tf[t] = tf.get(t, 0) + w
+            T += tf.keys(); D += [d] * len(tf); S += tf.values()
+        vocab = np.array(list(term_of), dtype=object)
+        order = np.argsort(vocab.astype(str), kind='stable') if len(vocab) else np.zeros(0, int)
+        rank = np.empty(len(vocab), dtype=np.int64); rank[order] = np.arange(len(vocab))
+        T = rank[np.asarray(T, dtype=np.int64)]
+        D = np.asarray(D, dtype=np.uint32)
+        post = np.lexsort((D, T))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.uint32)
+        np.cumsum(np.bincount(T, minlength=len(vocab)), out=offsets[1:])
+        return cls([p['id'] for p in papers], vocab[order].tolist(), offsets, D[post],
+                   np.minimum(np.asarray(S, dtype=np.int64)[post], 255).astype(np.uint8))
+
+    # ─────────────────────────────────────────────────────────── storage
+    def to_json(self) -> dict:
+        return {'version': VERSION, 'ids': list(self.ids), 'terms': '\n'.join(self.terms),
+                'offsets': _b64(self.offsets.astype('<u4')),
+                'docs': _b64(self.docs.astype('<u4')),
+                'scores': _b64(self.scores.astype(np.uint8))}
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Index":
+        if d.get('version') != VERSION:
+            raise ValueError(f"search index version {d.get('version')!r}, expected {VERSION}")
+        return cls(d['ids'], d['terms'].split('\n') if d['terms'] else [],
+                   _unb64(d['offsets'], '<u4'), _unb64(d['docs'], '<u4'),
+                   _unb64(d['scores'], np.uint8))
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Index":
+        return cls.from_json(json.loads(pathlib.Path(path).read_text()))
+
+    # ──────────────────────────────────────────────────────────── lookup
+    @cached_property
+    def trigrams(self) -> Dict[str, np.ndarray]:
+        """trigram → ids of the terms containing it (built on first use)."""
+        grams: Dict[str, List[int]] = {}
+        for i, t in enumerate(self.terms):
+            for g in {t[k:k + 3] for k in range(len(t) - 2)}:
+                grams.setdefault(g, []).append(i)
+        return {g: np.asarray(ts, dtype=np.int64) for g, ts in grams.items()}
+
+    def _prefix(self, tok: str) -> Tuple[int, int]:
+        return bisect_left(self.terms, tok), bisect_left(self.terms, tok + '\uffff')
+
+    def _matches(self, tok: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(docs, weights) of every posting of a term containing `tok`."""
+        lo, hi = self._prefix(tok)
+        spans = [(lo, hi)]
+        if len(tok) >= 3:
+            cand = None
+            for k in range(len(tok) - 2):
+                ts = self.trigrams.get(tok[k:k + 3])
+                if ts is None:
+                    cand = None
+                    break
+                cand = ts if cand is None else np.intersect1d(cand, ts, assume_unique=True)
+            if cand is not None:
+                spans += [(t, t + 1) for t in cand.tolist()
+                          if not lo <= t < hi and tok in self.terms[t]]
+        exact = lo if lo < hi and self.terms[lo] == tok else -1
+        docs, weights = [], []
+        for a, b in spans:
+            if a == b:
+                continue
+            p, q = self.offsets[a], self.offsets[b]
+            term = np.repeat(np.arange(a, b), np.diff(self.offsets[a:b + 1]).astype(np.int64))
+            w = self.scores[p:q] * self.idf[term]
+            if a <= exact < b:
+                w[term == exact] *= 2
+            docs.append(self.docs[p:q])
+            weights.append(w)
+        if not docs:
+            return np.zeros(0, np.uint32), np.zeros(0, np.float32)
+        return np.concatenate(docs), np.concatenate(weights)
+
+    def search(self, query: str, limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc positions, scores) of papers matching every query token, best first."""
+        hits = scores = None
+        for tok in dict.fromkeys(tokens(query)):
+            docs, w = self._matches(tok)
+            u, inv = np.unique(docs, return_inverse=True)
+            s = np.bincount(inv, w, minlength=len(u))
+            if hits is None:
+                hits, scores = u, s
+            else:
+                hits, i, j = np.intersect1d(hits, u, assume_unique=True, return_indices=True)
+                scores = scores[i] + s[j]
+            if not len(hits):
+                break
+        if hits is None:
+            return np.zeros(0, np.int64), np.zeros(0)
+        order = np.lexsort((hits, -scores))[:limit]
+        return hits[order].astype(np.int64), scores[order]
+
+
+def build(papers: List[Dict], out_dir: pathlib.Path):
+    """Index `papers` and write search_index.json."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = Index.build(papers)
+    body = json.dumps(index.to_json(), separators=(',', ':'))
+    (out_dir / 'search_index.json').write_text(body)
+    print(f"[search] wrote search_index.json (terms: {len(index.terms)}, "
+          f"postings: {len(index.docs)}, {len(body) / 2**20:.1f} MB)")
+    return index
@@ -1,39 +1,120 @@
-from .load_data import slug
-from sentence_transformers import SentenceTransformer
-from sklearn.decomposition import PCA
-from sklearn.neighbors import NearestNeighbors
-import numpy as np, json, pathlib, datetime as dt, re
+from .load_data import slug, date_columns
+from .embed_cache import text_hash
+from .embedder import MODEL, Encoder, dequantize
+from .layout import BASIS, place
+from . import citation, knn
+import numpy as np, json, pathlib, datetime as dt, re, time
 
-DATE4 = re.compile(r'^(\\d{4})')
+DATE4 = re.compile(r'^(\d{4})')
 
 def safe_year(date_iso:str)->int:
     m = DATE4.match(date_iso)
     return int(m.group(1)) if m else 1900
 
-def build(papers, out:pathlib.Path, top_k=5, sim_th=.6, spacing=18):
-    docs=[(p['abstract'] or '')+' '+' '.join(p['keywords']) for p in papers]
-    model=SentenceTransformer('all-MiniLM-L6-v2')
-    emb=model.encode(docs,batch_size=32,show_progress_bar=True,normalize_embeddings=True)
+def document(p)->str:
+    return (p['abstract'] or '')+' '+' '.join(p['keywords'])
 
-    pc1=PCA(1).fit_transform(emb).flatten()
-    order=np.argsort(pc1)
-    y={papers[idx]['id']:int(i*spacing) for i,idx in enumerate(order)}
+def encode(docs, encoder=None):
+    """Unit vectors (encoder.dtype) for docs; see backend.embedder."""
+    return (encoder or Encoder()).encode(docs)
 
-    nn = NearestNeighbors(n_neighbors=top_k + 1, metric='cosine').fit(emb)
-    dist,idx=nn.kneighbors(emb); sim=1-dist
+def embed(docs, cache=None, encoder=None):
+    """float32 vectors for docs, reusing and persisting them through an EmbeddingStore."""
+    t0=time.perf_counter()
+    if cache is None:
+        emb=dequantize(encode(docs, encoder)); hits,misses=0,len(docs)
+    else:
+        emb=cache.get([text_hash(d) for d in docs],
+                      lambda miss: encode([docs[i] for i in miss], encoder))
+        hits,misses=cache.hits,cache.misses; cache.save()
+    print(f"[semantic] embeddings: {hits} cached, {misses} encoded "
+          f"in {time.perf_counter()-t0:.2f}s ({'warm' if hits else 'cold'})")
+    return emb
 
+def layout(papers, emb, spacing=18, **opts):
+    """yPx per paper id; see backend.layout (default: rank along PC1)."""
+    y=place(emb, spacing=spacing, **opts)
+    return {papers[i]['id']:int(y[i]) for i in np.argsort(y, kind='stable').tolist()}
+
+def neighbors(emb, top_k=5, rows=None, engine='exact', **opts):
+    """(indices, similarities) of the top_k+1 cosine neighbours of emb[rows],
+    the paper itself first.  See backend.knn for the engines; 'exact' breaks
+    ties by lower index, so a row's result depends only on the relative order
+    of the papers – which is what lets the incremental pipeline requery
+    single rows and still match a full rebuild."""
+    return knn.search(emb, top_k+1, rows, engine, **opts)
+
+def paper_edges(papers, i, nbrs, sims, sim_th, years):
+    """Edges from papers[i]; the first neighbour is taken to be the paper itself."""
     edges=[]
-    years={p['id']:safe_year(p['date']) for p in papers}
-    for i,(nbrs,sims) in enumerate(zip(idx,sim)):
-        s=papers[i]['id']
-        for j,c in zip(nbrs[1:],sims[1:]):
-            if c<sim_th: continue
-            t=papers[j]['id']
-            edges.append({'source':s,'target':t,'type':'semantic',
-                          'weight':round(float(c),4),
-                          'yearLag':abs(years[s]-years[t])})
+    s=papers[i]['id']
+    for j,c in zip(nbrs[1:],sims[1:]):
+        if c<sim_th: continue
+        t=papers[j]['id']
+        edges.append({'source':s,'target':t,'type':'semantic',
+                      'weight':round(float(c),4),
+                      'yearLag':abs(years[s]-years[t])})
+    return edges
+
+def temporal_file(spec)->str:
+    """Output file of a knn.parse_window spec, e.g. semantic_past_edges.json."""
+    return f"semantic_{knn.parse_window(spec)[0]}_edges.json"
+
+def write_temporal(papers, emb, yrs, years, specs, out:pathlib.Path, top_k=5, sim_th=.6):
+    """One semantic_<window>_edges.json per spec: neighbours searched only
+    among the papers inside that year window, so none of the top_k is spent
+    on papers a post-filter would drop.  yrs: per-row years (0 = undated).
+    Window files of earlier runs not in `specs` are deleted, so the app does
+    not list stale windows."""
+    keep={temporal_file(spec) for spec in specs}
+    for fp in sorted(out.glob('semantic_*_edges.json')):
+        if fp.name not in keep:
+            fp.unlink()
+            print(f"[semantic] removed {fp.name} (window no longer requested)")
+    for spec in specs:
+        name,lo,hi=knn.parse_window(spec)
+        t0=time.perf_counter()
+        idx,sim=knn.temporal(emb, yrs, top_k+1, lo, hi) if len(papers) else ([],[])
+        print(f"[semantic] {name} kNN over {len(papers)} papers in {time.perf_counter()-t0:.2f}s")
+        edges=[]
+        for i,(nbrs,sims) in enumerate(zip(idx,sim)):
+            edges+=paper_edges(papers, i, nbrs, sims, sim_th, years)
+        (out/temporal_file(spec)).write_text(json.dumps(edges,indent=2))
+
+def write_empty(out:pathlib.Path, temporal=()):
+    """Outputs of an empty corpus, replacing those of the last run."""
+    write([], {}, [], out)
+    write_temporal([], None, None, {}, temporal, out)
 
-    nodes=[{**p,'yPx':y[p['id']], 'totalCitations':0} for p in papers]
+def write(papers, y, edges, out:pathlib.Path):
+    nodes=[{**p,'yPx':y[p['id']]} for p in papers]
+    citation.annotate(nodes, citation.read(out))   # metrics of the last citation run
 
     (out/'nodes.json').write_text(json.dumps(nodes,indent=2))
     (out/'semantic_edges.json').write_text(json.dumps(edges,indent=2))
+
+def build(papers, out:pathlib.Path, top_k=5, sim_th=.6, spacing=18, cache=None,
+          engine='exact', encoder=None, temporal=(), placement='rank', min_gap=0,
+          refit=False):
+    if not papers:
+        if encoder is not None: encoder.close()
+        return write_empty(out, temporal)
+    try:
+        emb=embed([document(p) for p in papers], cache, encoder)
+    finally:    # stages run in short-lived processes: do not orphan the pool
+        if encoder is not None: encoder.close()
+    _,yrs,valid=date_columns(papers)
+    y=layout(papers, emb, spacing, mode=placement, years=yrs, min_gap=min_gap,
+             basis_path=out/BASIS, refit=refit)
+    t0=time.perf_counter()
+    idx,sim=neighbors(emb, top_k, engine=engine)
+    print(f"[semantic] {engine} kNN over {len(emb)} papers in {time.perf_counter()-t0:.2f}s")
+
+    edges=[]
+    years={p['id']:int(yr) if ok else safe_year(p['date'])
+           for p,yr,ok in zip(papers,yrs.tolist(),valid.tolist())}
+    for i,(nbrs,sims) in enumerate(zip(idx,sim)):
+        edges+=paper_edges(papers, i, nbrs, sims, sim_th, years)
+
+    write(papers, y, edges, out)
+    write_temporal(papers, emb, yrs, years, temporal, out, top_k, sim_th)
@@ -4,56 +4,166 @@ when they share ≥ `min_shared` canonical reference strings.  Edge attribute
 `weight` equals the number of shared references so the front‑end can scale
 stroke width (e.g., `sqrt(weight)`).
 
+Coupling counts are computed as the sparse product A·Aᵀ of the binary
+paper × reference incidence matrix A, one row block at a time, so popular
+references no longer cost O(citers²) dict increments and sub‑threshold pairs
+only ever exist inside the current block.  An optional normalised `score`
+(Jaccard or cosine) can be attached to every edge.
+
+With `canonicalize`, near-duplicate citation strings (other page numbers,
+edition years or punctuation) are first resolved to one canonical reference
+by `backend.refs` (MinHash/LSH blocking, cached in `<out>/.refs_canon.json`).
+
 Output
 ------
-public/sharedRef_edges.json
+public/sharedref_edges.json (an older run's sharedRef_edges.json is removed)
 """
 from __future__ import annotations
-import json, pathlib, re, itertools, collections
-from typing import List, Dict
-
-# we re‑use the lightweight slug function; import from citation if available
-try:
-    from .citation import _slug  # type: ignore
-except ImportError:
-    def _slug(txt: str) -> str:            # fallback copy
-        txt = re.sub(r"<[^>]+>", "", txt)
-        txt = re.sub(r"[^\w\s-]", "", txt.lower())
-        return re.sub(r"\s+", " ", txt).strip()
+import json, pathlib, collections, functools
+from typing import List, Dict, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+from . import refs
+from .citation import _slug
+
+# the same canonical work is cited by many papers; slug each string once
+_ref_slug = functools.lru_cache(maxsize=1 << 18)(_slug)
 
 # ──────────────────────────────────────────────────────────────────────────────
 
-def build(papers: List[Dict], out_dir: pathlib.Path, *, min_shared: int = 2):
-    """Generate bibliographic‑coupling edges and write sharedRef_edges.json.
+def paper_refs(p: Dict, canon: Dict[str, str] | None = None) -> set[str]:
+    """Canonical reference slugs cited by one paper (mapped through `canon`,
+    a slug → canonical slug dict from `refs.resolve`, when given)."""
+    slugs = {_ref_slug(ref) for ref in p['citations_raw'].values()}
+    return {canon.get(s, s) for s in slugs} if canon else slugs
+
+
+def incidence(papers: List[Dict], canon: Dict[str, str] | None = None
+              ) -> Tuple[List[str], sp.csr_matrix]:
+    """(unique paper ids, binary paper × reference CSR matrix).
+
+    Papers sharing an id (duplicate title slugs) collapse into one row, as
+    they did in the original slug → set(paper_ids) index."""
+    row_of: Dict[str, int] = {}
+    col_of: Dict[str, int] = {}
+    rows, cols = [], []
+    for p in papers:
+        r = row_of.setdefault(p['id'], len(row_of))
+        for ref in paper_refs(p, canon):
+            rows.append(r); cols.append(col_of.setdefault(ref, len(col_of)))
+    A = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                      shape=(len(row_of), len(col_of)))
+    A.sum_duplicates(); A.data[:] = 1
+    return list(row_of), A
+
+
+def coupling(A: sp.csr_matrix, min_shared: int = 2, *, max_block_nnz: int = 1 << 24):
+    """Upper-triangle pairs (i, j, shared) of A·Aᵀ with shared ≥ min_shared.
+
+    Rows are processed in blocks whose product size is bounded by
+    `max_block_nnz` (estimated from reference popularity), which caps peak
+    memory independently of corpus size."""
+    A = A.tocsr(); At = A.T.tocsr()
+    popularity = np.asarray(A.sum(axis=0)).ravel()
+    cost = np.cumsum(A @ popularity)                 # ≥ nnz of each product row
+    I, J, W = [], [], []
+    lo = 0
+    while lo < A.shape[0]:
+        base = cost[lo - 1] if lo else 0
+        hi = max(lo + 1, int(np.searchsorted(cost, base + max_block_nnz, 'right')))
+        C = (A[lo:hi] @ At).tocoo()
+        i = C.row.astype(np.int64) + lo
+        keep = (C.col > i) & (C.data >= min_shared)
+        I.append(i[keep]); J.append(C.col[keep].astype(np.int64)); W.append(C.data[keep])
+        lo = hi
+    cat = lambda xs, dt: np.concatenate(xs).astype(dt) if xs else np.zeros(0, dt)
+    return cat(I, np.int64), cat(J, np.int64), cat(W, np.int64)
+
+
+def normalised(A: sp.csr_matrix, i, j, w, how: str) -> np.ndarray:
+    """Jaccard |Ri∩Rj|/|Ri∪Rj| or cosine |Ri∩Rj|/√(|Ri||Rj|) for each pair."""
+    deg = np.asarray(A.sum(axis=1)).ravel().astype(np.float64)
+    if how == 'jaccard':
+        return w / (deg[i] + deg[j] - w)
+    if how == 'cosine':
+        return w / np.sqrt(deg[i] * deg[j])
+    raise ValueError(f"unknown normalisation {how!r}")
+
+
+def to_edges(pair_counts: Dict[tuple[str, str], int], min_shared: int) -> List[Dict]:
+    """Edge list for pairs with weight ≥ min_shared, sorted by (source, target)
+    so the output does not depend on the order papers were processed in."""
+    return [
+        {'source': a, 'target': b, 'type': 'sharedRef', 'weight': w}
+        for (a, b), w in sorted(pair_counts.items()) if w >= min_shared
+    ]
+
+
+EDGES = 'sharedref_edges.json'
+LEGACY = 'sharedRef_edges.json'        # former name: would shadow or be shadowed by EDGES
+
+
+def write(edges: List[Dict], out_dir: pathlib.Path):
+    # unlink first: on a case-insensitive file system both names are one file
+    (out_dir / LEGACY).unlink(missing_ok=True)
+    (out_dir / EDGES).write_text(json.dumps(edges, indent=2))
+    print(f"[sharedRef] wrote {EDGES} (edges: {len(edges)})")
+
+
+def coupling_edges(papers: List[Dict], min_shared: int = 2, *,
+                   normalize: str | None = None,
+                   max_block_nnz: int = 1 << 24,
+                   canon: Dict[str, str] | None = None) -> List[Dict]:
+    """Edge list in the same order as `to_edges`, via the sparse engine."""
+    # 1. binary paper × (canonical) reference incidence matrix
+    ids, A = incidence(papers, canon)
+
+    # 2. shared-reference counts for every pair above threshold, A·Aᵀ
+    i, j, w = coupling(A, min_shared, max_block_nnz=max_block_nnz)
+
+    # 3. order endpoints and edges by id, as to_edges() does
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[sorted(range(len(ids)), key=ids.__getitem__)] = np.arange(len(ids))
+    swap = rank[i] > rank[j]
+    a, b = np.where(swap, j, i), np.where(swap, i, j)
+    order = np.lexsort((rank[b], rank[a]))
+    score = normalised(A, i, j, w, normalize)[order] if normalize else None
+
+    edges = []
+    for n, (s, t, c) in enumerate(zip(a[order].tolist(), b[order].tolist(),
+                                      w[order].tolist())):
+        e = {'source': ids[s], 'target': ids[t], 'type': 'sharedRef', 'weight': c}
+        if score is not None:
+            e['score'] = round(float(score[n]), 4)
+        edges.append(e)
+    return edges
+
+
+def build(papers: List[Dict], out_dir: pathlib.Path, *, min_shared: int = 2,
+          normalize: str | None = None, max_block_nnz: int = 1 << 24,
+          canonicalize: bool = False, ref_threshold: float = refs.THRESHOLD):
+    """Generate bibliographic‑coupling edges and write sharedref_edges.json.
 
     Parameters
     ----------
-    papers     list[dict]  – records from backend.load_data.load()
-    out_dir    Path        – destination dir
-    min_shared int         – minimum #common references to keep an edge
+    papers        list[dict]  – records from backend.load_data.load()
+    out_dir       Path        – destination dir
+    min_shared    int         – minimum #common references to keep an edge
+    normalize     str | None  – add a 'jaccard' or 'cosine' `score` per edge
+    max_block_nnz int         – product entries per row block (peak memory)
+    canonicalize  bool        – merge near-duplicate citation strings first
+    ref_threshold float       – word Jaccard at which two citations merge
     """
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # 1. map canonical reference slug → set(paper_ids)
-    ref_index: Dict[str, set[str]] = collections.defaultdict(set)
-    for p in papers:
-        pid = p['id']
-        for ref in p['citations_raw'].values():
-            ref_index[_slug(ref)].add(pid)
-
-    # 2. count shared occurrences for every unordered pair
-    pair_counts: Dict[tuple[str, str], int] = collections.Counter()
-    for plist in ref_index.values():
-        for a, b in itertools.combinations(sorted(plist), 2):
-            pair_counts[(a, b)] += 1
-
-    # 3. convert to edge list with weight ≥ min_shared
-    edges = [
-        {'source': a, 'target': b, 'type': 'sharedRef', 'weight': w}
-        for (a, b), w in pair_counts.items() if w >= min_shared
-    ]
+    canon = None
+    if canonicalize:
+        canon = refs.resolve({s for p in papers for s in paper_refs(p)},
+                             out_dir, ref_threshold)
+    edges = coupling_edges(papers, min_shared, normalize=normalize,
+                           max_block_nnz=max_block_nnz, canon=canon)
 
-    (out_dir / 'sharedRef_edges.json').write_text(json.dumps(edges, indent=2))
-    print(f"[sharedRef] wrote sharedRef_edges.json (edges: {len(edges)})")
+    write(edges, out_dir)
 
-    return edges
\ No newline at end of file
+    return edges
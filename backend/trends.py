@@ -0,0 +1,242 @@
+"""backend/trends.py
+Keyword bursts and trends over fine time bins: calendar months, quarters or
+issues (each distinct publication date, MTO's cadence).
+
+One pass over the (paper, keyword) rows gives a keyword × bin count matrix
+`r` next to the papers per bin `d`.  Over all keywords at once:
+
+* bursts – Kleinberg's two-state batched automaton: in the base state a
+           paper carries keyword k with its overall rate p0 = Σr / Σd, in the
+           burst state with p1 = `scale` · p0; a bin costs −log of its
+           binomial likelihood, entering the burst state γ·ln(bins).  The
+           cheapest state sequence (one Viterbi sweep over the bins, vector
+           over the keywords) gives the burst intervals, weighted by the
+           cost they save.
+* trends – the rolling z-score of each bin's keyword share r/d against
+           the `window` bins before it; the latest and the peak one are kept.
+
+Keywords are lower-cased with whitespace collapsed; those on fewer than
+`min_papers` papers are dropped.
+
+Output
+------
+public/trends.json – bin starts and paper totals, the kept keywords with
+their non-zero counts (base64 CSR over bins, as in search_index.json), the
+bursts and the per-keyword trend.
+"""
+from __future__ import annotations
+import base64, collections, itertools, json, pathlib, time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+from .defaults import BURST_GAMMA as GAMMA, BURST_SCALE as SCALE, TREND_BINS as BINS, \
+    TREND_WINDOW as WINDOW
+from .load_data import date_columns
+
+TRENDS = 'trends.json'
+MIN_PAPERS = 5
+VERSION = 1
+
+
+def _b64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode()
+
+
+def keyword(k: str) -> str:
+    return ' '.join(k.lower().split())
+
+
+# ──────────────────────────────────────────────────────────────── counts
+def bins(dates: np.ndarray, mode: str = 'month') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(bin of each dated paper, bin start dates, bin end dates – exclusive)."""
+    if mode not in BINS:
+        raise ValueError(f"trend bin {mode!r}, expected one of {BINS}")
+    if mode == 'issue':                        # an issue lasts until the next one
+        start, b = np.unique(dates.astype('datetime64[D]'), return_inverse=True)
+        return b, start, np.append(start[1:], start[-1:] + 1)
+    m = dates.astype('datetime64[M]').astype(np.int64)
+    step = 3 if mode == 'quarter' else 1
+    m0 = m.min() // step * step if len(m) else 0
+    b = (m - m0) // step
+    start = m0 + np.arange(b.max() + 1 if len(b) else 0) * step
+    month = lambda v: v.astype('datetime64[M]').astype('datetime64[D]')
+    return b, month(start), month(start + step)
+
+
+def counts(papers: Sequence[Dict], mode: str = 'month', min_papers: int = MIN_PAPERS):
+    """(keywords, r: keyword × bin papers, d: papers per bin, bin starts, ends)."""
+    dates, _, valid = date_columns(papers)
+    rows = np.flatnonzero(valid)
+    b, start, end = bins(dates[rows], mode)
+    d = np.bincount(b, minlength=len(start))
+    # intern the raw strings, normalise each distinct one once
+    lists = [papers[i]['keywords'] for i in rows.tolist()]
+    raw_of: Dict[str, int] = {}
+    raw = np.fromiter(map(raw_of.setdefault, itertools.chain.from_iterable(lists),
+                          itertools.count()), dtype=np.int64)
+    first = np.fromiter(raw_of.values(), dtype=np.int64, count=len(raw_of))
+    kw_of: Dict[str, int] = {}
+    canon = np.fromiter((kw_of.setdefault(k, len(kw_of)) if k else -1
+                         for k in map(keyword, raw_of)), dtype=np.int64, count=len(raw_of))
+    slot = np.empty(len(raw), dtype=np.int64)
+    slot[first] = np.arange(len(first))
+    kw = canon[slot[raw]]
+    pb = np.repeat(np.arange(len(rows)),
+                   np.fromiter(map(len, lists), dtype=np.int64, count=len(lists)))
+    pair = np.unique(pb[kw >= 0] * max(len(kw_of), 1) + kw[kw >= 0])   # once per paper
+    kw, pb = pair % max(len(kw_of), 1), b[pair // max(len(kw_of), 1)]
+    per_kw = np.bincount(kw, minlength=len(kw_of))
+    keep = np.flatnonzero(per_kw >= min_papers)
+    keep = keep[np.argsort(-per_kw[keep], kind='stable')]       # most frequent first
+    slot = np.full(len(kw_of), -1, dtype=np.int64)
+    slot[keep] = np.arange(len(keep))
+    s = slot[kw]
+    r = np.bincount(s[s >= 0] * len(start) + pb[s >= 0],
+                    minlength=len(keep) * len(start)).reshape(len(keep), len(start))
+    names = list(kw_of)
+    return [names[k] for k in keep.tolist()], r, d, start, end
+
+
+# ─────────────────────────────────────────────────────────────── detectors
+def bursts(r: np.ndarray, d: np.ndarray, scale: float = SCALE, gamma: float = GAMMA
+           ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(keyword, first bin, last bin, weight) of every burst interval."""
+    K, T = r.shape
+    if not K or not T:
+        return (np.zeros(0, dtype=np.int64),) * 3 + (np.zeros(0),)
+    p0 = np.clip(r.sum(1) / max(d.sum(), 1), 1e-9, 1 - 1e-9)[:, None]
+    p1 = np.minimum(scale * p0, 1 - 1e-9)
+    miss = d[None, :] - r
+    c0 = -(r * np.log(p0) + miss * np.log1p(-p0))
+    c1 = -(r * np.log(p1) + miss * np.log1p(-p1))
+    tau = gamma * np.log(T)
+    # Viterbi over the bins, keeping each state's best predecessor
+    from0 = np.empty((K, T), dtype=bool)        # state 0 at t came from state 0
+    from1 = np.empty((K, T), dtype=bool)        # state 1 at t came from state 1
+    a, b = np.zeros(K), np.full(K, tau)
+    for t in range(T):
+        from0[:, t], from1[:, t] = a <= b, b <= a + tau
+        a, b = np.minimum(a, b) + c0[:, t], np.minimum(a + tau, b) + c1[:, t]
+    state = np.empty((K, T), dtype=bool)
+    s = b < a
+    for t in range(T - 1, -1, -1):
+        state[:, t] = s
+        s = np.where(s, from1[:, t], ~from0[:, t])
+    edge = np.diff(np.pad(state, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    k, t0 = np.nonzero(edge == 1)
+    t1 = np.nonzero(edge == -1)[1] - 1          # row-major: matches the starts
+    gain = np.cumsum(np.pad(c0 - c1, ((0, 0), (1, 0))), axis=1)
+    return k, t0, t1, gain[k, t1 + 1] - gain[k, t0]
+
+
+def zscores(r: np.ndarray, d: np.ndarray, window: int = WINDOW) -> np.ndarray:
+    """Keyword × bin z-score of the share r/d against the `window` bins before
+    (0 until a full window, in empty bins and where that window is flat)."""
+    x = r / np.maximum(d, 1)
+    K, T = x.shape
+    z = np.zeros((K, T))
+    if T <= window:
+        return z
+    c1 = np.cumsum(np.pad(x, ((0, 0), (1, 0))), axis=1)
+    c2 = np.cumsum(np.pad(x * x, ((0, 0), (1, 0))), axis=1)
+    mean = (c1[:, window:-1] - c1[:, :-window - 1]) / window
+    var = (c2[:, window:-1] - c2[:, :-window - 1]) / window - mean ** 2
+    sd = np.sqrt(np.maximum(var, 0))
+    ok = (sd > 1e-12) & (d[None, window:] > 0)
+    z[:, window:] = np.where(ok, (x[:, window:] - mean) / np.where(ok, sd, 1), 0)
+    return z
+
+
+# ─────────────────────────────────────────────────────────────────── build
+def trends(papers: Sequence[Dict], mode: str = 'month', scale: float = SCALE,
+           gamma: float = GAMMA, window: int = WINDOW, min_papers: int = MIN_PAPERS) -> Dict:
+    """The trends.json document."""
+    kws, r, d, start, end = counts(papers, mode, min_papers)
+    k, t0, t1, w = bursts(r, d, scale, gamma)
+    z = zscores(r, d, window)
+    iso, iso_end = (np.datetime_as_string(v, unit='D').tolist() for v in (start, end))
+    order = np.argsort(-w, kind='stable')
+    last, peak = len(d) - 1, z.argmax(1) if len(d) else np.zeros(0, dtype=np.int64)
+    nz = np.nonzero(r)
+    return {
+        'version': VERSION, 'bin': mode, 'scale': scale, 'gamma': gamma, 'window': window,
+        'bins': iso, 'totals': d.tolist(), 'keywords': kws,
+        'series': {'offsets': _b64(np.searchsorted(nz[0], np.arange(len(kws) + 1))
+                                   .astype('<u4')),
+                   'bins': _b64(nz[1].astype('<u4')), 'counts': _b64(r[nz].astype('<u4'))},
+        'bursts': [{'keyword': kws[i], 'start': iso[a], 'end': iso_end[b],
+                    'weight': round(float(g), 3)}
+                   for i, a, b, g in zip(k[order].tolist(), t0[order].tolist(),
+                                         t1[order].tolist(), w[order].tolist())],
+        'trends': [{'keyword': kw, 'z': round(float(z[i, last]), 3),
+                    'peak': round(float(z[i, peak[i]]), 3), 'peakBin': iso[peak[i]]}
+                   for i, kw in enumerate(kws)],
+    }
+
+
+# ───────────────────────────────────────────────────────────────── overlay
+STRONGEST = '*'                # overlay value: the strongest bursts of any keyword
+BURST_COLOR = '255,127,14'
+
+
+def load(path) -> Dict | None:
+    path = pathlib.Path(path)
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def options(doc: Dict | None) -> List[Dict]:
+    """Dropdown options: the strongest bursts, then every bursting keyword
+    (strongest burst first)."""
+    if not doc or not doc['bursts']:
+        return []
+    n = collections.Counter(b['keyword'] for b in doc['bursts'])
+    return [{'label': 'Strongest bursts', 'value': STRONGEST}] + \
+           [{'label': f"{k} ({n[k]})", 'value': k} for k in n]
+
+
+def _selected(doc: Dict | None, keyword: str | None, top: int) -> List[Dict]:
+    if not doc or not keyword:
+        return []
+    return doc['bursts'][:top] if keyword == STRONGEST else \
+           [b for b in doc['bursts'] if b['keyword'] == keyword]
+
+
+def shapes(doc: Dict | None, keyword: str | None, top: int = 20) -> List[Dict]:
+    """Shaded x-ranges of `keyword`'s bursts (STRONGEST: the `top` strongest
+    of any keyword), opacity by weight; [] clears the overlay."""
+    sel = _selected(doc, keyword, top)
+    w = max((b['weight'] for b in sel), default=1.) or 1.
+    return [dict(type='rect', xref='x', yref='paper', x0=b['start'], x1=b['end'], y0=0, y1=1,
+                 fillcolor=f"rgba({BURST_COLOR},{.08 + .22 * b['weight'] / w:.3f})",
+                 line=dict(width=0), layer='below')
+            for b in sel]
+
+
+def labels(doc: Dict | None, keyword: str | None, top: int = 20) -> List[Dict]:
+    """The keyword over the top centre of each `shapes` range, as layout
+    annotations (shape labels need plotly 5.14)."""
+    sel = _selected(doc, keyword, top)
+    start = np.array([b['start'] for b in sel], dtype='datetime64[D]')
+    end = np.array([b['end'] for b in sel], dtype='datetime64[D]')
+    mid = np.datetime_as_string(start + (end - start) // 2, unit='D').tolist()
+    return [dict(xref='x', yref='paper', x=x, y=1, yanchor='top', showarrow=False,
+                 text=b['keyword'], font=dict(size=10, color=f"rgb({BURST_COLOR})"))
+            for b, x in zip(sel, mid)]
+
+
+def write(doc: Dict, out_dir: pathlib.Path):
+    (out_dir / TRENDS).write_text(json.dumps(doc, separators=(',', ':')))
+    print(f"[trends] wrote {TRENDS} (keywords: {len(doc['keywords'])}, "
+          f"bins: {len(doc['bins'])}, bursts: {len(doc['bursts'])})")
+
+
+def build(papers: List[Dict], out_dir: pathlib.Path, by: str = 'month',
+          scale: float = SCALE, gamma: float = GAMMA, window: int = WINDOW,
+          min_papers: int = MIN_PAPERS):
+    """Write trends.json (keyword bursts and rolling trends per time bin)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    doc = trends(papers, by, scale, gamma, window, min_papers)
+    write(doc, out_dir)
+    print(f"[trends] {len(papers)} papers in {time.perf_counter() - t0:.2f}s")
+    return doc
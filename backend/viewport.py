@@ -0,0 +1,130 @@
+"""backend/viewport.py
+Level-of-detail lookups for the timeline's visible date × yPx window, so the
+app ships only what intersects the view.
+
+* nodes are held sorted by date; a window resolves to a `searchsorted` slice
+  plus a yPx mask
+* edges are kept when their segment's bounding box overlaps the window
+* windows holding too many nodes are binned per (calendar year, yPx band),
+  with the year totals taken from `year_density.json`
+
+Windows are (x0, x1, y0, y1) with x in epoch milliseconds, as on the figure;
+`snap` widens them onto a power-of-two grid so nearby pans and zooms share
+cache entries.
+"""
+from __future__ import annotations
+import math
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+Window = Tuple[float, float, float, float]
+
+
+def _ms(v) -> float:
+    """Axis value from relayoutData (date string or number) → epoch ms."""
+    if isinstance(v, (int, float)):
+        return float(v)
+    return pd.Timestamp(v).value / 1e6
+
+
+def parse_relayout(relayout: dict | None, prev: Window | None) -> Window | None | bool:
+    """New window after a relayout event; `prev` is the current one (None:
+    everything).  Returns False when the event does not move the axes."""
+    if not relayout:
+        return False
+    x0, x1, y0, y1 = prev or (None, None, None, None)
+    moved = False
+    for ax in ('x', 'y'):
+        k = f'{ax}axis'
+        lo = hi = None
+        if f'{k}.range[0]' in relayout:
+            lo, hi = relayout[f'{k}.range[0]'], relayout.get(f'{k}.range[1]')
+        elif f'{k}.range' in relayout:
+            lo, hi = relayout[f'{k}.range']
+        elif relayout.get(f'{k}.autorange'):
+            lo = hi = None
+        else:
+            continue
+        moved = True
+        if lo is not None and ax == 'x':
+            lo, hi = sorted((_ms(lo), _ms(hi)))
+        elif lo is not None:
+            lo, hi = sorted((float(lo), float(hi)))
+        if ax == 'x':
+            x0, x1 = lo, hi
+        else:
+            y0, y1 = lo, hi
+    if not moved:
+        return False
+    return None if (x0, x1, y0, y1) == (None,) * 4 else (x0, x1, y0, y1)
+
+
+class Viewport:
+    """Sorted-by-date node index over a `GraphIndex`."""
+
+    def __init__(self, index, year_counts: Dict[int, int] | None = None, *,
+                 bands: int = 40):
+        self.index, self.bands = index, bands
+        x, y = index.x_ms, index.y
+        self.order = np.argsort(x, kind='stable')
+        self.xs = x[self.order]
+        self.bounds: Window = ((float(x.min()), float(x.max()), float(y.min()), float(y.max()))
+                               if len(x) else (0., 0., 0., 0.))
+        self.year = (x.astype(np.int64).astype('datetime64[ms]').astype('datetime64[Y]')
+                     .astype(np.int64) + 1970)
+        computed = dict(zip(*np.unique(self.year, return_counts=True)))
+        self.year_counts = {int(k): int(v) for k, v in (year_counts or computed).items()}
+
+    def full(self, window: Window | None) -> Window:
+        """Fill unbounded (None) sides of `window` from the data extent."""
+        if window is None:
+            return self.bounds
+        return tuple(b if w is None else w for w, b in zip(window, self.bounds))
+
+    def snap(self, window: Window | None) -> Window | None:
+        """Widen `window` outward onto a grid of ~1/8 of its span."""
+        if window is None:
+            return None
+        x0, x1, y0, y1 = self.full(window)
+
+        def grid(lo, hi):
+            step = 2. ** math.ceil(math.log2(max(hi - lo, 1e-9) / 8))
+            return math.floor(lo / step) * step, math.ceil(hi / step) * step
+        return (*grid(x0, x1), *grid(y0, y1))
+
+    # ──────────────────────────────────────────────────────────── queries
+    def rows(self, window: Window | None) -> np.ndarray:
+        """Node rows inside `window`, ascending."""
+        if window is None:
+            return np.arange(len(self.xs))
+        x0, x1, y0, y1 = self.full(window)
+        cand = self.order[np.searchsorted(self.xs, x0, 'left'):
+                          np.searchsorted(self.xs, x1, 'right')]
+        y = self.index.y[cand]
+        return np.sort(cand[(y >= y0) & (y <= y1)])
+
+    def overlap(self, et: str, window: Window | None) -> np.ndarray | None:
+        """Mask of the `et` edges whose bounding box overlaps `window`
+        (None when every edge does)."""
+        if window is None:
+            return None
+        x0, x1, y0, y1 = self.full(window)
+        es, x, y = self.index.edges[et], self.index.x_ms, self.index.y
+        xs, xt, ys, yt = x[es.src], x[es.dst], y[es.src], y[es.dst]
+        return ((np.minimum(xs, xt) <= x1) & (np.maximum(xs, xt) >= x0) &
+                (np.minimum(ys, yt) <= y1) & (np.maximum(ys, yt) >= y0))
+
+    def bins(self, rows: np.ndarray, window: Window | None):
+        """Aggregate `rows` per (year, yPx band): (x ms, y, count, year)."""
+        _, _, y0, y1 = self.full(window)
+        band = np.clip(((self.index.y[rows] - y0) / max(y1 - y0, 1e-9) * self.bands)
+                       .astype(np.int64), 0, self.bands - 1)
+        year = self.year[rows]
+        cell, count = np.unique((year - year.min() if len(year) else year) * self.bands + band,
+                                return_counts=True)
+        yr = cell // self.bands + (year.min() if len(year) else 0)
+        mid_x = (np.array([f'{v}-07-02' for v in yr.tolist()], dtype='datetime64[ms]')
+                 .astype(np.float64))
+        mid_y = y0 + (cell % self.bands + .5) * (y1 - y0) / self.bands
+        return mid_x, mid_y, count, yr
@@ -0,0 +1,4 @@
+"""Benchmarks for the MTO Plot back-end pipeline and Dash callbacks.
+
+Run a module directly, e.g. ``python -m benchmarks.bench_click``.
+"""
@@ -0,0 +1,96 @@
+"""benchmarks/bench_artifacts.py
+On-disk size and front-end load time of the pretty-printed `public/` JSON
+versus the memory-mapped `public/columnar/` copy (`backend.artifacts`).  Load
+time covers what app.py does at startup: the node table, three edge types and
+the `GraphIndex` built from them.
+
+    python -m benchmarks.bench_artifacts --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, json, pathlib, tempfile, time
+import numpy as np
+import pandas as pd
+
+from backend import artifacts, graph_index
+from . import synthetic
+
+EDGE_FILES = {'semantic': 'semantic_edges.json', 'sharedref': 'sharedref_edges.json',
+              'lineage': 'lineage_edges.json'}
+
+
+def write_public(out: pathlib.Path, n: int, seed: int = 0):
+    """Stage-shaped nodes.json and edge files over a synthetic corpus."""
+    rng = np.random.default_rng(seed)
+    papers = synthetic.records(n, seed=seed)
+    ids = [p['id'] for p in papers]
+    y = rng.permutation(n) * 18
+    nodes = [{**p, 'yPx': int(y[i]), 'totalCitations': 0} for i, p in enumerate(papers)]
+    (out / 'nodes.json').write_text(json.dumps(nodes, indent=2))
+
+    def pairs(m):
+        return zip(rng.integers(0, n, m).tolist(), rng.integers(0, n, m).tolist())
+    edges = {
+        'semantic': [{'source': ids[s], 'target': ids[t], 'type': 'semantic',
+                      'weight': round(float(w), 4), 'yearLag': int(g)}
+                     for (s, t), w, g in zip(pairs(5 * n), rng.uniform(.6, 1, 5 * n),
+                                             rng.integers(0, 20, 5 * n))],
+        'sharedref': [{'source': ids[s], 'target': ids[t], 'type': 'sharedRef',
+                       'weight': int(w)}
+                      for (s, t), w in zip(pairs(6 * n), rng.integers(2, 9, 6 * n))],
+        'lineage': [{'source': ids[s], 'target': ids[t], 'type': 'lineage',
+                     'yearGap': int(g)}
+                    for (s, t), g in zip(pairs(n), rng.integers(1, 6, n))],
+    }
+    for et, es in edges.items():
+        (out / EDGE_FILES[et]).write_text(json.dumps(es, indent=2))
+
+
+def load_json(public: pathlib.Path):
+    """app.py's original startup."""
+    nodes = pd.read_json(public / 'nodes.json')
+    edges = {et: json.load(open(public / f)) for et, f in EDGE_FILES.items()}
+    return nodes, edges
+
+
+def load_columnar(public: pathlib.Path):
+    nodes = artifacts.read_nodes(public, ['id', 'title', 'authors', 'date', 'yPx'])
+    edges = {et: artifacts.read_edges(public, et) for et in EDGE_FILES}
+    return nodes, edges
+
+
+def startup(load, public):
+    t0 = time.perf_counter()
+    nodes, edges = load(public)
+    nodes['date'] = pd.to_datetime(nodes['date'], format='%Y-%m-%d', errors='coerce')
+    nodes = nodes.dropna(subset=['date']).reset_index(drop=True)
+    nodes['y'] = pd.to_numeric(nodes['yPx'], errors='coerce').fillna(0)
+    index = graph_index.from_frame(nodes, edges)
+    return time.perf_counter() - t0, index
+
+
+def size(paths) -> float:
+    return sum(p.stat().st_size for p in paths) / 2**20
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = ap.parse_args()
+
+    print(f"{'papers':>8} {'format':>9} {'MB':>8} {'load s':>8}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            public = pathlib.Path(tmp)
+            write_public(public, n)
+            artifacts.export(public)
+            t_json, a = startup(load_json, public)
+            t_col, b = startup(load_columnar, public)
+            same = all(np.array_equal(getattr(a.edges[et], f), getattr(b.edges[et], f))
+                       for et in EDGE_FILES for f in ('src', 'dst', 'weight', 'nbrs'))
+            print(f"{n:>8} {'json':>9} {size(public.glob('*.json')):>8.1f} {t_json:>8.2f}")
+            print(f"{n:>8} {'columnar':>9} {size((public / artifacts.DIR).iterdir()):>8.1f} "
+                  f"{t_col:>8.2f}  {'same index' if same else 'INDEX MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""benchmarks/bench_callbacks.py
+Per-interaction latency and response size of app.py's figure callback: the
+original full `go.Figure` rebuild on every input versus the memoised base
+figure plus `Patch` updates from `backend.figure_cache`.  Latency includes
+JSON serialisation, as dash does before responding.
+
+    python -m benchmarks.bench_callbacks --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+from backend import graph_index, edge_traces
+from backend.figure_cache import FigureCache
+from . import synthetic
+
+
+def rebuild(nodes_df, index, et, eids, rows, term):
+    """The pre-cache update_graph body: a new figure for every interaction."""
+    plot_df = nodes_df if rows is None else nodes_df.iloc[rows]
+    fig = go.Figure()
+    for tr in edge_traces.edge_traces(index, et, eids):
+        fig.add_trace(tr)
+    fig.update_layout(
+        dragmode="zoom",
+        xaxis=dict(rangeslider=dict(visible=True, thickness=0.05),
+                   type="date", tickformat="%Y", title="Publication Date"),
+        yaxis=dict(visible=False, range=[-20, nodes_df['y'].max() + 20]),
+        height=800, hovermode="closest", showlegend=False,
+        margin=dict(l=40, r=40, t=80, b=40))
+    term = (term or '').lower()
+    colors = ['orange' if term and term in (row.title.lower() + " " + " ".join(row.authors).lower())
+              else 'blue' for row in plot_df.itertuples()]
+    hover = [f"{row.title}<br>{', '.join(row.authors)}" for row in plot_df.itertuples()]
+    fig.add_trace(go.Scattergl(x=plot_df['date'], y=plot_df['y'], customdata=plot_df['id'],
+                               mode='markers', marker=dict(size=12, color=colors, opacity=0.8),
+                               hoverinfo='text', hovertext=hover,
+                               hovertemplate="%{hovertext}<extra></extra>"))
+    return fig
+
+
+def _run(fn):
+    t0 = time.perf_counter()
+    nbytes = len(to_json_plotly(fn()))
+    return time.perf_counter() - t0, nbytes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--per_node", type=int, default=5)
+    args = ap.parse_args()
+
+    et = 'semantic'
+    print(f"{'nodes':>8} {'interaction':>12} {'rebuild ms':>11} {'KB':>9} "
+          f"{'patch ms':>9} {'KB':>9}")
+    for n in args.sizes:
+        nodes_df = synthetic.nodes_frame(n)
+        index = graph_index.from_frame(nodes_df, {et: synthetic.edge_list(n, args.per_node)})
+        cache = FigureCache(index, nodes_df)
+        cid = nodes_df['id'][n // 2]
+        eids, rows = index.neighbourhood(et, cid)
+        rows = rows.tolist()
+        none = graph_index.EMPTY
+        cases = {
+            'initial' : (lambda: rebuild(nodes_df, index, et, none, None, ''),
+                         lambda: cache.figure(et)),
+            'search'  : (lambda: rebuild(nodes_df, index, et, none, None, 'paper 12'),
+                         lambda: cache.patch(matches=cache.matches(None, 'paper 12'))),
+            'click'   : (lambda: rebuild(nodes_df, index, et, eids, rows, ''),
+                         lambda: cache.patch(edges=cache.edges(et, eids), rows=rows,
+                                             matches=cache.matches(rows, ''))),
+            'show-all': (lambda: rebuild(nodes_df, index, et, index.all_edges(et), None, ''),
+                         lambda: cache.patch(edges=cache.show_all(et),
+                                             matches=cache.matches(None, ''))),
+            'reset'   : (lambda: rebuild(nodes_df, index, et, none, None, ''),   # after a click
+                         lambda: cache.patch(edges=cache.edges(et, none),
+                                             nodes=cache.view_nodes(None),
+                                             matches=cache.matches(None, ''))),
+            'edge-type': (lambda: rebuild(nodes_df, index, et, none, None, ''),  # from full view
+                          lambda: cache.patch(edges=cache.edges(et, none),
+                                              matches=cache.matches(None, ''))),
+        }
+        cache.figure(et); cache.show_all(et)           # warm the LRU, as after first use
+        for name, (old, new) in cases.items():
+            (t_old, b_old), (t_new, b_new) = _run(old), _run(new)
+            print(f"{n:>8} {name:>12} {t_old * 1e3:>11.1f} {b_old / 1024:>9.0f} "
+                  f"{t_new * 1e3:>9.1f} {b_new / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
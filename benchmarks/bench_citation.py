@@ -0,0 +1,116 @@
+"""benchmarks/bench_citation.py
+Citation-graph stage (`backend.citation`) at scale: synthetic papers whose
+bibliographies mix citations of earlier corpus papers – by title, in several
+formattings (author/year order, case, quotes, page numbers) – with external
+references of Zipf-like popularity.  A `--generic` share of the corpus has
+stock short titles ("A Study", "On the Road") that external references also
+start with.  Reports resolution precision / recall against the true links
+and the wall time of resolving, building the matrix and PageRank /
+influence – also with short titles matched on the title alone (`title`),
+without the year / surname confirmation – against naive substring matching
+of every title in every citation for small sizes.
+
+    python -m benchmarks.bench_citation --sizes 10000 100000 --refs 50
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+
+from backend import citation
+from backend.load_data import slug
+from . import synthetic
+
+SYLLABLES = "ba be bi bo da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no " \
+            "ra re ri ro sa se si so ta te ti to va ve vi vo".split()
+GENERIC = ("A Study", "On the Road", "An Analysis", "Music and Meaning", "A Note on Form",
+           "Introduction to Analysis", "The Art of Listening", "Form and Function")
+
+
+def corpus(n: int, refs: int, cite_frac: float, generic: float = .02, seed: int = 0):
+    """(paper records, true (citing, cited) index pairs)."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([''.join(rng.choice(SYLLABLES, int(k)))
+                      for k in rng.integers(2, 5, 30000)])
+    titles = [' '.join(rng.choice(vocab, int(k))) for k in rng.integers(3, 9, n)]
+    for i in np.flatnonzero(rng.random(n) < generic).tolist():
+        titles[i] = GENERIC[i % len(GENERIC)]
+    surnames = [''.join(rng.choice(SYLLABLES, 3)).title() for _ in range(997)]
+    years = np.sort(rng.integers(1960, 2025, n))
+    cdf = synthetic.ref_popularity(n * 10)
+    papers, truth = [], set()
+    for i in range(n):
+        k_in = int(rng.binomial(refs, cite_frac)) if i else 0
+        cited = np.unique(rng.integers(0, i, k_in)) if k_in else np.zeros(0, int)
+        cites = []
+        for j in cited.tolist():
+            t = titles[j].title() if rng.random() < .5 else titles[j].capitalize()
+            a, y = surnames[j % 997], years[j]
+            s = (f"{a}, {t}. {y}.", f"{a} ({y}) {t}",
+                 f"{a}. “{t}.” Publisher, {y}, pp. {j % 300}–{j % 300 + 12}")[j % 3]
+            cites.append(s); truth.add((i, j))
+        for r in np.searchsorted(cdf, rng.random(refs - len(cites))).tolist():
+            cites.append(f"Reference Author {r}. {GENERIC[r % len(GENERIC)]} of Work {r}. "
+                         f"Publisher, {1900 + r % 120}.")
+        papers.append({'id': f"{slug(titles[i])}-{i}", 'title': titles[i],
+                       'authors': [f"Given {surnames[i % 997]}"],
+                       'date_raw': f"{years[i]}/01",
+                       'citations_raw': {str(k + 1): c for k, c in enumerate(cites)}})
+    return papers, truth
+
+
+def naive(slugs, titles):
+    """Every title tested as a word run of every citation: O(R · n)."""
+    padded = [f" {citation._slug(t)} " for t in titles]
+    out = np.full(len(slugs), -1)
+    for s, c in enumerate(slugs):
+        c = f" {c} "
+        hits = [r for r, t in enumerate(padded) if len(t) > 2 and t.count(' ') > 2 and t in c]
+        if hits:
+            out[s] = max(hits, key=lambda r: (len(padded[r]), -r))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--refs", type=int, default=50, help="citations per paper")
+    ap.add_argument("--cite_frac", type=float, default=.2,
+                    help="share of citations that cite a corpus paper")
+    ap.add_argument("--generic", type=float, default=.02,
+                    help="share of corpus papers with a stock short title")
+    ap.add_argument("--max_naive", type=int, default=2000)
+    args = ap.parse_args()
+
+    print(f"{'papers':>8} {'citations':>10} {'impl':>6} {'links':>9} {'precision':>9} "
+          f"{'recall':>7} {'resolve s':>9} {'total s':>8}")
+    for n in args.sizes:
+        papers, truth = corpus(n, args.refs, args.cite_frac, args.generic)
+        ncites = sum(len(p['citations_raw']) for p in papers)
+        for impl, short in (('hashed', citation.SHORT), ('title', 0)):
+            t0 = time.perf_counter()
+            ids, prow, C = citation.matrix(papers, short)
+            t_res = time.perf_counter() - t0
+            citation.pagerank(C)
+            citation.influence(C, np.zeros(len(ids), dtype=np.int64) + 2000)
+            total = time.perf_counter() - t0
+            Cc = C.tocoo()
+            row = {nid: r for r, nid in enumerate(ids)}
+            want = {(row[papers[i]['id']], row[papers[j]['id']]) for i, j in truth}
+            got = set(zip(Cc.row.tolist(), Cc.col.tolist()))
+            tp = len(got & want)
+            print(f"{n:>8} {ncites:>10} {impl:>6} {len(got):>9} {tp / max(len(got), 1):>9.3f} "
+                  f"{tp / max(len(want), 1):>7.3f} {t_res:>9.2f} {total:>8.2f}")
+        if n <= args.max_naive:
+            slugs = sorted({citation._slug(c) for p in papers
+                            for c in p['citations_raw'].values()})
+            titles = [p['title'] for p in papers]
+            t0 = time.perf_counter()
+            a = naive(slugs, titles)
+            dt = time.perf_counter() - t0
+            same = (a == citation.resolve(slugs, titles, short=0)).mean()
+            print(f"{n:>8} {ncites:>10} {'naive':>6} {'':>9} {'':>9} {'':>7} {dt:>9.2f} "
+                  f"{'':>8}  ({same:.1%} of citations resolved alike)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""benchmarks/bench_click.py
+Per-click latency of app.py's node-click resolution: the original full edge
+scan + boolean-mask node lookups versus the `GraphIndex` CSR adjacency.
+
+    python -m benchmarks.bench_click --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+
+from backend import graph_index
+from . import synthetic
+
+
+def scan_click(nodes_df, edge_list, cid):
+    """The pre-index implementation: O(E + k·N) per click."""
+    filtered = [e for e in edge_list if cid in (e['source'], e['target'])]
+    plot_df = nodes_df[nodes_df['id'].isin(
+        {n for e in filtered for n in (e['source'], e['target'])})]
+    coords = []
+    for e in filtered:
+        src = nodes_df.loc[nodes_df['id'] == e['source']].iloc[0]
+        tgt = nodes_df.loc[nodes_df['id'] == e['target']].iloc[0]
+        coords.append((src['date'], src['y'], tgt['date'], tgt['y']))
+    return plot_df, coords
+
+
+def index_click(nodes_df, index, cid):
+    eids, rows = index.neighbourhood('semantic', cid)
+    return nodes_df.iloc[rows], index.segments('semantic', eids)
+
+
+def _per_call(fn, args_list, budget=2.0):
+    t0 = time.perf_counter(); n = 0
+    for args in args_list:
+        fn(*args); n += 1
+        if time.perf_counter() - t0 > budget:
+            break
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--per_node", type=int, default=5)
+    ap.add_argument("--clicks", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(1)
+    print(f"{'nodes':>8} {'edges':>9} {'build ms':>9} {'scan ms':>10} {'index ms':>9}")
+    for n in args.sizes:
+        nodes_df = synthetic.nodes_frame(n)
+        edges = synthetic.edge_list(n, args.per_node)
+        t0 = time.perf_counter()
+        index = graph_index.from_frame(nodes_df, {'semantic': edges})
+        build = time.perf_counter() - t0
+
+        cids = nodes_df['id'].to_numpy()[rng.integers(0, n, args.clicks)]
+        scan = _per_call(scan_click, [(nodes_df, edges, c) for c in cids])
+        fast = _per_call(index_click, [(nodes_df, index, c) for c in cids])
+        print(f"{n:>8} {len(edges):>9} {build*1e3:>9.1f} "
+              f"{scan*1e3:>10.2f} {fast*1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
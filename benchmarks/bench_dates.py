@@ -0,0 +1,70 @@
+"""benchmarks/bench_dates.py
+Date normalisation: the original per-call `strptime` loop over
+`DATE_PATTERNS`, the single-regex `safe_parse_date`, and the vectorised
+`parse_dates` pass `Corpus` runs at load time, on raw date strings in every
+accepted format plus some junk.  Results are checked for equality.
+
+    python -m benchmarks.bench_dates --sizes 10000 1000000
+"""
+from __future__ import annotations
+import argparse, random, time
+from datetime import datetime
+import numpy as np
+
+from backend import load_data
+
+
+def strptime_date(raw):
+    """The pre-regex implementation, kept as the reference."""
+    for fmt in load_data.DATE_PATTERNS:
+        try:
+            return datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def raw_dates(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        y, m, d, r = rng.randint(1850, 2025), rng.randint(1, 12), rng.randint(1, 31), rng.random()
+        out.append(f"{y}/{m:02d}/{d:02d}" if r < .4 else f"{y}-{m}-{d}" if r < .6 else
+                   f"{y}/{m}" if r < .75 else f"{y}" if r < .9 else
+                   rng.choice(["", "n.d.", f"c. {y}", f"{y}/{m}/{d}/1", f"{y}/13"]))
+    return out
+
+
+def _as_arrays(parsed):
+    dates = np.array([np.datetime64(dt.date(), 'D') if dt else np.datetime64('NaT', 'D')
+                      for dt in parsed], dtype='datetime64[D]')
+    years = np.array([dt.year if dt else 0 for dt in parsed], dtype=np.int16)
+    return dates, years
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    args = ap.parse_args()
+
+    print(f"{'dates':>8} {'distinct':>9} {'impl':>14} {'time s':>8} {'ns/date':>8}")
+    for n in args.sizes:
+        raws = raw_dates(n)
+        impls = [('strptime', lambda: _as_arrays([strptime_date(r) for r in raws])),
+                 ('safe_parse', lambda: _as_arrays([load_data.safe_parse_date(r) for r in raws])),
+                 ('parse_dates', lambda: load_data.parse_dates(raws)[:2])]
+        results = {}
+        for name, fn in impls:
+            t0 = time.perf_counter()
+            results[name] = fn()
+            dt = time.perf_counter() - t0
+            print(f"{n:>8} {len(set(raws)):>9} {name:>14} {dt:>8.2f} {dt / n * 1e9:>8.0f}")
+        ref_dates, ref_years = results['strptime']
+        for name, (dates, years) in results.items():
+            if not (np.array_equal(dates, ref_dates, equal_nan=True)
+                    and np.array_equal(years, ref_years)):
+                raise SystemExit(f"{name} disagrees with strptime at {n} dates")
+
+
+if __name__ == "__main__":
+    main()
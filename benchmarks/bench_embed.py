@@ -0,0 +1,68 @@
+"""benchmarks/bench_embed.py
+Encoding throughput (docs/s) of the original fixed 32-document batches
+against `backend.embedder.Encoder` – its fixed batches, or length-sorted
+token-budget ones with `--batch_tokens`, one or more worker processes,
+float32 / float16 / int8 output – on synthetic
+abstracts of mixed length.  Needs the sentence-transformers model (`--model`:
+a hub name or a local directory).
+
+    python -m benchmarks.bench_embed --docs 5000 --workers 1 4
+"""
+from __future__ import annotations
+import argparse, contextlib, io, time
+import numpy as np
+
+from backend import embedder
+from . import synthetic
+
+
+def documents(n: int, seed: int = 0):
+    """Abstracts of 5–300 words, skewed short like real ones."""
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(4, .8, n), 5, 300).astype(int)
+    return [" ".join(rng.choice(synthetic.WORDS, k).tolist()) for k in lengths]
+
+
+def fixed_batches(docs, name: str = embedder.MODEL):
+    """The pre-embedder encode: one call with batch_size=32, in document order."""
+    return embedder.model(name).encode(docs, batch_size=32, normalize_embeddings=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--docs", type=int, default=5000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--dtypes", nargs="+", default=list(embedder.DTYPES),
+                    choices=embedder.DTYPES)
+    ap.add_argument("--batch_tokens", type=int, default=0,
+                    help="Encoder token budget (0: its fixed batches)")
+    ap.add_argument("--model", default=embedder.MODEL)
+    args = ap.parse_args()
+
+    docs = documents(args.docs)
+    embedder.model(args.model)                        # load time is not throughput
+    configs = [('fixed-32', 1, 'float32', None)]
+    kind = 'sorted' if args.batch_tokens else 'encoder'
+    configs += [(kind, w, dt, embedder.Encoder(args.model, workers=w, dtype=dt,
+                                                   batch_tokens=args.batch_tokens))
+                for w in args.workers for dt in args.dtypes]
+
+    ref = None
+    print(f"{'batching':>9} {'proc':>5} {'dtype':>8} {'docs/s':>8} {'MB':>7} {'max |Δ|':>8}")
+    for name, w, dt, enc in configs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if enc is not None and w > 1:
+                enc.encode(docs[:w * 64])             # start the pool outside the timing
+            t0 = time.perf_counter()
+            vecs = fixed_batches(docs, args.model) if enc is None else enc.encode(docs)
+            sec = time.perf_counter() - t0
+        if enc is not None:
+            enc.close()
+        flt = embedder.dequantize(vecs)
+        ref = flt if ref is None else ref
+        print(f"{name:>9} {w:>5} {dt:>8} {len(docs) / sec:>8.0f} "
+              f"{vecs.nbytes / 2**20:>7.1f} {np.abs(flt - ref).max():>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""benchmarks/bench_export.py
+Static HTML export (scripts/plot_mto_plotly.py) over a synthetic public/:
+export time, page and layer sidecar bytes (raw and gzip) of the typed-array export
+against the legacy one – every edge layer embedded as JSON date / y lists,
+built edge by edge with `DataFrame.loc` – and, when node is installed, the
+JS time to resolve a click: a CSR slice of the layer's offsets versus the
+legacy scan of every segment plus an id search per neighbour.
+
+    python -m benchmarks.bench_export --sizes 10000 50000
+"""
+from __future__ import annotations
+import argparse, gzip, importlib.util, json, pathlib, shutil, subprocess, tempfile, time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from backend import artifacts, search
+from . import synthetic
+from .bench_artifacts import write_public
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def exporter():
+    spec = importlib.util.spec_from_file_location('plot_mto_plotly',
+                                                  ROOT / 'scripts' / 'plot_mto_plotly.py')
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def legacy(public: pathlib.Path, out_html: pathlib.Path, layers) -> dict:
+    """The former export: per-edge `.loc` lookups, coordinates as JSON (plus
+    the same embedded search index)."""
+    nodes = artifacts.read_nodes(public, ["id", "title", "authors", "date", "yPx",
+                                          "totalCitations"])
+    nodes["date"] = pd.to_datetime(nodes["date"], errors="coerce")
+    nodes = nodes.dropna(subset=["date"])
+    node_idx = {row.id: idx for idx, row in nodes.iterrows()}
+    traces = [go.Scattergl(x=nodes.date, y=nodes.yPx, mode="markers",
+                           text=[f"<b>{t}</b><br>{', '.join(a)}"
+                                 for t, a in zip(nodes.title, nodes.authors)])]
+    ids = {}
+    for et, *_ in layers:
+        df = artifacts.read_edges(public, et)
+        xs, ys, src, tgt = [], [], [], []
+        for s_id, t_id in zip(df.ids[df.src], df.ids[df.dst]):
+            s = node_idx.get(s_id); t = node_idx.get(t_id)
+            if s is None or t is None:
+                continue
+            xs += [nodes.loc[s, "date"], nodes.loc[t, "date"], None]
+            ys += [nodes.loc[s, "yPx"], nodes.loc[t, "yPx"], None]
+            src.append(s_id); tgt.append(t_id)
+        traces.append(go.Scattergl(x=xs, y=ys, mode="lines", name=et))
+        ids[et] = (src, tgt)
+    search_fp = public / "search_index.json"
+    out_html.write_text(go.Figure(traces).to_html(include_plotlyjs="cdn", full_html=False)
+                        + f"<script>const SEARCH = {search_fp.read_text()};</script>")
+    return ids
+
+
+def gz(paths) -> int:
+    return sum(len(gzip.compress(p.read_bytes(), 6)) for p in paths)
+
+
+CLICK_JS = r"""
+const fs = require('fs'), d = JSON.parse(fs.readFileSync(process.argv[2]));
+const buf = fs.readFileSync(process.argv[3]), ab = buf.buffer.slice(buf.byteOffset, buf.byteOffset + buf.length);
+const m = d.edges, n = d.n, off = new Int32Array(ab, 8 * m, n + 1), nbrs = new Int32Array(ab, 4 * (2 * m + n + 1));
+const time = f => { const t0 = process.hrtime.bigint(); let k = 0;
+  for (const i of d.clicks) k += f(i); return [Number(process.hrtime.bigint() - t0) / 1e6 / d.clicks.length, k]; };
+const csr = time(i => { let k = 0; for (let p = off[i]; p < off[i + 1]; p++) k += nbrs[p] >= 0; return k; });
+const scan = time(i => { const id = d.ids[i]; let k = 0;
+  d.src.forEach((s, e) => { const o = s === id ? d.tgt[e] : d.tgt[e] === id ? s : null;
+    if (o !== null) k += d.ids.findIndex(x => x === o) >= 0; }); return k; });
+console.log(JSON.stringify({csr, scan}));
+"""
+
+
+def click_ms(tmp: pathlib.Path, ids, src, tgt, layer_bin: pathlib.Path, edges: int, clicks):
+    (tmp / 'click.js').write_text(CLICK_JS)
+    (tmp / 'click.json').write_text(json.dumps({'ids': ids, 'src': src, 'tgt': tgt, 'n': len(ids),
+                                                'edges': edges, 'clicks': clicks}))
+    r = subprocess.run(['node', str(tmp / 'click.js'), str(tmp / 'click.json'), str(layer_bin)],
+                       capture_output=True, text=True, check=True)
+    out = json.loads(r.stdout)
+    if out['csr'][1] != out['scan'][1]:
+        raise SystemExit(f"click neighbours differ: {out}")
+    return out['csr'][0], out['scan'][0]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    ap.add_argument("--clicks", type=int, default=20)
+    args = ap.parse_args()
+
+    plot = exporter()
+    node = shutil.which('node')
+    print(f"{'papers':>8} {'impl':>7} {'export s':>9} {'page KB':>8} {'gzip':>6} "
+          f"{'layers KB':>10} {'gzip':>6} {'click ms':>9}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            public = tmp / 'public'
+            public.mkdir()
+            write_public(public, n)
+            search.build(synthetic.records(n), public)
+
+            t0 = time.perf_counter()
+            plot.export(public, tmp / 'new' / 'mto_timeline.html')
+            t_new = time.perf_counter() - t0
+            page = tmp / 'new' / 'mto_timeline.html'
+            layers = sorted((tmp / 'new' / 'mto_timeline').glob('*.bin'))
+            t0 = time.perf_counter()
+            ids = legacy(public, tmp / 'legacy.html', plot.EDGE_LAYERS)
+            t_old = time.perf_counter() - t0
+
+            c_new = c_old = None
+            if node:
+                nodes = plot.load_nodes(public)
+                clicks = np.random.default_rng(0).integers(0, len(nodes), args.clicks).tolist()
+                et = plot.EDGE_LAYERS[0][0]
+                c_new, c_old = click_ms(tmp, nodes.id.tolist(), *ids[et],
+                                        page.parent / 'mto_timeline' / f'{et}.bin',
+                                        len(ids[et][0]), clicks)
+
+            click = lambda c: f"{c:>9.3f}" if c is not None else f"{'-':>9}"
+            print(f"{n:>8} {'typed':>7} {t_new:>9.2f} {page.stat().st_size / 2**10:>8.0f} "
+                  f"{gz([page]) / 2**10:>6.0f} "
+                  f"{sum(p.stat().st_size for p in layers) / 2**10:>10.0f} "
+                  f"{gz(layers) / 2**10:>6.0f} {click(c_new)}")
+            print(f"{n:>8} {'legacy':>7} {t_old:>9.2f} "
+                  f"{(tmp / 'legacy.html').stat().st_size / 2**10:>8.0f} "
+                  f"{gz([tmp / 'legacy.html']) / 2**10:>6.0f} {'-':>10} {'-':>6} {click(c_old)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""benchmarks/bench_incremental.py
+Full `cli all` rebuild versus `cli all --incremental` after adding, editing and
+deleting a few papers, and a byte-for-byte check that both produce the same
+public/ files.
+
+    python -m benchmarks.bench_incremental --papers 2000 --touch 10
+"""
+from __future__ import annotations
+import argparse, json, pathlib, tempfile, time
+
+from backend import load_data, semantic, citation, sharedref, lineage, density, trends, \
+    incremental
+from . import synthetic
+
+OUTPUTS = ("nodes.json", "semantic_edges.json", "sharedref_edges.json",
+           "lineage_edges.json", "year_density.json", "trends.json")
+
+
+def full_build(json_dir, out, top_k=5, sim_th=.6):
+    out.mkdir(parents=True, exist_ok=True)
+    papers = load_data.load(json_dir)
+    semantic.build(papers, out, top_k, sim_th)
+    citation.build(papers, out)
+    sharedref.build(papers, out)
+    lineage.build(papers, out)
+    density.build(papers, out)
+    trends.build(papers, out)
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter(); fn(*args)
+    return time.perf_counter() - t0
+
+
+def mutate(json_dir: pathlib.Path, n: int, touch: int):
+    """Add `touch` papers, rewrite the abstract of `touch`, delete `touch`."""
+    synthetic.write_corpus(json_dir, touch, start=n, seed=1, authors=max(n // 3, 1))
+    files = sorted(json_dir.glob('*.json'))
+    for fp in files[:touch]:
+        data = json.loads(fp.read_text())
+        data['abstract'] = "revised " + data['abstract'][::-1]
+        fp.write_text(json.dumps(data))
+    for fp in files[touch:2 * touch]:
+        fp.unlink()
+
+
+def same_outputs(a: pathlib.Path, b: pathlib.Path):
+    return [name for name in OUTPUTS
+            if (a / name).read_bytes() != (b / name).read_bytes()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--papers", type=int, default=2000)
+    ap.add_argument("--touch", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        data, inc, full = tmp / "data", tmp / "inc", tmp / "full"
+        synthetic.write_corpus(data, args.papers)
+        inc.mkdir()
+
+        cold = _timed(incremental.build_all, data, inc)
+        mutate(data, args.papers, args.touch)
+        warm = _timed(incremental.build_all, data, inc)
+        rebuild = _timed(full_build, data, full)
+
+        diff = same_outputs(inc, full)
+        print(f"\npapers={args.papers} touched={3 * args.touch}")
+        print(f"  incremental cold : {cold:8.2f} s")
+        print(f"  incremental warm : {warm:8.2f} s")
+        print(f"  full rebuild     : {rebuild:8.2f} s")
+        print("  outputs identical" if not diff else f"  MISMATCH: {diff}")
+        if diff:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
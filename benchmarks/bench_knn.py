@@ -0,0 +1,44 @@
+"""benchmarks/bench_knn.py
+Wall time, peak traced memory and recall@k against exact search for every
+`backend.knn` engine on clustered synthetic embeddings.
+
+    python -m benchmarks.bench_knn --sizes 10000 100000 --engines exact ivf lsh
+"""
+from __future__ import annotations
+import argparse, time, tracemalloc
+import numpy as np
+
+from backend import knn
+from . import synthetic
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    ap.add_argument("--engines", nargs="+", default=["exact", "sklearn", "ivf", "lsh"],
+                    choices=sorted(knn.ENGINES))
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--top_k", type=int, default=5)
+    ap.add_argument("--recall_sample", type=int, default=2000,
+                    help="queries used to measure recall against exact search")
+    args = ap.parse_args()
+
+    k = args.top_k + 1
+    print(f"{'papers':>8} {'engine':>8} {'time s':>8} {'peak MB':>8} {'recall':>7}")
+    for n in args.sizes:
+        emb = synthetic.embeddings(n, args.dim)
+        sample = np.random.default_rng(0).choice(n, min(n, args.recall_sample), replace=False)
+        truth, _ = knn.exact(emb, k, sample)
+        for engine in args.engines:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            idx, _ = knn.search(emb, k, engine=engine)
+            dt = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            r = knn.recall(idx[sample], truth)
+            print(f"{n:>8} {engine:>8} {dt:>8.2f} {peak/2**20:>8.1f} {r:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
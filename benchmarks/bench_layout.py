@@ -0,0 +1,59 @@
+"""benchmarks/bench_layout.py
+yPx layouts from `backend.layout`: wall time and peak traced memory of the
+PC1-rank layout and of the chunked incremental PCA basis, and how many of the
+existing nodes move when `--add` percent new papers arrive (rank refits
+everything; ipca projects the newcomers into the saved basis).
+
+    python -m benchmarks.bench_layout --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, time, tracemalloc
+import numpy as np
+
+from backend import layout
+from . import synthetic
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, dt, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--add", type=float, default=1., help="percent of papers added")
+    ap.add_argument("--min_gap", type=float, default=18)
+    args = ap.parse_args()
+
+    layout.rank(synthetic.embeddings(100, args.dim))    # imports outside the timing
+    print(f"{'papers':>8} {'layout':>12} {'time s':>8} {'peak MB':>8} {'moved':>7}")
+    for n in args.sizes:
+        extra = max(int(n * args.add / 100), 1)
+        emb = synthetic.embeddings(n + extra, args.dim)
+        years = np.random.default_rng(1).integers(1990, 2025, n + extra)
+        old, new = emb[:n], emb
+
+        y0, dt, peak = _measure(lambda: layout.rank(old))
+        moved = (layout.rank(new)[:n] != y0).mean()
+        print(f"{n:>8} {'rank':>12} {dt:>8.2f} {peak / 2**20:>8.1f} {moved:>7.1%}")
+
+        basis, dt, peak = _measure(lambda: layout.Basis.fit(old))
+        y0 = basis.project(old)
+        moved = (basis.project(new)[:n] != y0).mean()
+        print(f"{n:>8} {'ipca':>12} {dt:>8.2f} {peak / 2**20:>8.1f} {moved:>7.1%}")
+
+        y0 = layout.collide(y0, years[:n], args.min_gap)
+        y1, dt, peak = _measure(lambda: layout.collide(basis.project(new), years, args.min_gap))
+        moved = (y1[:n] != y0).mean()
+        print(f"{n:>8} {'ipca+collide':>12} {dt:>8.2f} {peak / 2**20:>8.1f} {moved:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
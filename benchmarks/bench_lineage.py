@@ -0,0 +1,106 @@
+"""benchmarks/bench_lineage.py
+Multi-author lineage (`backend.lineage`) over synthetic authorship rows:
+every person is written in several formattings – "First Middle Last",
+"Last, First", initials only, with or without accents – and interned back
+to author ids.  Reports authorship rows, interned authors against true
+persons, pairwise precision / recall of the interning, edges and wall time,
+against the former per-author loop over raw name strings (every author's
+papers grouped in a dict, sorted and paired in Python) for small sizes.
+
+    python -m benchmarks.bench_lineage --sizes 100000 1000000
+"""
+from __future__ import annotations
+import argparse, itertools, time
+from typing import Dict, List
+import numpy as np
+
+from backend import lineage
+from backend.load_data import date_columns
+from .bench_refs import SYLLABLES, pair_scores
+
+ACCENTS = str.maketrans("aeiou", "áéíóü")
+
+
+def people(n: int, rng):
+    """(first, middle, last) names of `n` persons."""
+    word = lambda k: ''.join(rng.choice(SYLLABLES, k)).title()
+    return [(word(2), word(2) if rng.random() < .5 else '', word(3)) for _ in range(n)]
+
+
+def spell(person, style: int) -> str:
+    first, middle, last = person
+    given = f"{first} {middle}".strip()
+    if style == 1:
+        return f"{last}, {given}"
+    if style == 2:
+        return ' '.join(f"{g[0]}." for g in given.split()) + f" {last}"
+    if style == 3:
+        return f"{given} {last}".translate(ACCENTS)
+    return f"{given} {last}"
+
+
+def corpus(n: int, seed: int = 0):
+    """(papers with id / authors / date_raw, true person of each authorship row)."""
+    rng = np.random.default_rng(seed)
+    who = people(max(n // 3, 1), rng)
+    # variant 0 dominates, so the spelled-out name an initials form abbreviates is known
+    styles = rng.choice(4, size=(len(who), 3), p=[.55, .2, .15, .1])
+    k = rng.integers(1, 6, n)
+    person = rng.integers(0, len(who), k.sum())
+    style = styles[person, rng.integers(0, 3, len(person))]
+    year, month, day = rng.integers(1950, 2025, n), rng.integers(1, 13, n), rng.integers(1, 29, n)
+    names = [spell(who[p], s) for p, s in zip(person.tolist(), style.tolist())]
+    cut = np.concatenate([[0], np.cumsum(k)]).tolist()
+    papers = [{'id': f"synthetic-paper-{i:07d}", 'authors': names[cut[i]:cut[i + 1]],
+               'date_raw': f"{y}/{m:02d}/{d:02d}"}
+              for i, (y, m, d) in enumerate(zip(year.tolist(), month.tolist(), day.tolist()))]
+    return papers, person
+
+
+def legacy(papers: List[Dict]) -> List[Dict]:
+    """The former thread of one author, applied to every raw name string."""
+    dates, years, valid = date_columns(papers)
+    author_map: Dict[str, List[tuple]] = {}
+    for p, dt in zip(papers, dates.astype('datetime64[us]').tolist()):
+        if dt is not None:
+            for a in p['authors']:
+                author_map.setdefault(a, []).append((dt, p['id']))
+    edges = []
+    for pubs in author_map.values():
+        for (d1, pid1), (d2, pid2) in itertools.pairwise(sorted(pubs)):
+            edges.append({'source': pid1, 'target': pid2, 'type': 'lineage',
+                          'yearGap': (d2.year - d1.year) or 1})
+    return edges
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000],
+                    help="number of papers (≈3 authorship rows each)")
+    ap.add_argument("--max_legacy", type=int, default=200000)
+    args = ap.parse_args()
+
+    print(f"{'papers':>8} {'rows':>9} {'impl':>7} {'authors':>8} {'persons':>8} "
+          f"{'precision':>9} {'recall':>7} {'edges':>9} {'time s':>7}")
+    for n in args.sizes:
+        papers, truth = corpus(n)
+        persons = len(np.unique(truth))
+        t0 = time.perf_counter()
+        es = lineage.edges(papers)
+        dt = time.perf_counter() - t0
+        _, author, keys = lineage.authorship(papers)
+        precision, recall = pair_scores(author, truth)
+        print(f"{n:>8} {len(truth):>9} {'interned':>7} {len(keys):>8} {persons:>8} "
+              f"{precision:>9.3f} {recall:>7.3f} {len(es):>9} {dt:>7.2f}")
+        if n <= args.max_legacy:
+            t0 = time.perf_counter()
+            es = legacy(papers)
+            dt = time.perf_counter() - t0
+            raw = np.unique([a for p in papers for a in p['authors']], return_inverse=True)[1]
+            precision, recall = pair_scores(raw, truth)
+            print(f"{n:>8} {len(truth):>9} {'legacy':>7} {raw.max() + 1:>8} {persons:>8} "
+                  f"{precision:>9.3f} {recall:>7.3f} {len(es):>9} {dt:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
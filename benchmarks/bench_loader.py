@@ -0,0 +1,60 @@
+"""benchmarks/bench_loader.py
+Load time and peak RSS of the original list-of-dicts `load_data.load` versus
+the streaming process-pool loader building a columnar `backend.corpus.Corpus`.
+Each measurement runs in a fresh interpreter so peak RSS is not shared.
+
+    python -m benchmarks.bench_loader --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, gc, json, pathlib, resource, subprocess, sys, tempfile, time
+
+from . import synthetic
+
+
+def child(loader: str, json_dir: str, workers: int | None):
+    from backend import load_data, corpus
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if loader == "legacy":
+        papers = load_data.load(pathlib.Path(json_dir))
+    else:
+        papers = corpus.load(pathlib.Path(json_dir), workers)
+    dt = time.perf_counter() - t0
+    gc.collect()
+    print(json.dumps({
+        "papers": len(papers), "seconds": dt,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "import_rss_mb": base / 1024,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }))
+
+
+def run(loader: str, json_dir: pathlib.Path, workers: int | None) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_loader", "--child", loader, str(json_dir)]
+    if workers:
+        cmd += ["--workers", str(workers)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--child", nargs=2, metavar=("LOADER", "DIR"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(*args.child, args.workers)
+
+    print(f"{'papers':>8} {'loader':>8} {'load s':>8} {'peak RSS MB':>12} {'worker MB':>10}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            synthetic.write_corpus(tmp, n)
+            for loader in ("legacy", "corpus"):
+                r = run(loader, pathlib.Path(tmp), args.workers)
+                print(f"{n:>8} {loader:>8} {r['seconds']:>8.2f} {r['rss_mb']:>12.0f} "
+                      f"{r['worker_rss_mb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""benchmarks/bench_refs.py
+Reference canonicalisation (`backend.refs`): citation strings of synthetic
+works are written in several formattings – page numbers, edition years,
+punctuation, case – and resolved back to works.  Some formattings name
+the publisher, so not every pair of variants reaches the word-Jaccard
+threshold.  Reports distinct slugs,
+canonical references, true works, pairwise precision / recall of the merges
+and wall time, against naive all-pairs Jaccard for small sizes.
+
+    python -m benchmarks.bench_refs --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+
+from backend import refs
+from backend.sharedref import _slug
+
+SYLLABLES = "ba be bi bo da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no " \
+            "ra re ri ro sa se si so ta te ti to va ve vi vo".split()
+
+
+def citations(works: int, per_work: float, seed: int = 0):
+    """(raw citation strings, true work id of each)."""
+    rng = np.random.default_rng(seed)
+    word = lambda n: ''.join(rng.choice(SYLLABLES, n))
+    surnames = [word(3).title() for _ in range(max(works // 5, 1))]
+    vocab = np.array([word(int(rng.integers(2, 5))) for _ in range(20000)])
+    raws, truth = [], []
+    for w in range(works):
+        author = surnames[rng.integers(len(surnames))]
+        title = ' '.join(rng.choice(vocab, rng.integers(3, 8)))
+        year = int(rng.integers(1800, 2024))
+        publisher = word(3).title()
+        for _ in range(1 + rng.poisson(per_work - 1)):
+            t = title.title() if rng.random() < .5 else title.capitalize()
+            y = year + int(rng.integers(0, 30)) * (rng.random() < .3)   # later edition
+            s = rng.choice([f"{author}, {t}. {y}.", f"{author} ({y}) {t}",
+                            f"{author}. “{t}.” {publisher}, {y}"])
+            if rng.random() < .5:
+                p = int(rng.integers(1, 400))
+                s += f", pp. {p}–{p + int(rng.integers(1, 40))}" if rng.random() < .5 else f", {p}"
+            raws.append(s); truth.append(w)
+    return raws, np.asarray(truth)
+
+
+def naive(slugs, threshold):
+    """All-pairs Jaccard (same surname), the O(R²) reference."""
+    toks = [refs.tokens(s) for s in slugs]
+    canon = {}
+    for i, (si, wi) in enumerate(toks):
+        for j in range(i):
+            sj, wj = toks[j]
+            if si == sj and wi and len(wi & wj) >= threshold * len(wi | wj):
+                canon[slugs[i]] = canon.get(slugs[j], slugs[j])
+                break
+    return canon
+
+
+def pair_scores(pred, truth):
+    """Pairwise precision / recall of predicted vs true clusters."""
+    c2 = lambda x: (x * (x - 1) // 2).sum()
+    _, cell = np.unique(np.column_stack([pred, truth]), axis=0, return_counts=True)
+    tp = c2(cell)
+    p_pairs = c2(np.unique(pred, return_counts=True)[1])
+    t_pairs = c2(np.unique(truth, return_counts=True)[1])
+    return tp / max(p_pairs, 1), tp / max(t_pairs, 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                    help="number of distinct works")
+    ap.add_argument("--per_work", type=float, default=3., help="formattings per work (mean)")
+    ap.add_argument("--threshold", type=float, default=refs.THRESHOLD)
+    ap.add_argument("--max_naive", type=int, default=5000)
+    args = ap.parse_args()
+
+    print(f"{'works':>8} {'impl':>6} {'slugs':>8} {'canonical':>10} {'precision':>9} "
+          f"{'recall':>7} {'time s':>8}")
+    for n in args.sizes:
+        raws, truth = citations(n, args.per_work)
+        slug_of = [_slug(r) for r in raws]
+        slugs = sorted(set(slug_of))
+        work = dict(zip(slug_of, truth.tolist()))        # one work per slug
+        t_slug = np.asarray([work[s] for s in slugs])
+        impls = [('lsh', refs.canonical)] + ([('naive', naive)] if n <= args.max_naive else [])
+        for name, fn in impls:
+            t0 = time.perf_counter()
+            canon = fn(slugs, args.threshold)
+            dt = time.perf_counter() - t0
+            root = {s: i for i, s in enumerate(slugs)}
+            pred = np.asarray([root[canon.get(s, s)] for s in slugs])
+            precision, recall = pair_scores(pred, t_slug)
+            print(f"{n:>8} {name:>6} {len(slugs):>8} {len(slugs) - len(canon):>10} "
+                  f"{precision:>9.3f} {recall:>7.3f} {dt:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
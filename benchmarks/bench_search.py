@@ -0,0 +1,63 @@
+"""benchmarks/bench_search.py
+Query latency (p50 / p99) of the inverted index in `backend.search` – whole
+words, prefixes (as typed) and infixes – against app.py's former substring
+scan of every title/author haystack, plus index build time and the size of
+search_index.json.
+
+    python -m benchmarks.bench_search --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, json, time
+import numpy as np
+
+from backend import search
+from . import synthetic
+
+
+def _percentiles(fn, items):
+    times = []
+    for it in items:
+        t0 = time.perf_counter()
+        fn(it)
+        times.append(time.perf_counter() - t0)
+    return np.percentile(times, [50, 99]) * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"{'papers':>8} {'query':>8} {'p50 ms':>8} {'p99 ms':>8} {'hits':>8}")
+    for n in args.sizes:
+        papers = synthetic.records(n)
+        t0 = time.perf_counter()
+        index = search.Index.build(papers)
+        build = time.perf_counter() - t0
+        size = len(json.dumps(index.to_json(), separators=(',', ':')))
+        print(f"{n:>8} build {build:.2f}s, {len(index.terms)} terms, "
+              f"{size / 2**20:.1f} MB")
+        haystack = [(p['title'] + " " + " ".join(p['authors'])).lower() for p in papers]
+
+        rng = np.random.default_rng(1)
+        words = [t for t in index.terms if len(t) >= 5 and not t.isdigit()]
+        pick = lambda: words[rng.integers(len(words))]
+        queries = {
+            'word': [pick() for _ in range(args.queries)],
+            'prefix': [pick()[:3] for _ in range(args.queries)],
+            'infix': [pick()[1:4] for _ in range(args.queries)],
+            'two': [f"{pick()} {pick()[:3]}" for _ in range(args.queries)],
+        }
+        index.trigrams                                   # built once, on first infix
+        for kind, qs in queries.items():
+            p = _percentiles(index.search, qs)
+            hits = np.mean([len(index.search(q)[0]) for q in qs[:20]])
+            print(f"{n:>8} {kind:>8} {p[0]:>8.3f} {p[1]:>8.3f} {hits:>8.0f}")
+        p = _percentiles(lambda q: [r for r, h in enumerate(haystack) if q in h],
+                         queries['word'][:50])
+        print(f"{n:>8} {'scan':>8} {p[0]:>8.3f} {p[1]:>8.3f} {'':>8}")
+
+
+if __name__ == "__main__":
+    main()
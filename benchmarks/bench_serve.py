@@ -0,0 +1,218 @@
+"""benchmarks/bench_serve.py
+Local load test of multi-worker serving (gunicorn.conf.py): a synthetic
+public/ is served by `--workers` app processes, with and without the shared
+graph store (`backend.graph_store`), while `--clients` client processes send
+a mix of clicks, searches, zooms and "Show All" through dash's callback
+endpoint over keep-alive connections.  Reports time to the first response,
+throughput, p50 / p99 latency and per-worker memory: RSS, PSS (shared pages
+split between the processes mapping them) and USS (private pages).
+
+gunicorn is used when installed; otherwise an equivalent pre-fork server
+(`--serve`: one listening socket, forked werkzeug workers) stands in.
+
+    python -m benchmarks.bench_serve --papers 20000 --workers 4 --clients 8
+"""
+from __future__ import annotations
+import argparse, http.client, json, os, pathlib, shutil, signal, socket, subprocess, \
+    sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from backend import search
+from . import synthetic
+from .bench_artifacts import write_public
+from .suite import callback_body
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MIX = {'click': .4, 'search': .3, 'zoom': .2, 'show-all': .1}
+
+
+# ──────────────────────────────────────────────────────────────── serving
+def serve(bind: str, workers: int, store: bool):
+    """Pre-fork stand-in for gunicorn: build the store, bind once, fork
+    `workers` threaded werkzeug servers sharing the socket (cwd: public/'s parent)."""
+    from backend import graph_store
+    if store:
+        os.environ[graph_store.ENV] = str(graph_store.build('public').resolve())
+    host, port = bind.rsplit(':', 1)
+    sock = socket.create_server((host, int(port)), backlog=1024)
+    sock.set_inheritable(True)
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            sys.path.insert(0, str(ROOT))
+            import app
+            from werkzeug.serving import WSGIRequestHandler, make_server
+            WSGIRequestHandler.log_request = lambda *a, **k: None
+            WSGIRequestHandler.protocol_version = 'HTTP/1.1'      # keep-alive
+            make_server(host, int(port), app.server, threaded=True,
+                        fd=sock.fileno()).serve_forever()
+            os._exit(0)
+        pids.append(pid)
+
+    def stop(*_):
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+        os._exit(0)
+    signal.signal(signal.SIGTERM, stop)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+
+def launch(cwd: pathlib.Path, bind: str, workers: int, threads: int, store: bool):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [str(ROOT), *filter(None, [os.environ.get('PYTHONPATH')])]),
+        MTO_BIND=bind, MTO_WORKERS=str(workers), MTO_THREADS=str(threads),
+        MTO_STORE='1' if store else '0')
+    if shutil.which('gunicorn'):
+        cmd = ['gunicorn', '-c', str(ROOT / 'gunicorn.conf.py'), '--log-level', 'warning',
+               'app:server']
+    else:
+        cmd = [sys.executable, '-m', 'benchmarks.bench_serve', '--serve', bind,
+               '--workers', str(workers)] + ([] if store else ['--no_store'])
+    return subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL)
+
+
+def workers_of(pid: int):
+    """Worker processes of a server: its children (gunicorn's master or `serve`)."""
+    kids = pathlib.Path(f'/proc/{pid}/task/{pid}/children').read_text().split()
+    return [int(k) for k in kids]
+
+
+def memory(pid: int) -> dict:
+    """RSS / PSS / USS in MB, from /proc/<pid>/smaps_rollup."""
+    kb = {}
+    for line in pathlib.Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines()[1:]:
+        k, v = line.split(':')
+        kb[k] = int(v.split()[0])
+    return {'rss': kb['Rss'] / 1024, 'pss': kb['Pss'] / 1024,
+            'uss': (kb['Private_Clean'] + kb['Private_Dirty']) / 1024}
+
+
+# ──────────────────────────────────────────────────────────────── clients
+def _request(conn, kind: str, rng, ids, terms, span):
+    if kind == 'click':
+        body = callback_body(['graph.clickData'],
+                             click={'points': [{'customdata': ids[rng.integers(len(ids))]}]})
+    elif kind == 'search':
+        body = callback_body(['search-box.value'], term=terms[rng.integers(len(terms))])
+    elif kind == 'zoom':
+        lo = rng.uniform(span[0], span[1] - 365)
+        hi = lo + rng.uniform(365, span[1] - lo)
+        day = lambda d: str(np.datetime64('1970-01-01') + np.timedelta64(int(d), 'D'))
+        body = callback_body(['graph.relayoutData'], showall=1,
+                             relayout={'xaxis.range[0]': day(lo), 'xaxis.range[1]': day(hi)},
+                             view={'rows': None, 'edges': 'all', 'window': None})
+    else:
+        body = callback_body(['showall-button.n_clicks'], showall=1)
+    payload = json.dumps(body)
+    t0 = time.perf_counter()
+    conn.request('POST', '/_dash-update-component', payload,
+                 {'Content-Type': 'application/json'})
+    r = conn.getresponse()
+    r.read()
+    if r.status != 200:
+        raise RuntimeError(f"{kind}: HTTP {r.status}")
+    return time.perf_counter() - t0
+
+
+def client(args):
+    """Requests from one client until `stop` (epoch s); [(kind, s), …]."""
+    port, seed, stop, ids, terms, span = args
+    rng = np.random.default_rng(seed)
+    kinds, p = list(MIX), np.array(list(MIX.values()))
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    out = []
+    while time.time() < stop:
+        kind = kinds[rng.choice(len(kinds), p=p)]
+        out.append((kind, _request(conn, kind, rng, ids, terms, span)))
+    conn.close()
+    return out
+
+
+def wait_ready(port: int, proc, timeout: float = 300.) -> float:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/_stats')
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - t0
+        except OSError:
+            pass
+        time.sleep(.05)
+    raise SystemExit("server did not come up")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# ─────────────────────────────────────────────────────────────────── main
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--papers", type=int, default=20000)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--threads", type=int, default=4, help="per worker (gunicorn only)")
+    ap.add_argument("--clients", type=int, default=8, help="concurrent client processes")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--warmup", type=float, default=3)
+    ap.add_argument("--modes", nargs="+", choices=("store", "json"), default=["json", "store"])
+    ap.add_argument("--serve", metavar="HOST:PORT", help=argparse.SUPPRESS)
+    ap.add_argument("--no_store", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.serve:
+        return serve(args.serve, args.workers, not args.no_store)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        public = tmp / 'public'
+        public.mkdir()
+        write_public(public, args.papers)
+        papers = synthetic.records(args.papers)
+        search.build(papers, public)
+        ids = [p['id'] for p in papers]
+        terms = sorted({w for p in papers[:2000] for w in p['title'].lower().split()})
+        days = np.array([p['date'] for p in papers], dtype='datetime64[D]').astype(np.int64)
+        span = (float(days.min()), float(days.max()) + 366)
+
+        server = 'gunicorn' if shutil.which('gunicorn') else 'pre-fork werkzeug'
+        print(f"{args.papers} papers, {args.workers} workers ({server}), {args.clients} clients")
+        print(f"{'mode':>6} {'ready s':>8} {'req/s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+              f"{'RSS MB':>7} {'PSS MB':>7} {'USS MB':>7} {'Σ PSS':>7}  per kind p50 ms")
+
+        for mode in args.modes:
+            port = free_port()
+            proc = launch(tmp, f'127.0.0.1:{port}', args.workers, args.threads,
+                          mode == 'store')
+            try:
+                ready = wait_ready(port, proc)
+                with ProcessPoolExecutor(args.clients) as pool:
+                    job = lambda secs, seed: [r for rs in pool.map(client, [
+                        (port, seed + c, time.time() + secs, ids, terms, span)
+                        for c in range(args.clients)]) for r in rs]
+                    job(args.warmup, 0)                 # every worker imports app
+                    t0 = time.perf_counter()
+                    results = job(args.seconds, 1000)
+                    wall = time.perf_counter() - t0
+                mem = [memory(pid) for pid in workers_of(proc.pid)]
+            finally:
+                proc.terminate()
+                proc.wait()
+            lat = np.array([s for _, s in results]) * 1e3
+            per = '  '.join(f"{k} {np.median([s for kk, s in results if kk == k]) * 1e3:.0f}"
+                            for k in MIX if any(kk == k for kk, _ in results))
+            avg = {k: np.mean([m[k] for m in mem]) for k in ('rss', 'pss', 'uss')}
+            print(f"{mode:>6} {ready:>8.2f} {len(lat) / wall:>7.1f} "
+                  f"{np.percentile(lat, 50):>7.1f} {np.percentile(lat, 99):>7.1f} "
+                  f"{avg['rss']:>7.0f} {avg['pss']:>7.0f} {avg['uss']:>7.0f} "
+                  f"{sum(m['pss'] for m in mem):>7.0f}  {per}")
+
+
+if __name__ == "__main__":
+    main()
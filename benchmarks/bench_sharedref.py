@@ -0,0 +1,69 @@
+"""benchmarks/bench_sharedref.py
+Bibliographic coupling: the original per-reference `itertools.combinations`
+Counter versus the sparse A·Aᵀ engine in `backend.sharedref`, with wall time,
+peak traced memory and an equality check of the resulting edges.
+
+    python -m benchmarks.bench_sharedref --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+import argparse, collections, itertools, time, tracemalloc
+
+from backend import sharedref
+from . import synthetic
+
+
+def combinations_edges(papers, min_shared=2):
+    """The pre-sparse implementation, kept as the reference."""
+    ref_index = collections.defaultdict(set)
+    for p in papers:
+        for ref in p['citations_raw'].values():
+            ref_index[sharedref._ref_slug(ref)].add(p['id'])
+    pair_counts = collections.Counter()
+    for plist in ref_index.values():
+        for a, b in itertools.combinations(sorted(plist), 2):
+            pair_counts[(a, b)] += 1
+    return sharedref.to_edges(pair_counts, min_shared)
+
+
+def sparse_edges(papers, min_shared=2):
+    return sharedref.coupling_edges(papers, min_shared)
+
+
+def _measure(fn, papers):
+    """Wall time of an untraced run, then peak memory of a traced one."""
+    sharedref._ref_slug.cache_clear()
+    t0 = time.perf_counter()
+    edges = fn(papers)
+    dt = time.perf_counter() - t0
+    sharedref._ref_slug.cache_clear()
+    tracemalloc.start()
+    fn(papers)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return edges, dt, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--max_legacy", type=int, default=100000,
+                    help="skip the combinations reference above this size")
+    args = ap.parse_args()
+
+    print(f"{'papers':>8} {'impl':>13} {'edges':>9} {'time s':>8} {'peak MB':>8}")
+    for n in args.sizes:
+        papers = synthetic.records(n)
+        impls = [('sparse', sparse_edges)]
+        if n <= args.max_legacy:
+            impls.insert(0, ('combinations', combinations_edges))
+        results = {}
+        for name, fn in impls:
+            edges, dt, peak = _measure(fn, papers)
+            results[name] = edges
+            print(f"{n:>8} {name:>13} {len(edges):>9} {dt:>8.2f} {peak/2**20:>8.1f}")
+        if len(results) == 2 and results['sparse'] != results['combinations']:
+            raise SystemExit(f"edge mismatch at {n} papers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""benchmarks/bench_showall.py
+"Show All" figure build + JSON serialization: one `layout.shapes` dict per
+edge (the original app.py) versus batched Scattergl traces from
+`backend.edge_traces`.
+
+    python -m benchmarks.bench_showall --edges 10000 100000 1000000
+"""
+from __future__ import annotations
+import argparse, math, time
+import plotly.graph_objects as go
+
+from backend import graph_index, edge_traces
+from . import synthetic
+
+
+def shapes_figure(index, et):
+    """The pre-batching implementation: one SVG line shape per edge."""
+    es = index.edges[et]
+    x0, y0, x1, y1 = index.segments(et, index.all_edges(et))
+    shapes = [dict(type='line', x0=x0[i], y0=y0[i], x1=x1[i], y1=y1[i],
+                   line=dict(color='rgba(78,121,167,0.6)', width=w * 5,
+                             dash='solid'), layer='below')
+              for i, w in enumerate(es.weight.tolist())]
+    fig = go.Figure()
+    fig.update_layout(shapes=shapes)
+    return fig
+
+
+def traces_figure(index, et):
+    return go.Figure(edge_traces.edge_traces(index, et, index.all_edges(et)))
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    fig = fn(*args)
+    build = time.perf_counter() - t0
+    payload = fig.to_json()
+    return build, time.perf_counter() - t0, len(payload)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--edges", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--per_node", type=int, default=5)
+    ap.add_argument("--max_shapes", type=int, default=1000000,
+                    help="skip the shapes path above this many edges")
+    args = ap.parse_args()
+
+    print(f"{'edges':>8} {'impl':>7} {'build s':>8} {'+json s':>8} {'payload MB':>11}")
+    for m in args.edges:
+        n = math.ceil(m / args.per_node)
+        index = graph_index.from_frame(
+            synthetic.nodes_frame(n),
+            {'semantic': synthetic.edge_list(n, args.per_node)})
+        impls = [('traces', traces_figure)]
+        if m <= args.max_shapes:
+            impls.insert(0, ('shapes', shapes_figure))
+        for name, fn in impls:
+            build, total, size = _time(fn, index, 'semantic')
+            print(f"{m:>8} {name:>7} {build:>8.2f} {total:>8.2f} {size/2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
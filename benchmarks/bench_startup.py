@@ -0,0 +1,68 @@
+"""benchmarks/bench_startup.py
+Start-up cost per `backend.cli` subcommand and for app.py: each runs in a
+fresh interpreter under `python -X importtime` on a small synthetic corpus,
+reporting total import time, process wall time and which heavy dependencies
+were imported at all.
+
+    python -m benchmarks.bench_startup --papers 200
+"""
+from __future__ import annotations
+import argparse, os, pathlib, subprocess, sys, tempfile, time
+
+from . import synthetic
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+HEAVY = ('torch', 'sentence_transformers', 'sklearn', 'scipy', 'pandas', 'plotly', 'dash')
+COMMANDS = ('density', 'lineage', 'sharedref', 'semantic')
+
+
+def importtime(cmd, cwd) -> dict:
+    """Run `cmd` (python args) under -X importtime; import ms, wall s, heavy deps."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [str(ROOT), *filter(None, [os.environ.get('PYTHONPATH')])]))
+    t0 = time.perf_counter()
+    r = subprocess.run([sys.executable, '-X', 'importtime', *cmd], cwd=cwd, env=env,
+                       capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if r.returncode:
+        raise SystemExit(f"{' '.join(cmd)} failed:\n{r.stderr[-2000:]}")
+    total, mods = 0, set()
+    for line in r.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cum, name = line[len('import time:'):].split('|')
+        mods.add(name.strip())
+        if not name[1:].startswith(' '):               # top level: counted once
+            total += int(cum)
+    heavy = [h for h in HEAVY if h in mods]
+    return {'import_ms': total / 1e3, 'wall_s': wall, 'heavy': heavy}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--papers", type=int, default=200)
+    ap.add_argument("--commands", nargs="+", choices=COMMANDS, default=list(COMMANDS))
+    args = ap.parse_args()
+
+    print(f"{'command':>10} {'import ms':>10} {'wall s':>7}  heavy imports")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        synthetic.write_corpus(tmp / 'data', args.papers)
+        for cmd in args.commands:
+            r = importtime(['-m', 'backend.cli', cmd, '--json_dir', str(tmp / 'data'),
+                            '--out_dir', str(tmp / 'public'), '--workers', '1'], ROOT)
+            print(f"{cmd:>10} {r['import_ms']:>10.0f} {r['wall_s']:>7.2f}  "
+                  f"{' '.join(r['heavy']) or '-'}")
+        if 'semantic' in args.commands:
+            for cmd in ('sharedref', 'lineage', 'density'):
+                if cmd not in args.commands:
+                    subprocess.run([sys.executable, '-m', 'backend.cli', cmd, '--json_dir',
+                                    str(tmp / 'data'), '--out_dir', str(tmp / 'public')],
+                                   cwd=ROOT, check=True, capture_output=True)
+            r = importtime(['-c', 'import app'], tmp)
+            print(f"{'app':>10} {r['import_ms']:>10.0f} {r['wall_s']:>7.2f}  "
+                  f"{' '.join(r['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""benchmarks/bench_temporal.py
+Time-windowed semantic neighbours: `knn.temporal` per window against the
+global exact search, plus the recall a post-filter of the global top-k would
+get – the fraction of each paper's true in-window neighbours that survive
+filtering the global list.  In-window results are checked against brute force
+on a sample of queries.
+
+    python -m benchmarks.bench_temporal --sizes 10000 50000 --windows past window:2
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+
+from backend import knn
+from . import synthetic
+
+
+def brute(emb, years, k, lo, hi, rows):
+    """Similarities of the true in-window top-(k-1) of each row, best first."""
+    out = np.full((len(rows), k - 1), -np.inf, dtype=np.float32)
+    for n, r in enumerate(rows.tolist()):
+        ok = (years > 0) & (years >= (years[r] + lo if lo is not None else 0)) \
+            & (years <= (years[r] + hi if hi is not None else years.max()))
+        ok[r] = False
+        s = np.sort(emb[ok] @ emb[r])[::-1][:k - 1]
+        out[n, :len(s)] = s
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    ap.add_argument("--windows", nargs="+", default=["past", "past:5", "window:2"])
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--top_k", type=int, default=5)
+    ap.add_argument("--check", type=int, default=200, help="queries checked by brute force")
+    args = ap.parse_args()
+
+    k = args.top_k + 1
+    print(f"{'papers':>8} {'search':>9} {'time s':>8} {'post-filter recall':>19}")
+    for n in args.sizes:
+        emb = synthetic.embeddings(n, args.dim)
+        years = np.random.default_rng(1).integers(1990, 2025, n)
+        t0 = time.perf_counter()
+        gidx, _ = knn.exact(emb, k)
+        print(f"{n:>8} {'global':>9} {time.perf_counter() - t0:>8.2f} {'-':>19}")
+        sample = np.random.default_rng(0).choice(n, min(n, args.check), replace=False)
+        for spec in args.windows:
+            name, lo, hi = knn.parse_window(spec)
+            t0 = time.perf_counter()
+            idx, sim = knn.temporal(emb, years, k, lo, hi)
+            dt = time.perf_counter() - t0
+            if not np.allclose(sim[sample, 1:], brute(emb, years, k, lo, hi, sample), atol=1e-5):
+                raise SystemExit(f"{name}: disagrees with brute force at {n} papers")
+            # global neighbours a post-filter would keep, vs the true in-window ones
+            lag = years[gidx[:, 1:]] - years[:, None]
+            keep = ((lag >= lo) if lo is not None else True) & ((lag <= hi) if hi is not None else True)
+            found = keep.sum() / max((idx[:, 1:] >= 0).sum(), 1)
+            print(f"{n:>8} {name:>9} {dt:>8.2f} {found:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""benchmarks/bench_viewport.py
+Response size and latency of the figure callback's viewport-bounded pieces
+(`backend.viewport` + `FigureCache`) as the corpus grows, against the same
+pieces with level-of-detail disabled (every node, every edge).  Latency
+includes JSON serialisation and is measured cold (first visit of a window).
+
+    python -m benchmarks.bench_viewport --sizes 10000 100000 1000000
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from backend import graph_index
+from backend.artifacts import EdgeTable
+from backend.figure_cache import FigureCache
+from . import synthetic
+
+
+def edge_table(n: int, per_node: int, seed: int = 0) -> EdgeTable:
+    rng = np.random.default_rng(seed)
+    src = np.repeat(np.arange(n, dtype=np.int32), per_node)
+    return EdgeTable('semantic', np.asarray(synthetic.node_ids(n), dtype=object), src,
+                     rng.integers(0, n, len(src)).astype(np.int32),
+                     rng.uniform(.6, 1., len(src)).astype(np.float32))
+
+
+def _run(fn):
+    t0 = time.perf_counter()
+    nbytes = len(to_json_plotly(fn()))
+    return time.perf_counter() - t0, nbytes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--per_node", type=int, default=5)
+    ap.add_argument("--max_unbounded", type=int, default=100000,
+                    help="skip the LOD-off run above this many nodes")
+    args = ap.parse_args()
+
+    et = 'semantic'
+    print(f"{'nodes':>8} {'view':>16} {'LOD ms':>8} {'KB':>7} {'no-LOD ms':>10} {'KB':>8}")
+    for n in args.sizes:
+        nodes_df = synthetic.nodes_frame(n)
+        index = graph_index.from_frame(nodes_df, {et: edge_table(n, args.per_node)})
+        lod = FigureCache(index, nodes_df)
+        full = FigureCache(index, nodes_df, max_nodes=n, max_edges=n * args.per_node) \
+            if n <= args.max_unbounded else None
+
+        y_hi = float(index.y.max())
+        t = lambda d: float(np.datetime64(d, 'ms').astype(np.int64))
+        windows = {
+            'all'       : None,
+            '5 years'   : (t('2010-01-01'), t('2015-01-01'), None, None),
+            '1 year'    : (t('2012-01-01'), t('2013-01-01'), 0, y_hi / 4),
+            '1 month'   : (t('2012-06-01'), t('2012-07-01'), 0, y_hi / 4),
+        }
+        for name, w in windows.items():
+            for what in ('nodes', 'show-all'):
+                def piece(cache):
+                    sw = cache.viewport.snap(w)
+                    if what == 'nodes':
+                        return cache.patch(nodes=cache.view_nodes(sw))
+                    return cache.patch(edges=cache.show_all(et, sw))
+                a = _run(lambda: piece(lod))
+                b = _run(lambda: piece(full)) if full else (float('nan'), float('nan'))
+                print(f"{n:>8} {name + ' ' + what:>16} {a[0] * 1e3:>8.1f} {a[1] / 1024:>7.0f} "
+                      f"{b[0] * 1e3:>10.1f} {b[1] / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
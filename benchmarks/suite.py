@@ -0,0 +1,221 @@
+"""benchmarks/suite.py
+End-to-end scaling suite.  For each size a synthetic corpus is written
+(`synthetic.write_corpus`: papers, author pool, reference pool and overlap
+skew, year range), then the loader, every build stage and app.py's figure
+callback run, each in its own process through `backend.scheduler`, recording
+wall time, peak RSS and output size.
+
+Every run is appended to a JSON history (with the git commit) and each
+result is compared with the previous run of the same stage and size, so
+regressions show up across changes.  `--profile STAGE…` runs those stages
+under cProfile / pyinstrument and keeps the profiles.
+
+    python -m benchmarks.suite --sizes 1000 10000 --profile sharedref
+"""
+from __future__ import annotations
+import argparse, contextlib, datetime, importlib.util, io, json, os, pathlib, shutil, \
+    subprocess, sys, tempfile, time
+
+from backend import citation, corpus, density, lineage, search, semantic, sharedref, trends
+from backend.scheduler import PROFILE_DIR, PROFILERS, Stage, run
+from . import synthetic
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STAGES = ('load', 'semantic', 'citation', 'sharedref', 'lineage', 'density', 'trends',
+          'search', 'callbacks')
+
+
+# ───────────────────────────────────────────────────────────────── stages
+def load_stage(_papers, out: pathlib.Path, json_dir: str):
+    papers = corpus.load(pathlib.Path(json_dir))
+    (out / 'load.json').write_text(json.dumps({'papers': len(papers),
+                                               'corpus_mb': papers.nbytes / 2**20}))
+
+
+def callback_body(changed, *, click=None, relayout=None, et='semantic', term=None,
+                  reset=0, showall=0, view=None) -> dict:
+    """JSON body of one figure-callback request, as the browser sends it."""
+    return {'output': '..graph.figure...view.data..',
+            'outputs': [{'id': 'graph', 'property': 'figure'},
+                        {'id': 'view', 'property': 'data'}],
+            'inputs': [{'id': 'graph', 'property': 'clickData', 'value': click},
+                       {'id': 'graph', 'property': 'relayoutData', 'value': relayout},
+                       {'id': 'edge-type', 'property': 'value', 'value': et},
+                       {'id': 'search-box', 'property': 'value', 'value': term},
+                       {'id': 'reset-button', 'property': 'n_clicks', 'value': reset},
+                       {'id': 'showall-button', 'property': 'n_clicks', 'value': showall}],
+            'state': [{'id': 'view', 'property': 'data', 'value': view}],
+            'changedPropIds': changed}
+
+
+def _post(client, changed, **kw):
+    """One figure-callback request through a flask test client."""
+    t0 = time.perf_counter()
+    r = client.post('/_dash-update-component', json=callback_body(changed, **kw))
+    if r.status_code != 200:
+        raise RuntimeError(f"callback {changed}: HTTP {r.status_code}")
+    return time.perf_counter() - t0, len(r.data), r.get_json()['response'].get('view')
+
+
+def callbacks_stage(_papers, out: pathlib.Path, repeat: int = 5):
+    """Drive app.py's update_graph through dash's HTTP endpoint over `out`
+    (which must be named public/); writes callbacks.json."""
+    os.chdir(out.parent)
+    sys.path.insert(0, str(ROOT))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    client = app.app.server.test_client()
+    ids = app.nodes_df['id'].tolist()
+    lo, hi = app.nodes_df['date'].quantile([.4, .6]).tolist()
+    results = {}
+
+    def time_it(kind, changed, **kw):
+        best = []
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                dt, nbytes, view = _post(client, changed, **kw)
+            best.append(dt)
+        results[kind] = {'ms': round(sorted(best)[len(best) // 2] * 1e3, 2),
+                         'kb': round(nbytes / 1024, 1)}
+        return view['data'] if view else None
+
+    time_it('initial', [])
+    view = time_it('click', ['graph.clickData'],
+                   click={'points': [{'customdata': ids[len(ids) // 2]}]})
+    time_it('search', ['search-box.value'], term='paper 1', view=view)
+    time_it('reset', ['reset-button.n_clicks'], reset=1, view=view)
+    time_it('show-all', ['showall-button.n_clicks'], showall=1)
+    time_it('zoom', ['graph.relayoutData'], showall=1,
+            relayout={'xaxis.range[0]': str(lo), 'xaxis.range[1]': str(hi)},
+            view={'rows': None, 'edges': 'all', 'window': None})
+    (out / 'callbacks.json').write_text(json.dumps(results, indent=2))
+
+
+def stages(data: pathlib.Path, selected) -> list:
+    after = tuple(s for s in ('semantic', 'citation', 'sharedref', 'lineage', 'density',
+                              'trends', 'search') if s in selected)
+    every = [
+        Stage('semantic', semantic.build, None, ('nodes.json', 'semantic_edges.json'),
+              code=('backend.knn', 'backend.embedder', 'backend.layout', 'backend.load_data',
+                    'backend.citation')),
+        Stage('citation', citation.build, ('id', 'title', 'authors', 'citations_raw',
+                                           'years'),
+              ('citation_metrics.json',), after=('semantic',) if 'semantic' in selected else ()),
+        Stage('sharedref', sharedref.build, ('id', 'citations_raw'), (sharedref.EDGES,)),
+        Stage('lineage', lineage.build, ('id', 'authors', 'dates'), ('lineage_edges.json',)),
+        Stage('density', density.build, ('years',), ('year_density.json',)),
+        Stage('trends', trends.build, ('keywords', 'dates'), (trends.TRENDS,)),
+        Stage('search', search.build, ('id', 'title', 'authors', 'keywords', 'abstract'),
+              ('search_index.json',)),
+        Stage('callbacks', callbacks_stage, (), ('callbacks.json',), after=after),
+    ]
+    return [s for s in every if s.name in selected]
+
+
+# ──────────────────────────────────────────────────────────────── history
+def _commit() -> str | None:
+    r = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                       capture_output=True, text=True)
+    return r.stdout.strip() or None
+
+
+def _previous(history: list, papers: int, stage: str) -> dict | None:
+    for entry in reversed(history):
+        for r in entry['results']:
+            if r['papers'] == papers and r['stage'] == stage:
+                return r
+    return None
+
+
+def _row(r: dict, prev: dict | None):
+    delta = f"{(r['seconds'] / prev['seconds'] - 1) * 100:+.0f}%" \
+        if prev and prev.get('seconds') else '-'
+    peak = f"{r['peak_mb']:.0f}" if r.get('peak_mb') is not None else '-'
+    print(f"{r['papers']:>8} {r['stage']:<18} {r['seconds']:>8.3f} {delta:>7} "
+          f"{peak:>8} {r['output_mb']:>8.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    ap.add_argument("--authors", type=float, default=3.,
+                    help="papers per author in the synthetic pool")
+    ap.add_argument("--refs", type=float, default=5.,
+                    help="distinct references per paper in the synthetic pool")
+    ap.add_argument("--skew", type=float, default=1.,
+                    help="Zipf exponent of reference popularity (overlap)")
+    ap.add_argument("--years", type=int, nargs=2, default=[1995, 2024])
+    ap.add_argument("--history", default=str(ROOT / 'benchmarks' / 'history.json'))
+    ap.add_argument("--profile", nargs="+", choices=STAGES, default=[], metavar="STAGE")
+    ap.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    ap.add_argument("--profile_dir", default=str(ROOT / 'benchmarks' / 'profiles'))
+    args = ap.parse_args()
+
+    selected = list(args.stages)
+    if 'semantic' in selected and importlib.util.find_spec('sentence_transformers') is None:
+        print("[suite] sentence-transformers not installed: skipping semantic and callbacks")
+        selected = [s for s in selected if s not in ('semantic', 'callbacks')]
+    if 'callbacks' in selected and 'semantic' not in selected:
+        print("[suite] callbacks need semantic's nodes.json: skipping callbacks")
+        selected.remove('callbacks')
+
+    hist_path = pathlib.Path(args.history)
+    history = json.loads(hist_path.read_text()) if hist_path.exists() else []
+    results = []
+    print(f"{'papers':>8} {'stage':<18} {'time s':>8} {'vs last':>7} {'peak MB':>8} {'out MB':>8}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data, out = pathlib.Path(tmp) / 'data', pathlib.Path(tmp) / 'public'
+            out.mkdir()
+            synthetic.write_corpus(data, n, authors=max(int(n / args.authors), 1),
+                                   refs=max(int(n * args.refs), 1), skew=args.skew,
+                                   years=tuple(args.years))
+            report = {}
+            with contextlib.redirect_stdout(io.StringIO()):
+                if 'load' in selected:
+                    report.update(run([Stage('load', load_stage, None, ('load.json',),
+                                             kwargs=dict(json_dir=str(data)))],
+                                      None, out, jobs=1, force=True,
+                                      profile=[s for s in args.profile if s == 'load'],
+                                      profiler=args.profiler))
+                todo = stages(data, selected)
+                if todo:
+                    papers = corpus.load(data)
+                    report.update(run(todo, papers, out, jobs=1, force=True,
+                                      profile=[s for s in args.profile
+                                               if s in {t.name for t in todo}],
+                                      profiler=args.profiler))
+
+            for stage, r in report.items():
+                row = {'papers': n, 'stage': stage, 'seconds': r['seconds'],
+                       'peak_mb': r['peak_mb'], 'grew_mb': r['grew_mb'],
+                       'output_mb': r['output_mb']}
+                if stage == 'load':
+                    row['output_mb'] = json.loads((out / 'load.json').read_text())['corpus_mb']
+                results.append(row)
+                _row(row, _previous(history, n, stage))
+            if (out / 'callbacks.json').exists():
+                for kind, c in json.loads((out / 'callbacks.json').read_text()).items():
+                    row = {'papers': n, 'stage': f'callback:{kind}', 'seconds': c['ms'] / 1e3,
+                           'peak_mb': None, 'output_mb': c['kb'] / 1024}
+                    results.append(row)
+                    _row(row, _previous(history, n, row['stage']))
+
+            if (out / PROFILE_DIR).exists():
+                dest = pathlib.Path(args.profile_dir); dest.mkdir(parents=True, exist_ok=True)
+                for fp in (out / PROFILE_DIR).iterdir():
+                    shutil.copy(fp, dest / f"{fp.stem}-{n}{fp.suffix}")
+                print(f"[suite] profiles in {dest}")
+
+    history.append({'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'commit': _commit(),
+                    'config': {k: v for k, v in vars(args).items()
+                               if k not in ('history', 'profile_dir')},
+                    'results': results})
+    hist_path.write_text(json.dumps(history, indent=2))
+    print(f"[suite] appended to {hist_path}")
+
+
+if __name__ == "__main__":
+    main()
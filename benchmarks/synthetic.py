@@ -0,0 +1,115 @@
+"""benchmarks/synthetic.py
+Synthetic MTO-like node tables and edge lists for benchmarking.  Ids mimic
+the title slugs produced by `backend.load_data.slug`.
+"""
+from __future__ import annotations
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+
+def node_ids(n: int) -> List[str]:
+    return [f"synthetic-paper-{i:07d}" for i in range(n)]
+
+
+def nodes_frame(n: int, *, seed: int = 0, first_year: int = 2000,
+                last_year: int = 2024, spacing: int = 18) -> pd.DataFrame:
+    """Node table shaped like `public/nodes.json` after app.py's cleanup."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, (last_year - first_year + 1) * 365, n)
+    dates = np.datetime64(f"{first_year}-01-01") + days.astype('timedelta64[D]')
+    ids = node_ids(n)
+    return pd.DataFrame({
+        'id'     : ids,
+        'title'  : [f"Synthetic Paper {i}" for i in range(n)],
+        'authors': [[f"Author {j}"] for j in rng.integers(0, max(n // 4, 1), n)],
+        'date'   : pd.to_datetime(dates),
+        'y'      : (rng.permutation(n) * spacing).astype(float),
+    })
+
+
+def edge_list(n: int, per_node: int = 5, *, kind: str = 'semantic',
+              seed: int = 0) -> List[Dict]:
+    """`per_node` random out-edges per node, weights in [0.6, 1)."""
+    rng = np.random.default_rng(seed)
+    ids = node_ids(n)
+    src = np.repeat(np.arange(n), per_node)
+    dst = rng.integers(0, n, len(src))
+    w = rng.uniform(.6, 1., len(src)).round(4)
+    return [{'source': ids[s], 'target': ids[t], 'type': kind, 'weight': float(c)}
+            for s, t, c in zip(src.tolist(), dst.tolist(), w.tolist())]
+
+
+# ──────────────────────────────────────────────────────────── raw corpus
+WORDS = ("harmony rhythm meter form schenker tonal post-tonal voice leading "
+         "timbre jazz popular analysis cognition performance hypermeter "
+         "sonata cadence set-class transformational neo-riemannian corpus "
+         "scale mode improvisation groove phrase motive counterpoint").split()
+
+
+def ref_popularity(n_refs: int, skew: float = 1.0, offset: float = 500.) -> np.ndarray:
+    """CDF of a Zipf-like reference popularity: a few canonical works are
+    cited by many papers, most by one or two."""
+    w = 1.0 / (np.arange(n_refs) + offset) ** skew
+    return np.cumsum(w / w.sum())
+
+
+def paper(i: int, rng: np.random.Generator, *, n_authors: int,
+          ref_cdf: np.ndarray, refs_per_paper: int = 20,
+          first_year: int = 1995, last_year: int = 2024) -> dict:
+    """One raw paper JSON object in the shape read by `load_data.load`."""
+    year = int(rng.integers(first_year, last_year + 1))
+    words = rng.choice(WORDS, 40).tolist()
+    refs = np.unique(np.searchsorted(ref_cdf, rng.random(refs_per_paper)))
+    return {
+        "title"    : f"Synthetic Paper {i}: {' '.join(words[:4])}",
+        "authors"  : [f"Author {a}" for a in rng.integers(0, n_authors, rng.integers(1, 4))],
+        "date"     : f"{year}/{int(rng.integers(1, 13)):02d}",
+        "keywords" : words[:3],
+        "abstract" : " ".join(words),
+        "citations": {str(k + 1): f"Reference Author {r}. {r} Title of Work. Publisher, {1900 + r % 120}."
+                      for k, r in enumerate(refs.tolist())},
+    }
+
+
+def write_corpus(json_dir, n: int, *, seed: int = 0, start: int = 0,
+                 authors: int | None = None, refs: int | None = None,
+                 skew: float = 1.0, years: tuple = (1995, 2024)):
+    """Write papers start…start+n-1 as data/<i>.json files.
+
+    `authors` / `refs` size the author and reference pools (default n/3 and
+    5·n); `skew` is the Zipf exponent of reference popularity – higher means
+    more overlap between bibliographies; `years` is the (first, last) year."""
+    import json, pathlib
+    json_dir = pathlib.Path(json_dir); json_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed + start)
+    cdf = ref_popularity(refs or max(n, 1000) * 5, skew)
+    for i in range(start, start + n):
+        p = paper(i, rng, n_authors=authors or max(n // 3, 1), ref_cdf=cdf,
+                  first_year=years[0], last_year=years[1])
+        (json_dir / f"{i:07d}.json").write_text(json.dumps(p))
+
+
+def records(n: int, *, seed: int = 0, authors: int | None = None,
+            refs: int | None = None) -> List[dict]:
+    """In-memory equivalent of `load_data.load` over `write_corpus` files."""
+    import pathlib
+    from backend.load_data import record
+    rng = np.random.default_rng(seed)
+    cdf = ref_popularity(refs or max(n, 1000) * 5)
+    return [record(pathlib.Path(f"{i:07d}.json"),
+                   paper(i, rng, n_authors=authors or max(n // 3, 1), ref_cdf=cdf))
+            for i in range(n)]
+
+
+def embeddings(n: int, dim: int = 384, *, clusters: int | None = None,
+               spread: float = .25, seed: int = 0) -> np.ndarray:
+    """L2-normalised float32 vectors drawn around `clusters` topic centres,
+    roughly mimicking sentence-embedding neighbourhoods."""
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, int(np.sqrt(n)))
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    x = centres[rng.integers(0, clusters, n)]
+    x += spread * np.sqrt(dim / 32) * rng.standard_normal((n, dim)).astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
@@ -0,0 +1,35 @@
+"""gunicorn.conf.py
+Multi-worker serving of app.py (run from the directory holding public/):
+
+    gunicorn -c gunicorn.conf.py app:server
+
+MTO_WORKERS processes (default: one per core) × MTO_THREADS threads each,
+bound to MTO_BIND.  Before forking, the master builds the read-only graph
+store (`backend.graph_store`, public/.serve/, skipped while fresh) and
+exports its path; every worker memory-maps the same node / edge / text
+arrays instead of parsing the JSON into a private copy.  `kill -HUP` the
+master after a rebuild of public/ to refresh the store and the workers.
+MTO_STORE=0 serves without it (each worker loads public/ itself).
+
+`preload_app` stays off: a preloaded app's Python objects would be shared
+copy-on-write only until reference counting touches their pages.
+"""
+import multiprocessing, os
+
+from backend import graph_store
+
+bind         = os.environ.get('MTO_BIND', '127.0.0.1:8050')
+workers      = int(os.environ.get('MTO_WORKERS', multiprocessing.cpu_count()))
+threads      = int(os.environ.get('MTO_THREADS', 4))
+worker_class = 'gthread'
+preload_app  = False
+timeout      = 120
+
+
+def on_starting(server):
+    if os.environ.get('MTO_STORE', '1') != '0':
+        os.environ[graph_store.ENV] = str(graph_store.build('public').resolve())
+
+
+def on_reload(server):
+    on_starting(server)
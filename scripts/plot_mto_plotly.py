@@ -1,180 +1,329 @@
-import json, pathlib, math
+"""scripts/plot_mto_plotly.py
+Static HTML export of the timeline: scripts/mto_timeline.html plus one binary
+sidecar per edge layer in scripts/mto_timeline/.
+
+The page embeds only the nodes – x (epoch ms), y and marker size as base64
+typed arrays, hover texts as strings – and the search index.  Edge layers
+start hidden; switching one on (legend or buttons) fetches its
+`<layer>.bin`: little-endian int32 `src`, `dst` (node point indices), then
+the undirected CSR `offsets` / `nbrs` of `backend.graph_index`.  Segments
+are built from those in JS, and a click reads the clicked node's neighbours
+straight from the offsets of the visible layers – no id lookups, no scans.
+Serve the folder over HTTP (`python3 -m http.server -d scripts`) so the page
+can fetch the sidecars; they compress well (gzip) if the server does so.
+
+    python3 scripts/plot_mto_plotly.py [--public public] [--out scripts/mto_timeline.html]
+"""
+import argparse, base64, json, math, pathlib, sys, time
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
 
 # ---------------------------------------------------------------- paths
 ROOT   = pathlib.Path(__file__).resolve().parents[1]      # project root
 PUBLIC = ROOT / "public"
 OUT_HTML = ROOT / "scripts" / "mto_timeline.html"
 
-# ---------------------------------------------------------------- load nodes
-nodes = pd.read_json(PUBLIC / "nodes.json")
-nodes["date"] = pd.to_datetime(nodes["date"], errors="coerce")
-nodes = nodes.dropna(subset=["date"])                     # toss bad
-node_idx = {row.id: idx for idx, row in nodes.iterrows()}
-
-# ---------------------------------------------------------------- helper
-def load_edges(fname, color, width_fn, dash="solid"):
-    fpath = PUBLIC / fname
-    if not fpath.exists():
-        print(f"[skip] {fname}")
-        return None
+sys.path.insert(0, str(ROOT))
+from backend import artifacts          # columnar public/ reader, JSON fallback
+from backend import graph_index        # id → point rows + CSR adjacency per layer
+from backend import search             # trigram postings for infix search
 
-    df = pd.read_json(fpath)
-    if df.empty:
-        return None
+EDGE_LAYERS = [
+    ("semantic",  "rgba(78,121,167,0.4)",      lambda r: r["weight"] * 5,         "solid"),
+    ("sharedref", "rgba(80,80,80,0.3)",       lambda r: math.sqrt(r["weight"]),  "dot"),
+    ("lineage",   "rgba(200,200,200,0.3)",     lambda r: 1,                       "dash"),
+]
 
-    xs, ys, src_ids, tgt_ids = [], [], [], []      # <- add tgt_ids
-    for _, row in df.iterrows():
-        s = node_idx.get(row.source); t = node_idx.get(row.target)
-        if s is None or t is None: continue
-        xs += [nodes.loc[s,"date"], nodes.loc[t,"date"], None]
-        ys += [nodes.loc[s,"yPx"  ], nodes.loc[t,"yPx"  ], None]
-        src_ids.append(row.source)
-        tgt_ids.append(row.target)                 # <- new line
 
-    if not xs:
-        return None
+def b64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode()
 
-    trace = go.Scattergl(
-        x=xs, y=ys, mode="lines",
-        line=dict(color=color,
-                  width=width_fn(df.iloc[0]) if "weight" in df.columns else 1,
-                  dash=dash),
-        hoverinfo="skip",
-        name=fname.replace("_edges.json", "")
-    )
-    # flags for JS interaction
-    trace._isEdgeLayer = True
-    trace._sourceIds   = src_ids
-    trace._targetIds   = tgt_ids       # ✔ private attr passes validation
-    return trace
-
-# ---------------------------------------------------------------- traces
-traces = [
-    go.Scattergl(
-        x=nodes.date, y=nodes.yPx, mode="markers",
-        marker=dict(size=nodes.totalCitations.clip(lower=1).pow(.5)*4,
-                    color="#4e79a7",
-                    line=dict(width=.5,color="#222")),
-        text=[f"<b>{t}</b><br>{', '.join(a)}"
-              for t,a in zip(nodes.title,nodes.authors)],
-        hoverinfo="text",
-        name="Papers"
-    )
-]
 
-EDGE_LAYERS = [
-    ("semantic_edges.json",  "rgba(78,121,167,0.4)",      lambda r: r["weight"] * 5,         "solid"),
-    ("sharedref_edges.json", "rgba(80,80,80,0.3)",       lambda r: math.sqrt(r["weight"]),  "dot"),
-    ("lineage_edges.json",   "rgba(200,200,200,0.3)",     lambda r: 1,                       "dash"),
-]
+def js(obj) -> str:
+    """`obj` as a JS literal safe inside <script>."""
+    return json.dumps(obj, separators=(",", ":")).replace("</", "<\\/")
+
+
+# ---------------------------------------------------------------- load
+def load_nodes(public: pathlib.Path) -> pd.DataFrame:
+    nodes = artifacts.read_nodes(public, ["id", "title", "authors", "date",
+                                          "yPx", "totalCitations"])
+    nodes["date"] = pd.to_datetime(nodes["date"], errors="coerce")
+    return nodes.dropna(subset=["date"]).reset_index(drop=True)   # toss bad
+
+
+def layer_spec(index, et, color, width_fn, dash, table) -> dict | None:
+    """Trace style and sidecar layout of one edge layer (None: no edges)."""
+    es = index.edges[et]
+    if not len(es):
+        print(f"[skip] {et}")
+        return None
+    width = width_fn({"weight": float(table.weight[0])}) if "weight" in table.attrs else 1
+    return {"name": et, "color": color, "width": width, "dash": dash,
+            "file": f"{et}.bin", "edges": len(es), "slots": len(es.nbrs)}
+
+
+def write_layer(es, path: pathlib.Path) -> int:
+    """src, dst, offsets, nbrs as one little-endian int32 file."""
+    parts = (es.src, es.dst, es.offsets, es.nbrs)
+    path.write_bytes(b"".join(np.ascontiguousarray(a, dtype="<i4").tobytes() for a in parts))
+    return path.stat().st_size
+
+
+# ---------------------------------------------------------------- figure
+def figure(nodes: pd.DataFrame, layers: list) -> go.Figure:
+    """Layout, buttons and empty traces; the page fills in the data."""
+    traces = [go.Scattergl(mode="markers", hoverinfo="text", name="Papers",
+                           marker=dict(color="#4e79a7", line=dict(width=.5, color="#222")))]
+    traces += [go.Scattergl(x=[], y=[], mode="lines", name=l["name"], hoverinfo="skip",
+                            visible="legendonly",
+                            line=dict(color=l["color"], width=l["width"], dash=l["dash"]))
+               for l in layers]
+    dates = nodes.date
+    layout = dict(
+        title="MTO – Interactive Citation · Similarity · Affiliation Timeline",
+        xaxis=dict(title="Publication Date", type="date",
+                   range=[dates.min(), dates.max()],
+                   rangeslider=dict(visible=True, thickness=0.05),
+                   tickformat="%Y", showgrid=False),
+        yaxis=dict(visible=False, range=[-20, nodes.yPx.max()+20]),
+        height=800, hovermode="closest", showlegend=True,
+        margin=dict(l=40,r=40,t=80,b=40)     # extra top for button bar
+    )
+    fig = go.Figure(traces, layout)
+
+    # -------------------- updatemenu buttons: all layers / one layer ------
+    buttons = [dict(label="All", method="update",
+                    args=[{"visible":[True]*len(fig.data)},
+                          {"title.text":"All layers"}])]
+    for i, l in enumerate(layers, 1):
+        vis = [True] + ["legendonly"]*len(layers)
+        vis[i] = True  # keep that layer on
+        buttons.append(dict(label=l["name"], method="update",
+                            args=[{"visible":vis},{"title.text":f"Layer: {l['name']}"}]))
+    fig.update_layout(updatemenus=[dict(
+        type="buttons", direction="right", y=1.18, x=0.5, xanchor="center",
+        buttons=buttons, pad={"t":0,"r":10}
+    )])
+    return fig
+
+
+# ---------------------------------------------------------------- export
+def export(public: pathlib.Path = PUBLIC, out_html: pathlib.Path = OUT_HTML) -> dict:
+    """Write the page and its layer sidecars; returns bytes written per file."""
+    t0 = time.perf_counter()
+    public, out_html = pathlib.Path(public), pathlib.Path(out_html)
+    data_dir = out_html.with_suffix("")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    nodes = load_nodes(public)
+    tables = {et: artifacts.read_edges(public, et) for et, *_ in EDGE_LAYERS}
+    # node table order = plot point order; edges of unknown nodes are dropped
+    index = graph_index.from_frame(nodes, tables, y="yPx")
+
+    layers, sizes = [], {}
+    for et, *style in EDGE_LAYERS:
+        spec = layer_spec(index, et, *style, tables[et])
+        if spec:
+            layers.append(spec)
+            sizes[f"{data_dir.name}/{spec['file']}"] = write_layer(index.edges[et],
+                                                                   data_dir / spec["file"])
+
+    size = nodes.totalCitations.fillna(0).clip(lower=1).pow(.5)*4
+    NODES = {"n": len(nodes),
+             "x": b64(index.x_ms.astype("<f8")),
+             "y": b64(index.y.astype("<f4")),
+             "size": b64(size.to_numpy(dtype="<f4")),
+             "text": [f"<b>{t}</b><br>{', '.join(a)}"
+                      for t, a in zip(nodes.title, nodes.authors)]}
+
+    # search index (compact form from `cli search`) + index doc → node point
+    search_fp = public / "search_index.json"
+    search_json = json.loads(search_fp.read_text()) if search_fp.exists() else None
+    if search_json:
+        search_json["point"] = [index.row.get(nid, -1) for nid in search_json.pop("ids")]
+        grams = sorted(search.Index.from_json({**search_json, "ids": []}).trigrams.items())
+        search_json["grams"] = "\n".join(g for g, _ in grams)
+        search_json["gram_offsets"] = b64(np.cumsum([0] + [len(ts) for _, ts in grams]).astype("<u4"))
+        search_json["gram_terms"] = b64(np.concatenate([ts for _, ts in grams] or [[]]).astype("<u4"))
+    else:
+        print("[skip] search_index.json – search scans the node texts")
+
+    fig = figure(nodes, layers)
+    div = "mto-timeline"
+    page = (f'<script charset="utf-8" src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js">'
+            f'</script>\n<div id="{div}" class="plotly-graph-div" style="height:100%; width:100%;"></div>\n'
+            + JS.replace("__DIV__", json.dumps(div))
+                .replace("__DATA_DIR__", json.dumps(data_dir.name))
+                .replace("__FIGURE__", pio.to_json(fig, validate=False).replace("</", "<\\/"))
+                .replace("__NODES__", js(NODES))
+                .replace("__LAYERS__", js(layers))
+                .replace("__SEARCH__", js(search_json)))
+    out_html.write_text(page)
+    sizes[out_html.name] = out_html.stat().st_size
+    print(f"✓  {out_html.name} {sizes[out_html.name] / 2**10:.0f} KB + {len(layers)} layer "
+          f"files {sum(sizes.values()) / 2**10 - sizes[out_html.name] / 2**10:.0f} KB "
+          f"in {time.perf_counter() - t0:.2f}s")
+    return sizes
 
-for args in EDGE_LAYERS:
-    tr = load_edges(*args)
-    if tr: traces.append(tr)
-
-# ---------------------------------------------------------------- layout
-dates = nodes.date
-layout = dict(
-    title="MTO – Interactive Citation · Similarity · Affiliation Timeline",
-    xaxis=dict(title="Publication Date",
-               range=[dates.min(), dates.max()],
-               rangeslider=dict(visible=True, thickness=0.05),
-               tickformat="%Y", showgrid=False),
-    yaxis=dict(visible=False, range=[-20, nodes.yPx.max()+20]),
-    height=800, hovermode="closest", showlegend=True,
-    margin=dict(l=40,r=40,t=80,b=40)     # extra top for button bar
-)
-
-fig = go.Figure(traces, layout)
-
-
-
-# -------------------- add updatemenu buttons ------------------------------
-edge_indices = {tr.name: i for i,tr in enumerate(fig.data) if getattr(tr, "_isEdgeLayer", False)}
-
-buttons = [dict(label="All", method="update",
-                args=[{"visible":[True]*len(fig.data)},
-                      {"title":"All layers"}])]
-for name, idx in edge_indices.items():
-    vis = [True] + [False]*(len(fig.data)-1)
-    vis[idx] = True  # keep that layer on
-    buttons.append(dict(label=name, method="update",
-                        args=[{"visible":vis},{"title":f"Layer: {name}"}]))
-
-fig.update_layout(updatemenus=[dict(
-    type="buttons", direction="right", y=1.18, x=0.5, xanchor="center",
-    buttons=buttons, pad={"t":0,"r":10}
-)])
-
-# -------------------- export HTML (partial) -------------------------------
-html = fig.to_html(include_plotlyjs="cdn", full_html=False)
-(OUT_HTML).write_text(html)       # write first
-print("✓  Base HTML written; appending custom JS …")
 
 JS = """
 <!-- search UI ---------------------------------------------------------->
 <div style="margin:8px 0;display:flex;gap:6px;align-items:center">
-  <input id="searchBox" type="text" placeholder="Search title or author"
+  <input id="searchBox" type="text" placeholder="Search title, author, keyword, abstract"
          style="flex:1;padding:4px 6px;font-size:14px">
   <button id="searchBtn" style="padding:4px 10px;font-size:14px">Go</button>
 </div>
 
 <script>
 document.addEventListener("DOMContentLoaded", () => {
-  const gd   = document.querySelector("div.plotly-graph-div");
-  const node = gd.data[0];                       // scattergl trace with nodes
-  const edgeCache = {};
+  const bytes = s => Uint8Array.from(atob(s), c => c.charCodeAt(0));
+  const NODES = __NODES__, LAYERS = __LAYERS__, FIGURE = __FIGURE__;
+  const X = new Float64Array(bytes(NODES.x).buffer),
+        Y = new Float32Array(bytes(NODES.y).buffer),
+        SIZE = new Float32Array(bytes(NODES.size).buffer);
+  Object.assign(FIGURE.data[0], {x: X, y: Y, text: NODES.text,
+                                 marker: {...FIGURE.data[0].marker, size: Array.from(SIZE)}});
+
+  const gd = document.getElementById(__DIV__);
   const big = 18, nbrSize = 12, red = "rgb(220,30,30)";
+  const edgeCache = {};
+  Plotly.newPlot(gd, FIGURE.data, FIGURE.layout).then(() => {
+    gd.on("plotly_restyle", loadVisible);
+    gd.on("plotly_update", loadVisible);
+  });
+
+  /* ---------- edge layers: fetched once, when first shown ------- */
+  const layers = {}, drawn = {};               // trace index → Promise(arrays)
+  function layer(t){
+    const l = LAYERS[t - 1], n = NODES.n;
+    return layers[t] = layers[t] || fetch(`${__DATA_DIR__}/${l.file}`)
+      .then(r => r.arrayBuffer())
+      .then(buf => {
+        const part = (o, len) => new Int32Array(buf, 4 * o, len), m = l.edges;
+        return {src: part(0, m), dst: part(m, m), offsets: part(2 * m, n + 1),
+                nbrs: part(2 * m + n + 1, l.slots)};
+      });
+  }
+
+  async function loadVisible(){
+    for (let t = 1; t < gd.data.length && t <= LAYERS.length; t++){
+      if (drawn[t] || (gd.data[t].visible !== true && gd.data[t].visible !== undefined)) continue;
+      drawn[t] = true;
+      let src, dst;
+      try { ({src, dst} = await layer(t)); }
+      catch (e) { console.warn("edge layers need the page served over HTTP", e); return; }
+      const xs = new Float64Array(3 * src.length).fill(NaN), ys = xs.slice();
+      for (let e = 0; e < src.length; e++){      // x0 x1 NaN: one gap per segment
+        xs[3 * e] = X[src[e]]; xs[3 * e + 1] = X[dst[e]];
+        ys[3 * e] = Y[src[e]]; ys[3 * e + 1] = Y[dst[e]];
+      }
+      Plotly.restyle(gd, {x: [xs], y: [ys]}, [t]);
+    }
+  }
 
   /* ---------- click: reveal edges + tint neighbours --------------- */
   gd.on("plotly_click", ev => {
     const pt = ev.points[0];
-    if (!pt || pt.fullData !== node) return;
+    if (!pt || pt.curveNumber !== 0) return;
     revealEdgesAndTint(pt.pointIndex);
   });
 
-  /* ---------- search: enlarge only ------------------------------- */
+  /* ---------- search: inverted index, as backend/search.py ------- */
+  const SEARCH = __SEARCH__;
+  const lookup = SEARCH && (() => {
+    const terms = SEARCH.terms ? SEARCH.terms.split("\\n") : [],
+          offsets = new Uint32Array(bytes(SEARCH.offsets).buffer),
+          docs = new Uint32Array(bytes(SEARCH.docs).buffer),
+          scores = bytes(SEARCH.scores), n = SEARCH.point.length;
+    const grams = SEARCH.grams ? SEARCH.grams.split("\\n") : [],
+          gramOffsets = new Uint32Array(bytes(SEARCH.gram_offsets).buffer),
+          gramTerms = new Uint32Array(bytes(SEARCH.gram_terms).buffer);
+    const lower = (q, keys = terms) => {         // first key >= q
+      let lo = 0, hi = keys.length;
+      while (lo < hi){ const m = (lo + hi) >> 1; if (keys[m] < q) lo = m + 1; else hi = m; }
+      return lo;
+    };
+    const infix = tok => {                       // ids of the terms containing tok
+      let cand = null;
+      for (let k = 0; k + 3 <= tok.length; k++){
+        const g = lower(tok.slice(k, k + 3), grams);
+        if (grams[g] !== tok.slice(k, k + 3)) return [];
+        const ts = gramTerms.subarray(gramOffsets[g], gramOffsets[g + 1]);
+        if (cand === null){ cand = ts; continue; }
+        const both = [];                         // both lists are sorted term ids
+        for (let i = 0, j = 0; i < cand.length && j < ts.length;)
+          if (cand[i] < ts[j]) i++; else if (cand[i] > ts[j]) j++; else { both.push(cand[i]); i++; j++; }
+        cand = both;
+      }
+      return Array.from(cand, Number).filter(t => terms[t].includes(tok));
+    };
+    return query => {                            // matching points, best first
+      let total = null;
+      for (const tok of new Set(query.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || [])){
+        const hit = new Map(), lo = lower(tok), hi = lower(tok + "\\uffff");
+        const add = t => {
+          const w = Math.log1p(n / Math.max(offsets[t + 1] - offsets[t], 1)) * (terms[t] === tok ? 2 : 1);
+          for (let p = offsets[t]; p < offsets[t + 1]; p++)
+            hit.set(docs[p], (hit.get(docs[p]) || 0) + scores[p] * w);
+        };
+        for (let t = lo; t < hi; t++) add(t);
+        if (tok.length >= 3)                     // inside words, not just prefixes
+          for (const t of infix(tok)) if (t < lo || t >= hi) add(t);
+        total = total === null ? hit
+              : new Map([...total].filter(([d]) => hit.has(d)).map(([d, s]) => [d, s + hit.get(d)]));
+        if (!total.size) break;
+      }
+      return [...(total || [])].sort((a, b) => b[1] - a[1] || a[0] - b[0])
+                               .map(([d]) => SEARCH.point[d]).filter(i => i >= 0);
+    };
+  })();
+
   const box = document.getElementById("searchBox");
   document.getElementById("searchBtn").onclick =
   box.onkeydown = e => {
     if (e.type === "keydown" && e.key !== "Enter") return;
     const q = box.value.toLowerCase().trim();
     if (!q) return;
-    const idx = node.text.findIndex(t => t.toLowerCase().includes(q));
-    if (idx === -1) { alert("No match!"); return; }
-    highlightNode(idx);          // red + big, nothing else
+    const hits = lookup ? lookup(q)
+               : NODES.text.flatMap((t, i) => t.toLowerCase().includes(q) ? [i] : []);
+    if (!hits.length) { alert("No match!"); return; }
+    highlightNodes(hits);        // red + big, nothing else
   };
 
   /* ---------- helpers -------------------------------------------- */
-  function extractId(html){ return html.match(/<b>(.*?)<\\/b>/)[1]; }
 
-  function highlightNode(idx){
-    const sizes = node.marker.size.slice(),
-          colors= node.marker.color.slice();
-    sizes[idx]  = big;
-    colors[idx] = red;
+  function colorsOf(){                       // per-point copy of the marker colours
+    const c = gd.data[0].marker.color;
+    return Array.isArray(c) ? c.slice() : Array(NODES.n).fill(c);
+  }
+
+  function highlightNodes(points){
+    const sizes = Array.from(gd.data[0].marker.size),
+          colors= colorsOf();
+    points.forEach(i => { sizes[i] = big; colors[i] = red; });
     Plotly.restyle(gd, {"marker.size":[sizes], "marker.color":[colors]}, [0]);
   }
 
-  function revealEdgesAndTint(idx){
-    const id = extractId(node.text[idx]);
-    if (edgeCache[id]) return;                 // already handled
+  async function revealEdgesAndTint(i){
+    if (edgeCache[i]) return;                  // already handled
 
     const xs=[], ys=[], neighbours=new Set();
 
-    gd.data.forEach(tr=>{
-      if(!tr._isEdgeLayer || tr.visible === false) return; // respect toggle
-      const segCount = tr._sourceIds.length;               // one id per segment
-      for(let seg=0; seg<segCount; seg++){
-        if(tr._sourceIds[seg] !== id) continue;
-        const i = seg * 3;                   // base index in x/y
-        xs.push(tr.x[i], tr.x[i+1], null);
-        ys.push(tr.y[i], tr.y[i+1], null);
-        neighbours.add(tr._targetIds[seg]);
+    for (let t = 1; t <= LAYERS.length; t++){
+      if (gd.data[t].visible !== true && gd.data[t].visible !== undefined) continue; // respect toggle
+      let adj;
+      try { adj = await layer(t); }
+      catch (e) { console.warn("edge layers need the page served over HTTP", e); return; }
+      for (let p = adj.offsets[i]; p < adj.offsets[i + 1]; p++){
+        const j = adj.nbrs[p];
+        xs.push(X[i], X[j], null);
+        ys.push(Y[i], Y[j], null);
+        neighbours.add(j);
       }
-    });
+    }
 
     if (xs.length){
       Plotly.addTraces(gd, {
@@ -182,19 +331,17 @@ document.addEventListener("DOMContentLoaded", () => {
         line:{color:"rgba(255,0,0,.7)", width:1},
         hoverinfo:"skip", showlegend:false
       });
-      edgeCache[id] = true;
+      edgeCache[i] = true;
     }
 
     tintNeighbours(neighbours);
   }
 
-  function tintNeighbours(idSet){
-    if (!idSet.size) return;
-    const sizes=node.marker.size.slice(),
-          colors=node.marker.color.slice();
-    idSet.forEach(id=>{
-      const i = node.text.findIndex(t => extractId(t) === id);
-      if(i === -1) return;
+  function tintNeighbours(points){
+    if (!points.size) return;
+    const sizes=Array.from(gd.data[0].marker.size),
+          colors=colorsOf();
+    points.forEach(i=>{
       sizes[i]  = Math.max(sizes[i], nbrSize);
       colors[i] = red;
     });
@@ -205,7 +352,14 @@ document.addEventListener("DOMContentLoaded", () => {
 """
 
 
+def main():
+    ap = argparse.ArgumentParser(description="Static HTML export of the timeline")
+    ap.add_argument("--public", default=str(PUBLIC))
+    ap.add_argument("--out", default=str(OUT_HTML))
+    args = ap.parse_args()
+    export(pathlib.Path(args.public), pathlib.Path(args.out))
+    print(f"✓  Open {args.out} in your browser (served over HTTP).")
 
 
-with OUT_HTML.open("a") as f: f.write(JS)
-print(f"✓  Open {OUT_HTML} in your browser.")
+if __name__ == "__main__":
+    main()
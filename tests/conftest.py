@@ -0,0 +1,4 @@
+# tests import backend/ and benchmarks/ from the repository root
+import pathlib, sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
@@ -0,0 +1,30 @@
+"""tests/test_artifacts.py
+Edge files whose names differ only in case – the former sharedRef_edges.json
+next to sharedref_edges.json – must not serve the stale copy.
+"""
+from __future__ import annotations
+import json, os
+
+from backend import artifacts, sharedref
+
+STALE = [{'source': 'a', 'target': 'b', 'type': 'sharedRef', 'weight': 9}]
+FRESH = [{'source': 'a', 'target': 'c', 'type': 'sharedRef', 'weight': 2}]
+
+
+def test_sharedref_write_removes_legacy_name(tmp_path):
+    (tmp_path / sharedref.LEGACY).write_text(json.dumps(STALE))
+    sharedref.write(FRESH, tmp_path)
+    assert [fp.name for fp in tmp_path.glob('*_edges.json')] == [sharedref.EDGES]
+    assert json.loads((tmp_path / sharedref.EDGES).read_text()) == FRESH
+
+
+def test_edge_files_prefers_newest_of_a_case_collision(tmp_path):
+    stale, fresh = tmp_path / 'sharedref_edges.json', tmp_path / 'sharedRef_edges.json'
+    stale.write_text(json.dumps(STALE))
+    fresh.write_text(json.dumps(FRESH))
+    if stale.samefile(fresh):                       # case-insensitive file system
+        return
+    os.utime(stale, ns=(1, 1))
+    assert artifacts._edge_files(tmp_path)['sharedref'] == fresh
+    os.utime(stale, ns=(2 * 10**18, 2 * 10**18))
+    assert artifacts._edge_files(tmp_path)['sharedref'] == stale
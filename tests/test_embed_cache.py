@@ -0,0 +1,39 @@
+"""tests/test_embed_cache.py
+`--embed_cache_mb` must bound vectors.npy on disk: evicted rows are
+compacted away, and the surviving vectors keep their values.
+"""
+from __future__ import annotations
+import numpy as np
+
+from backend.embed_cache import MIN_ROWS, EmbeddingStore
+
+DIM = 16
+
+
+def vectors(keys):
+    rng = np.random.default_rng(0)
+    v = rng.standard_normal((len(keys), DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_save_compacts_evicted_rows(tmp_path):
+    keys = [f"k{i}" for i in range(5000)]
+    vecs = vectors(keys)
+    store = EmbeddingStore(tmp_path, 'm')
+    store.put(keys, vecs)
+    store.save()
+    big = store.vec_path.stat().st_size
+
+    budget = MIN_ROWS * DIM * 4 / 2**20               # room for MIN_ROWS vectors
+    store = EmbeddingStore(tmp_path, 'm', max_mb=budget)
+    recent = keys[-300:]
+    store.get(recent, lambda pos: None)               # all hits: marks them used this run
+    assert store.save() == len(keys) - MIN_ROWS
+    assert store.vec_path.stat().st_size < big / 4
+    assert store.vectors.shape[0] == MIN_ROWS
+
+    store = EmbeddingStore(tmp_path, 'm', max_mb=budget)
+    assert len(store) == MIN_ROWS
+    assert np.array_equal(store.get(recent, lambda pos: None), vecs[-300:])
+    store.put(['new'], vecs[:1])                       # full again: grows by doubling
+    assert store.vectors.shape[0] == 2 * MIN_ROWS
@@ -0,0 +1,33 @@
+"""tests/test_graph_store.py
+The shared serving store must be rebuilt when an edge type appears or
+disappears, not only when a stored edge file changes.
+"""
+from __future__ import annotations
+import json
+
+from backend import graph_store
+
+
+def write_public(public, n: int = 6):
+    public.mkdir(exist_ok=True)
+    nodes = [{'id': f"p{i}", 'title': f"Paper {i}", 'authors': [f"A{i}"],
+              'date': f"{2000 + i}-01-01", 'yPx': i} for i in range(n)]
+    (public / 'nodes.json').write_text(json.dumps(nodes))
+    for et in graph_store.EDGE_TYPES:
+        edges = [{'source': f"p{i}", 'target': f"p{i + 1}", 'type': et, 'weight': 1.}
+                 for i in range(n - 1)]
+        (public / f'{et}_edges.json').write_text(json.dumps(edges))
+
+
+def test_new_and_removed_temporal_window_invalidate_the_store(tmp_path):
+    write_public(tmp_path)
+    graph_store.build(tmp_path)
+    assert graph_store.fresh(tmp_path)
+    window = tmp_path / 'semantic_past_edges.json'
+    window.write_text((tmp_path / 'semantic_edges.json').read_text())
+    assert not graph_store.fresh(tmp_path)
+    graph_store.build(tmp_path)
+    assert graph_store.fresh(tmp_path)
+    assert 'semantic_past' in graph_store.attach(tmp_path / graph_store.DIR).index.edges
+    window.unlink()
+    assert not graph_store.fresh(tmp_path)
@@ -0,0 +1,98 @@
+"""tests/test_incremental.py
+`cli all --incremental` must write the same public/*.json as a full rebuild
+after papers are added, edited and deleted.  A hashing stub stands in for
+the sentence-transformers model, so the test needs no model download.
+"""
+from __future__ import annotations
+import hashlib, json, pathlib
+import numpy as np
+
+from backend import (citation, density, incremental, lineage, load_data, search, semantic,
+                     sharedref, trends)
+from backend.embedder import Encoder
+from benchmarks import synthetic
+
+PAPERS, TOUCH = 120, 4
+
+
+class HashEncoder(Encoder):
+    """Deterministic bag-of-words vectors: one hashed dimension per word."""
+    dim = 32
+
+    def encode(self, docs):
+        out = np.zeros((len(docs), self.dim), dtype=np.float32)
+        for i, d in enumerate(docs):
+            for t in d.lower().split():
+                out[i, int(hashlib.md5(t.encode()).hexdigest()[:8], 16) % self.dim] += 1
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out
+
+
+def full_build(json_dir: pathlib.Path, out: pathlib.Path, temporal=()):
+    """The stages of `cli all`, in its order (citation merges into nodes.json)."""
+    out.mkdir()
+    papers = load_data.load(json_dir)
+    semantic.build(papers, out, encoder=HashEncoder(), temporal=temporal)
+    citation.build(papers, out)
+    sharedref.build(papers, out)
+    lineage.build(papers, out)
+    density.build(papers, out)
+    trends.build(papers, out)
+    search.build(papers, out)
+
+
+def mutate(json_dir: pathlib.Path):
+    """Add TOUCH papers, rewrite TOUCH abstracts, delete TOUCH files."""
+    synthetic.write_corpus(json_dir, TOUCH, start=PAPERS, seed=1, authors=PAPERS // 3)
+    files = sorted(json_dir.glob('*.json'))
+    for fp in files[:TOUCH]:
+        data = json.loads(fp.read_text())
+        data['abstract'] = "revised " + data['abstract'][::-1]
+        fp.write_text(json.dumps(data))
+    for fp in files[TOUCH:2 * TOUCH]:
+        fp.unlink()
+
+
+def test_incremental_matches_full_rebuild(tmp_path):
+    data, inc, full = tmp_path / 'data', tmp_path / 'inc', tmp_path / 'full'
+    synthetic.write_corpus(data, PAPERS)
+    inc.mkdir()
+    incremental.build_all(data, inc, encoder=HashEncoder())
+    mutate(data)
+    incremental.build_all(data, inc, encoder=HashEncoder())
+    full_build(data, full)
+
+    names = sorted(p.name for p in full.glob('*.json'))
+    assert names == sorted(p.name for p in inc.glob('*.json'))
+    assert {'nodes.json', 'lineage_edges.json', 'trends.json'} <= set(names)
+    for name in names:
+        assert (inc / name).read_bytes() == (full / name).read_bytes(), name
+
+
+def test_dropped_temporal_windows_are_removed(tmp_path):
+    data, out = tmp_path / 'data', tmp_path / 'out'
+    synthetic.write_corpus(data, PAPERS)
+    out.mkdir()
+    incremental.build_all(data, out, encoder=HashEncoder(), temporal=('past', 'window:2'))
+    assert {p.name for p in out.glob('semantic_*_edges.json')} == \
+           {semantic.temporal_file('past'), semantic.temporal_file('window:2')}
+    mutate(data)
+    incremental.build_all(data, out, encoder=HashEncoder(), temporal=('past',))
+    assert [p.name for p in out.glob('semantic_*_edges.json')] == [semantic.temporal_file('past')]
+
+
+def test_emptied_corpus_matches_full_rebuild(tmp_path):
+    data, inc, full = tmp_path / 'data', tmp_path / 'inc', tmp_path / 'full'
+    synthetic.write_corpus(data, PAPERS)
+    inc.mkdir()
+    incremental.build_all(data, inc, encoder=HashEncoder(), temporal=('past',))
+    for fp in data.glob('*.json'):
+        fp.unlink()
+    incremental.build_all(data, inc, encoder=HashEncoder(), temporal=('past',))
+    full_build(data, full, temporal=('past',))
+
+    names = sorted(p.name for p in full.glob('*.json'))
+    assert names == sorted(p.name for p in inc.glob('*.json'))
+    assert json.loads((inc / 'nodes.json').read_text()) == []
+    for name in names:
+        assert (inc / name).read_bytes() == (full / name).read_bytes(), name